@@ -10,6 +10,11 @@ import sys
 import os
 from pathlib import Path
 from utils.test_report_config import get_report_config
+from utils.docker_manager import DockerManager
+from utils.config import ASYNC_MAX_WORKERS, CONTENT_TOPIC, NODE1_PORT
+from utils.load_generator import LoadGenerator, parse_schedule
+from utils.payload_sweep import SWEEP_MODES, payload_size_sweep, sweep_sizes
+from utils.waku_api import WakuNodeManager
 
 
 def run_command(cmd, description):
@@ -32,6 +37,44 @@ def run_command(cmd, description):
         return False
 
 
+def run_load(args):
+    """Publish against already running nodes on an open-loop schedule and print the report"""
+    try:
+        schedule = parse_schedule(args.schedule, args.duration)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    
+    nodes = [WakuNodeManager(port) for port in args.ports]
+    for node in nodes:
+        if not node.check_health():
+            print(f"❌ Error: no healthy Waku node on port {node.port}")
+            return 1
+        node.subscribe_to_topic(args.topic)
+    
+    print(f"\n🚀 Publishing with schedule {args.schedule} for {args.duration:.0f}s to port(s) "
+          f"{', '.join(str(p) for p in args.ports)}")
+    generator = LoadGenerator(nodes, schedule, args.topic, args.payload_size, args.workers)
+    report = generator.run(args.duration)
+    print(f"\n📊 {report}")
+    return 0 if not report.failed else 1
+
+
+def run_payload_sweep(args):
+    """Publish doubling payload sizes to a running node and print client CPU per MB"""
+    node = WakuNodeManager(args.port)
+    if not node.check_health():
+        print(f"❌ Error: no healthy Waku node on port {node.port}")
+        return 1
+    node.subscribe_to_topic(args.topic)
+    
+    sizes = sweep_sizes(args.min_size, args.max_size) if args.max_size else sweep_sizes(args.min_size)
+    print(f"\n🚀 Publishing {args.messages} message(s) per size, {sizes[0]} to {sizes[-1]} bytes, to port {args.port}")
+    report = payload_size_sweep(node, args.topic, sizes, args.messages, args.mode)
+    print(f"\n📊 {report}")
+    return 0 if not any(p.failed for p in report.points) else 1
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="IFT-Automation Test Runner",
@@ -45,6 +88,10 @@ Examples:
   python run_tests.py --parallel         # Run tests in parallel
   python run_tests.py --html             # Generate HTML report
   python run_tests.py --coverage         # Run with coverage
+  python run_tests.py --warm-pool        # Reuse containers across sessions
+  python run_tests.py load --schedule ramp:10:200 --duration 60
+                                         # Open-loop load against running nodes
+  python run_tests.py payload-sweep      # Client CPU per MB from 1KB to the relay max size
         """
     )
     
@@ -91,14 +138,53 @@ Examples:
         help="Run with debug output (shows print statements)"
     )
     
+    parser.add_argument(
+        "--warm-pool",
+        action="store_true",
+        help="Reuse running Waku containers from the previous session and keep them afterwards"
+    )
+    
     parser.add_argument(
         "--cleanup", 
         action="store_true", 
         help="Clean up Docker resources before running tests"
     )
     
+    subparsers = parser.add_subparsers(dest="command")
+    load_parser = subparsers.add_parser(
+        "load",
+        help="Publish at a target rate against running nodes and report corrected latency"
+    )
+    load_parser.add_argument(
+        "--schedule",
+        default="constant:50",
+        help="constant:RATE, ramp:START:END, step:SECONDS@RATE,... or burst:BASE:PEAK:PERIOD:LENGTH"
+    )
+    load_parser.add_argument("--duration", type=float, default=30.0, help="Run length in seconds")
+    load_parser.add_argument("--ports", type=int, nargs="+", default=[NODE1_PORT], help="REST ports of the target nodes")
+    load_parser.add_argument("--topic", default=CONTENT_TOPIC, help="Content topic to publish on")
+    load_parser.add_argument("--payload-size", type=int, default=64, help="Payload size in bytes")
+    load_parser.add_argument("--workers", type=int, default=ASYNC_MAX_WORKERS, help="Maximum concurrent requests")
+    
+    sweep_parser = subparsers.add_parser(
+        "payload-sweep",
+        help="Publish doubling payload sizes to a running node and report client CPU per MB"
+    )
+    sweep_parser.add_argument("--port", type=int, default=NODE1_PORT, help="REST port of the target node")
+    sweep_parser.add_argument("--topic", default=CONTENT_TOPIC, help="Content topic to publish on")
+    sweep_parser.add_argument("--messages", type=int, default=20, help="Messages published at each size")
+    sweep_parser.add_argument("--min-size", type=int, default=1024, help="Smallest payload size in bytes")
+    sweep_parser.add_argument("--max-size", type=int, help="Largest payload size in bytes (default: relay max)")
+    sweep_parser.add_argument("--mode", choices=SWEEP_MODES, default="bytes",
+                              help="bytes: pre-encoded fast path; json: dict serialized by requests")
+    
     args = parser.parse_args()
     
+    if args.command == "load":
+        return run_load(args)
+    if args.command == "payload-sweep":
+        return run_payload_sweep(args)
+    
     # Check if we're in the right directory
     if not Path("tests").exists():
         print("❌ Error: 'tests' directory not found. Please run this script from the project root.")
@@ -139,6 +225,9 @@ Examples:
     if args.parallel:
         cmd.extend(["-n", "auto"])
     
+    if args.warm_pool:
+        cmd.append("--warm-pool")
+    
     if args.html:
         report_config = get_report_config()
         cmd.extend(report_config.get_html_report_args())
@@ -150,18 +239,11 @@ Examples:
     # Cleanup Docker resources if requested
     if args.cleanup:
         print("\n🧹 Cleaning up Docker resources...")
-        cleanup_commands = [
-            (["docker", "stop", "node1", "node2"], "Stopping containers"),
-            (["docker", "rm", "node1", "node2"], "Removing containers"),
-            (["docker", "network", "rm", "waku"], "Removing network")
-        ]
-        
-        for cmd, desc in cleanup_commands:
-            try:
-                subprocess.run(cmd, capture_output=True)
-                print(f"✅ {desc} completed")
-            except:
-                pass  # Ignore errors during cleanup
+        try:
+            report = DockerManager(warm_pool=False).teardown(all_workers=True)
+            print(f"✅ Removed {len(report.removed)} container(s) and the networks in {report.duration:.2f}s")
+        except Exception as e:
+            print(f"⚠️  Cleanup failed: {e}")  # Ignore errors during cleanup
     
     # Run the tests
     print(f"\n🚀 Running tests with command: {' '.join(cmd)}")
@@ -1,14 +1,180 @@
+import uuid
+from typing import Optional
+
 import pytest
 
-from utils.docker_manager import DockerManager
-from utils.waku_api import Node
-from utils.config import CONTENT_TOPIC, NODE1_IP
+from utils.docker_backend import DockerBackend, DockerError
+from utils.docker_manager import DockerManager, ResourceSampler
+from utils.fake_waku import FakeWakuCluster
+from utils.cassette import Cassette, CassetteCluster, RecordingTransport, ReplayTransport, PLAYBACK_SPEEDS
+from utils.transport import WakuTransport, set_transport_factory
+from utils.waku_api import Node, WakuNodeManager
+from utils.config import CONTENT_TOPIC, WARM_POOL, SAMPLE_RESOURCES, RESOURCE_SAMPLE_INTERVAL, FAKE_NODES
 from utils.reporter import WakuTestReporter
+from utils.latency import PropagationTracker
+from utils.load_generator import LoadGenerator
+from utils.log_collector import get_collectors
+
+LOG_CURSORS = pytest.StashKey[dict]()
+RECORDING = pytest.StashKey[Cassette]()
+REPLAYING = pytest.StashKey[Cassette]()
+
+
+class MemoryBackend(DockerBackend):
+    """Keeps container records in memory; nothing is actually run"""
+
+    def __init__(self):
+        self.containers = {}
+        self.networks = {}
+        self.started = []
+        self.args = {}
+
+    def run_container(self, name, image, args, ports, network=None, ip=None, labels=None):
+        self.started.append(name)
+        self.args[name] = args
+        self.containers[name] = {"id": f"{name}-{len(self.started)}", "name": name, "running": True,
+                                 "labels": dict(labels or {})}
+        return self.containers[name]["id"]
+
+    def stop_container(self, name, timeout=None):
+        if name not in self.containers:
+            raise DockerError(f"No such container: {name}", 404)
+        self.containers[name]["running"] = False
+
+    def remove_container(self, name, force=False):
+        self.containers.pop(name, None)
+
+    def is_running(self, name):
+        return self.containers.get(name, {}).get("running", False)
+
+    def list_containers(self, labels=None):
+        return [dict(c) for c in self.containers.values()
+                if all(c["labels"].get(k) == v for k, v in (labels or {}).items())]
+
+    def get_logs(self, name, tail=50):
+        return ""
+
+    def stream_logs(self, name, since=None, tail=None):
+        raise DockerError(f"Container {name} has no log stream in memory")
+
+    def stream_stats(self, name):
+        raise DockerError(f"Container {name} has no resource stats in memory")
+
+    def create_network(self, name, subnet, gateway, labels=None):
+        if name in self.networks:
+            return False
+        self.networks[name] = {"Name": name, "Labels": dict(labels or {}), "Containers": {},
+                               "IPAM": {"Config": [{"Subnet": subnet, "Gateway": gateway}]}}
+        return True
+
+    def list_networks(self, labels=None):
+        return [name for name, network in self.networks.items()
+                if all(network["Labels"].get(k) == v for k, v in (labels or {}).items())]
+
+    def remove_network(self, name):
+        if self.networks.pop(name, None) is None:
+            raise DockerError(f"No such network: {name}", 404)
+
+    def connect_network(self, network, container, ip):
+        if network not in self.networks:
+            raise DockerError(f"No such network: {network}", 404)
+        self.networks[network]["Containers"][container] = {"IPv4Address": ip}
+
+    def inspect_network(self, name):
+        if name not in self.networks:
+            raise DockerError(f"No such network: {name}", 404)
+        return [self.networks[name]]
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--warm-pool",
+        action="store_true",
+        default=WARM_POOL,
+        help="Reuse labeled Waku containers from the previous session and leave them running afterwards"
+    )
+    parser.addoption(
+        "--sample-resources",
+        action="store_true",
+        default=SAMPLE_RESOURCES,
+        help="Sample container CPU, memory and I/O and attach per-test summaries to the report"
+    )
+    parser.addoption(
+        "--fake-nodes",
+        action="store_true",
+        default=FAKE_NODES,
+        help="Run against in-process fake nwaku nodes instead of Docker containers"
+    )
+    parser.addoption(
+        "--record-cassette",
+        metavar="PATH",
+        help="Record every REST request and response to this cassette file"
+    )
+    parser.addoption(
+        "--replay-cassette",
+        metavar="PATH",
+        help="Serve REST responses from this cassette file instead of live nodes"
+    )
+    parser.addoption(
+        "--replay-speed",
+        choices=PLAYBACK_SPEEDS,
+        default="instant",
+        help="Replay responses instantly or after their recorded response time"
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("--sample-resources"):
+        reporter = WakuTestReporter(resource_sampler=ResourceSampler(RESOURCE_SAMPLE_INTERVAL))
+        config.pluginmanager.register(reporter, "waku_reporter")
+    
+    if config.getoption("--replay-cassette"):
+        cassette = Cassette.load(config.getoption("--replay-cassette"))
+        speed = config.getoption("--replay-speed")
+        config.stash[REPLAYING] = cassette
+        set_transport_factory(lambda base_url: ReplayTransport(base_url, cassette, speed))
+    elif config.getoption("--record-cassette"):
+        cassette = Cassette()
+        config.stash[RECORDING] = cassette
+        set_transport_factory(lambda base_url: RecordingTransport(WakuTransport(base_url), cassette))
+
+
+def pytest_unconfigure(config):
+    if RECORDING in config.stash:
+        config.stash[RECORDING].save(config.getoption("--record-cassette"))
+    if RECORDING in config.stash or REPLAYING in config.stash:
+        set_transport_factory(None)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # Mark where each container's log stood when the test started
+    item.stash[LOG_CURSORS] = {name: c.cursor() for name, c in get_collectors().items()}
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if not report.failed:
+        return
+    cursors = item.stash.get(LOG_CURSORS, {})
+    for name, collector in get_collectors().items():
+        # Collectors started during this test's setup cover it from their first line
+        lines = collector.read(since=cursors.get(name))
+        if lines:
+            report.sections.append((f"{name} logs ({len(lines)} lines, full log: {collector.path})", "\n".join(lines)))
 
 
 @pytest.fixture(scope="session")
-def docker_manager():
-    manager = DockerManager()
+def docker_manager(request):
+    # Network, subnet, container names and ports are derived from PYTEST_XDIST_WORKER
+    if REPLAYING in request.config.stash:
+        manager = CassetteCluster(request.config.stash[REPLAYING])
+    elif request.config.getoption("--fake-nodes"):
+        manager = FakeWakuCluster()
+    else:
+        manager = DockerManager(warm_pool=request.config.getoption("--warm-pool"))
     manager.setup_network()
     
     yield manager
@@ -17,29 +183,43 @@ def docker_manager():
 
 
 @pytest.fixture(scope="session")
-def node1(docker_manager):
-    container = docker_manager.create_node1()
-    node = Node(container)
+def node_containers(request, docker_manager):
+    # Node keys are pre-generated, so node2 can bootstrap from node1 without waiting for it
+    containers = docker_manager.create_nodes_with_bootstrap()
+    
+    if RECORDING in request.config.stash:
+        request.config.stash[RECORDING].add_nodes(containers)
+    
+    reporter = request.config.pluginmanager.get_plugin("waku_reporter")
+    if reporter and reporter.resource_sampler:
+        for container in containers:
+            reporter.resource_sampler.add(container)
+    
+    return containers
+
+
+@pytest.fixture(scope="session")
+def node1(node_containers):
+    node = Node(node_containers[0])
+    node.follow_logs()
     node.wait_for_ready()
     
     yield node
     
-    node.stop()
+    node.detach()
 
 
 @pytest.fixture(scope="session")
-def node2_with_bootstrap(docker_manager, node1):
-    enr_uri = node1.get_enr_uri()
-    
-    container = docker_manager.create_node2_with_bootstrap(enr_uri)
-    node = Node(container, docker_manager)
+def node2_with_bootstrap(docker_manager, node_containers, node1):
+    node = Node(node_containers[1], docker_manager)
+    node.follow_logs()
     node.wait_for_ready()
     
-    node.verify_peer_connection(NODE1_IP)
+    node.verify_peer_connection(node1.network_ip)
     
     yield node
     
-    node.stop()
+    node.detach()
 
 
 @pytest.fixture(scope="function")
@@ -65,4 +245,50 @@ def connected_nodes(node1, node2_with_bootstrap):
 def connected_and_subscribed_nodes(connected_nodes, subscription_factory):
     node1, node2 = connected_nodes
     subscription_factory(node2)
-    return (node1, node2)
\ No newline at end of file
+    return (node1, node2)
+
+
+def _pinned_run_id(request) -> Optional[str]:
+    """Run id stored in the cassette being recorded or replayed, so replayed arrivals match this run"""
+    for key in (RECORDING, REPLAYING):
+        if key in request.config.stash:
+            return request.config.stash[key].value(f"{request.node.nodeid}:run_id", lambda: uuid.uuid4().hex[:8])
+    return None
+
+
+@pytest.fixture(scope="function")
+def propagation_tracker(request, connected_nodes):
+    node1, node2 = connected_nodes
+    tracker = PropagationTracker(node1, [node2], CONTENT_TOPIC, run_id=_pinned_run_id(request))
+    tracker.subscribe()
+    yield tracker
+    tracker.stop_polling()
+
+
+@pytest.fixture(scope="function")
+def load_generator(connected_nodes):
+    def _generator(schedule, **kwargs):
+        for node in connected_nodes:
+            node.subscribe_to_topic(kwargs.get("content_topic", CONTENT_TOPIC))
+        return LoadGenerator(connected_nodes, schedule, **kwargs)
+
+    return _generator
+
+
+@pytest.fixture
+def memory_backend():
+    return MemoryBackend()
+
+
+@pytest.fixture
+def fake_cluster():
+    cluster = FakeWakuCluster(seed=1)
+    yield cluster
+    cluster.teardown()
+
+
+@pytest.fixture
+def fake_nodes(fake_cluster):
+    """node1 and node2 of fake_cluster, node2 bootstrapped from node1, each with its own REST client"""
+    containers = fake_cluster.create_nodes_with_bootstrap()
+    return [WakuNodeManager(c.port, WakuTransport(f"http://127.0.0.1:{c.port}")) for c in containers]
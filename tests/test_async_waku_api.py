@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+import requests
+
+from utils.async_waku_api import AsyncWakuNode, gather_cluster, run_on_cluster
+from utils.fake_waku import FakeWakuCluster
+from utils.waku_api import Node
+
+TOPIC = "/test/1/async/proto"
+
+
+@pytest.fixture
+def cluster():
+    cluster = FakeWakuCluster(seed=1)
+    yield cluster
+    cluster.teardown()
+
+
+@pytest.fixture
+def nodes(cluster):
+    return [Node(container) for container in cluster.create_nodes_with_bootstrap()]
+
+
+@pytest.mark.unit
+class TestAsyncWakuApi:
+
+    def test_01_run_on_cluster_keys_results_by_node(self, nodes):
+        health = run_on_cluster(nodes, "check_health")
+        peers = run_on_cluster(nodes, "get_peers")
+
+        assert health == {node.name: True for node in nodes}
+        assert all(len(node_peers) == 1 for node_peers in peers.values())
+
+    def test_02_async_node_publishes_and_reads(self, nodes):
+        sender, receiver = (AsyncWakuNode(node) for node in nodes)
+
+        async def scenario():
+            await gather_cluster([sender, receiver], "subscribe_to_topic", TOPIC)
+            await sender.publish_message(TOPIC, "hello")
+            return await receiver.get_messages(TOPIC)
+
+        messages = asyncio.run(scenario())
+
+        assert [m["payload"] for m in messages] == ["aGVsbG8="]
+        assert AsyncWakuNode.for_port(nodes[0].port).name == str(nodes[0].port)
+
+    def test_03_gather_can_collect_failures(self, cluster, nodes):
+        cluster.containers[nodes[1].name].stop()
+        async_nodes = [AsyncWakuNode(node) for node in nodes]
+
+        results = asyncio.run(gather_cluster(async_nodes, "get_peers", return_exceptions=True))
+
+        assert isinstance(results[nodes[0].name], list)
+        assert isinstance(results[nodes[1].name], requests.exceptions.RequestException)
+        with pytest.raises(requests.exceptions.RequestException):
+            asyncio.run(gather_cluster(async_nodes, "get_peers"))
@@ -0,0 +1,95 @@
+import pytest
+
+from utils.cassette import Cassette, CassetteCluster, CassetteMiss, RecordingTransport, ReplayTransport
+from utils.fake_waku import FakeWakuCluster
+from utils.test_helpers import wait_for
+from utils.transport import WakuTransport
+from utils.waku_api import WakuNodeManager
+
+TOPIC = "/test/1/cassette/proto"
+
+
+def _exchange(make_transport, containers):
+    node1, node2 = (WakuNodeManager(c.port, make_transport(f"http://127.0.0.1:{c.port}")) for c in containers)
+    node1.subscribe_to_topic(TOPIC)
+    node2.subscribe_to_topic(TOPIC)
+    node1.publish_message(TOPIC, "hello")
+    return wait_for(lambda: node2.get_messages(TOPIC), timeout=5, poll_interval=0.05)
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    cluster = FakeWakuCluster(seed=1)
+    cluster.network.delay = 0.2
+    cassette = Cassette()
+    try:
+        containers = cluster.create_nodes_with_bootstrap()
+        cassette.add_nodes(containers)
+        messages = _exchange(lambda url: RecordingTransport(WakuTransport(url), cassette), containers)
+    finally:
+        cluster.teardown()
+    path = str(tmp_path / "run.jsonl.gz")
+    cassette.save(path)
+    return path, messages, cassette
+
+
+@pytest.mark.unit
+class TestCassette:
+
+    def test_01_replay_serves_recorded_responses(self, recorded):
+        path, messages, cassette = recorded
+        assert len(cassette.interactions) > 4  # the delayed relay made node2 poll more than once
+
+        replayed = Cassette.load(path)
+        containers = CassetteCluster(replayed).create_nodes_with_bootstrap()
+        result = _exchange(lambda url: ReplayTransport(url, replayed), containers)
+
+        assert [m["payload"] for m in result] == [m["payload"] for m in messages]
+        assert [c.port for c in containers] == [n["port"] for n in cassette.nodes]
+
+    def test_02_unrecorded_request_is_a_miss(self, recorded):
+        replayed = Cassette.load(recorded[0])
+        port = replayed.nodes[0]["port"]
+        transport = ReplayTransport(f"http://127.0.0.1:{port}", replayed)
+
+        with pytest.raises(CassetteMiss):
+            transport.get("/store/v1/messages")
+
+    def test_03_scheduler_waits_collapse_on_instant_replay(self, tmp_path):
+        cluster = FakeWakuCluster(seed=1)
+        cluster.network.delay = 0.2
+        cassette = Cassette()
+        try:
+            containers = cluster.create_nodes_with_bootstrap()
+            cassette.add_nodes(containers)
+            node1, node2 = (WakuNodeManager(c.port, RecordingTransport(WakuTransport(f"http://127.0.0.1:{c.port}"),
+                                                                        cassette)) for c in containers)
+            node2.subscribe_to_topic(TOPIC)
+            node1.publish_message(TOPIC, "first")
+            node1.publish_message(TOPIC, "second")
+            recorded = node2.wait_for_messages(TOPIC, expected_count=2, timeout=5)
+        finally:
+            cluster.teardown()
+        polls = [i for i in cassette.interactions if i["m"] == "GET"]
+        assert len(polls) > 1 and all(i["w"] is not None for i in polls)
+        path = str(tmp_path / "run.jsonl.gz")
+        cassette.save(path)
+
+        replayed = Cassette.load(path)
+        transports = [ReplayTransport(f"http://127.0.0.1:{c.port}", replayed) for c in containers]
+        node1, node2 = (WakuNodeManager(c.port, t) for c, t in zip(containers, transports))
+        node2.subscribe_to_topic(TOPIC)
+        node1.publish_message(TOPIC, "payloads differ between runs")
+        node1.publish_message(TOPIC, "and are not matched")
+        messages = node2.wait_for_messages(TOPIC, expected_count=2, timeout=5)
+
+        assert [m["payload"] for m in messages] == [m["payload"] for m in recorded]
+        assert transports[1].stats.requests == 2, "The wait should be answered by its first poll"
+
+    def test_04_values_are_pinned_in_the_cassette(self, tmp_path):
+        cassette = Cassette()
+        run_id = cassette.value("run_id", lambda: "abc123")
+        path = str(tmp_path / "run.jsonl.gz")
+        cassette.save(path)
+
+        assert Cassette.load(path).value("run_id", lambda: "fresh") == run_id
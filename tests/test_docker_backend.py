@@ -0,0 +1,243 @@
+import json
+import os
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from utils.docker_backend import DockerBackend, DockerEngineClient, EngineApiDockerBackend, LineStream
+from utils.docker_manager import DockerContainerManager, DockerManager, DockerNetworkManager, ResourceSampler
+from utils.log_follower import LogFollower
+from utils.topology import ClusterNamespace
+
+
+def _stats_documents():
+    for i in range(3):
+        yield {
+            "cpu_stats": {"cpu_usage": {"total_usage": 2000 * (i + 1)}, "system_cpu_usage": 20000 * (i + 1),
+                          "online_cpus": 2},
+            "precpu_stats": {"cpu_usage": {"total_usage": 2000 * i}, "system_cpu_usage": 20000 * i},
+            "memory_stats": {"usage": 5000 + i * 1000, "stats": {"inactive_file": 1000}},
+            "networks": {"eth0": {"rx_bytes": 100 * i, "tx_bytes": 50 * i}},
+            "blkio_stats": {"io_service_bytes_recursive": [{"op": "Read", "value": 10 * i}]}
+        }
+
+
+class _FakeEngineHandler(BaseHTTPRequestHandler):
+    """Just enough of the Docker Engine API for the container and network managers"""
+    protocol_version = "HTTP/1.1"
+
+    def _route(self, method):
+        url = urlparse(self.path)
+        parts = url.path.split("/")[2:]  # drop the API version prefix
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        state = self.server.state
+
+        if parts[:2] == ["containers", "create"]:
+            if query["name"] in state["containers"]:
+                return self._json(409, {"message": "Conflict. The container name is already in use"})
+            container_id = f"id-{query['name']}"
+            state["containers"][query["name"]] = {"Id": container_id, "Running": False, "Config": body}
+            return self._json(201, {"Id": container_id, "Warnings": []})
+        if parts[0] == "containers":
+            container = next((c for n, c in state["containers"].items() if parts[1] in (n, c["Id"])), None)
+            if container is None:
+                return self._json(404, {"message": f"No such container: {parts[1]}"})
+            action = parts[2] if len(parts) > 2 else None
+            if method == "POST" and action == "start":
+                container["Running"] = True
+                return self._json(204, None)
+            if method == "POST" and action == "stop":
+                container["Running"] = False
+                return self._json(204, None)
+            if method == "GET" and action == "json":
+                return self._json(200, {"Id": container["Id"], "State": {"Running": container["Running"]}})
+            if method == "GET" and action == "logs":
+                frames = b"".join(struct.pack(">BxxxL", 1, len(line)) + line for line in (b"line one\n", b"line two\n"))
+                return self._raw(200, frames)
+            if method == "GET" and action == "stats":
+                return self._raw(200, b"".join(json.dumps(doc).encode() + b"\n" for doc in _stats_documents()))
+            if method == "DELETE":
+                state["containers"] = {n: c for n, c in state["containers"].items() if c is not container}
+                return self._json(204, None)
+        if parts[:2] == ["networks", "create"]:
+            if body["Name"] in state["networks"]:
+                return self._json(409, {"message": f"network with name {body['Name']} already exists"})
+            state["networks"][body["Name"]] = {"Name": body["Name"], "Containers": {}, "Labels": body.get("Labels") or {}}
+            return self._json(201, {"Id": body["Name"]})
+        if parts == ["networks"] and method == "GET":
+            wanted = dict(f.split("=", 1) for f in json.loads(query.get("filters", "{}")).get("label", []))
+            return self._json(200, [n for n in state["networks"].values()
+                                    if all(n["Labels"].get(k) == v for k, v in wanted.items())])
+        if parts[0] == "networks" and method == "DELETE":
+            if state["networks"].pop(parts[1], None) is None:
+                return self._json(404, {"message": "not found"})
+            return self._json(204, None)
+        if parts[0] == "networks" and method == "GET":
+            network = state["networks"].get(parts[1])
+            return self._json(200, network) if network else self._json(404, {"message": "not found"})
+        return self._json(404, {"message": "unsupported"})
+
+    def _json(self, status, payload):
+        self._raw(status, b"" if payload is None else json.dumps(payload).encode())
+
+    def _raw(self, status, data):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+    def address_string(self):
+        return "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _FakeEngineServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path):
+        super().__init__(path, _FakeEngineHandler)
+        self.state = {"containers": {}, "networks": {}}
+        self.connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+@pytest.fixture
+def engine_backend():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "docker.sock")
+    server = _FakeEngineServer(path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, EngineApiDockerBackend(DockerEngineClient(path))
+    server.shutdown()
+    server.server_close()
+    os.unlink(path)
+    os.rmdir(directory)
+
+
+@pytest.mark.unit
+class TestEngineApiBackend:
+
+    def test_01_container_lifecycle(self, engine_backend):
+        server, backend = engine_backend
+        container = DockerContainerManager("node1", 21161, "172.18.0.2", backend)
+
+        container_id = container.start("waku")
+        config = server.state["containers"]["node1"]["Config"]
+
+        assert container_id == "id-node1"
+        assert container.is_running()
+        assert config["HostConfig"]["PortBindings"]["21161/tcp"] == [{"HostPort": "21161"}]
+        assert config["NetworkingConfig"]["EndpointsConfig"]["waku"]["IPAMConfig"]["IPv4Address"] == "172.18.0.2"
+        assert "--nat=extip:172.18.0.2" in config["Cmd"]
+        assert container.get_logs() == "line one\nline two\n"
+
+        container.stop()
+        assert not container.is_running()
+        assert "node1" not in server.state["containers"]
+
+    def test_02_duplicate_container_raises(self, engine_backend):
+        _, backend = engine_backend
+        DockerContainerManager("node1", 21161, backend=backend).start()
+
+        with pytest.raises(RuntimeError, match="Failed to start node1"):
+            DockerContainerManager("node1", 21161, backend=backend).start()
+
+    def test_03_network_create_is_idempotent(self, engine_backend):
+        server, backend = engine_backend
+        network = DockerNetworkManager("waku", backend=backend)
+
+        network.create()
+        network.create()
+
+        assert network.get_network_info()[0]["Name"] == "waku"
+        assert network.list_containers() == []
+
+    def test_04_connection_is_kept_alive(self, engine_backend):
+        server, backend = engine_backend
+        container = DockerContainerManager("node1", 21161, backend=backend)
+        container.start()
+        for _ in range(10):
+            container.is_running()
+
+        assert server.connections == 1
+        assert backend.client.connections_opened == 1
+
+    def test_05_log_follower_wakes_on_matching_line(self, engine_backend):
+        _, backend = engine_backend
+        container = DockerContainerManager("node1", 21161, backend=backend)
+        container.start()
+        seen = []
+        follower = LogFollower(container, patterns={"ready": r"line two"})
+        follower.add_listener(seen.append)
+        follower.start()
+
+        event = follower.wait_for("ready", timeout=5, after=0)
+        follower.stop()
+
+        assert event is not None and event.line == "line two"
+        assert seen == ["line one", "line two"]
+
+    def test_06_resource_sampler_summarizes_stats_stream(self, engine_backend):
+        _, backend = engine_backend
+        container = DockerContainerManager("node1", 21161, backend=backend)
+        container.start()
+        sampler = ResourceSampler(interval=0)
+
+        sampler.add(container)
+        deadline = time.monotonic() + 5
+        while len(sampler.series["node1"]) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sampler.stop()
+        summary = sampler.summary()["node1"]
+
+        assert summary.samples == 3
+        assert summary.cpu_max == pytest.approx(20.0)
+        assert summary.memory_max == 6000
+        assert (summary.net_rx, summary.net_tx, summary.block_read) == (200, 100, 20)
+
+    def test_07_cleanup_removes_every_worker_network(self, engine_backend):
+        server, backend = engine_backend
+        for worker in ("gw0", "gw1"):
+            DockerManager(backend, namespace=ClusterNamespace.for_worker(worker)).setup_network()
+        DockerNetworkManager("unrelated", backend=backend).create()
+
+        DockerManager(backend, namespace=ClusterNamespace()).teardown(include_leftovers=False, all_workers=True)
+
+        assert sorted(server.state["networks"]) == ["unrelated"]
+
+    def test_08_incomplete_backend_fails_on_creation(self):
+        class ContainersOnly(DockerBackend):
+            def run_container(self, name, image, args, ports, network=None, ip=None, labels=None):
+                return "id"
+
+        class NoClose(LineStream):
+            def __iter__(self):
+                return iter(())
+
+        with pytest.raises(TypeError, match="abstract"):
+            ContainersOnly()
+        with pytest.raises(TypeError, match="abstract"):
+            NoClose()
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from utils.transport import WakuTransport
+from utils.waku_api import WakuNodeManager
+
+TOPIC = "/test/1/fake/proto"
+
+
+def _client(node):
+    return WakuNodeManager(node.port, WakuTransport(f"http://127.0.0.1:{node.port}"))
+
+
+@pytest.mark.unit
+class TestFakeWakuCluster:
+
+    def test_01_relay_between_bootstrapped_nodes(self, fake_cluster):
+        node1, node2 = (_client(n) for n in fake_cluster.create_nodes_with_bootstrap())
+        node1.subscribe_to_topic(TOPIC)
+        node2.subscribe_to_topic(TOPIC)
+
+        node1.publish_message(TOPIC, "hello")
+
+        assert node2.verify_message_received(TOPIC, "aGVsbG8=")
+        assert node2.peer_table(max_age=0).is_connected(fake_cluster.namespace.node_ip(0))
+        assert node1.get_node_info().enrUri.startswith("enr:")
+
+    def test_02_delay_and_loss_are_applied(self, fake_cluster):
+        fake_cluster.network.delay = 0.2
+        node1, node2 = (_client(n) for n in fake_cluster.create_nodes_with_bootstrap())
+        node2.subscribe_to_topic(TOPIC)
+
+        node1.publish_message(TOPIC, "late")
+        assert node2.get_messages(TOPIC) == []
+        time.sleep(0.4)
+        assert len(node2.get_messages(TOPIC)) == 1
+
+        fake_cluster.network.loss = 1.0
+        node1.publish_message(TOPIC, "lost")
+        time.sleep(0.4)
+        assert node2.get_messages(TOPIC) == []
+        assert fake_cluster.network.dropped >= 1
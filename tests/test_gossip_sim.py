@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from utils.gossip_sim import GossipSimulator
+from utils.test_helpers import wait_for_messages
+from utils.topology import TopologyBuilder
+from utils.validators import validate_waku_message
+from utils.waku_api import encode_payload
+
+TOPIC = "/test/1/sim/proto"
+
+
+@pytest.mark.unit
+class TestGossipSimulator:
+
+    def test_01_thousand_nodes_propagate_in_seconds(self):
+        started = time.perf_counter()
+        sim = GossipSimulator(1000, degree=10, realtime=False, seed=7)
+        messages = [sim.publish(i * 97 % 1000, TOPIC, "YQ==", at=i * 0.5) for i in range(5)]
+        sim.run()
+
+        assert time.perf_counter() - started < 10
+        for msg in messages:
+            stats = sim.propagation(msg)
+            assert stats.coverage == 1.0
+            assert 0 < stats.latency.p50 < stats.latency.max
+        assert all(len(sim.mesh_peers(i)) <= sim.mesh_high for i in range(sim.size))
+
+    def test_02_simulated_nodes_work_with_existing_helpers(self):
+        topology = TopologyBuilder(5, "chain").build()
+        sim = GossipSimulator.from_topology(topology, link_latency=(0.01, 0.01), seed=1)
+        first, last = sim.node(0), sim.node(4)
+        for node in sim.nodes:
+            node.subscribe_to_topic(TOPIC)
+
+        assert last.check_health()
+        assert sim.node(1).has_peer(first.node_id)
+        last.verify_peer_connection(sim.node(3).network_ip, timeout=1, poll_interval=0.1)
+
+        first.publish_message(TOPIC, "over four hops")
+        messages = wait_for_messages(lambda: last.get_messages(TOPIC), timeout=5, poll_interval=0.01)
+
+        validate_waku_message(messages[0], encode_payload("over four hops"), TOPIC)
+        assert sim.propagation(0).max_hops == 4
+
+    def test_03_nodes_below_mesh_low_are_topped_up_within_mesh_high(self):
+        # mesh_high == mesh_degree, so the first GRAFT pass leaves late nodes with saturated neighbors
+        params = dict(degree=8, mesh_degree=6, mesh_high=6, realtime=False, seed=3)
+        first_pass = GossipSimulator(300, mesh_low=0, **params)
+        sim = GossipSimulator(300, mesh_low=5, **params)
+
+        def undersized(s):
+            return [i for i in range(s.size) if len(s.mesh_peers(i)) < min(5, len(s.neighbors(i)))]
+
+        assert undersized(first_pass)
+        assert undersized(sim) == []
+        assert all(len(sim.mesh_peers(i)) <= sim.mesh_high for i in range(sim.size))
@@ -0,0 +1,80 @@
+import pytest
+
+from utils.inbox import MessageInbox, message_hash
+
+
+def _message(payload, timestamp=1_700_000_000_000_000_000):
+    return {"payload": payload, "contentTopic": "/test/1/inbox/proto", "version": 0, "timestamp": timestamp}
+
+
+class _DrainingCache:
+    """Mimics the nwaku relay cache, which empties on every read"""
+
+    def __init__(self):
+        self.pending = []
+
+    def __call__(self):
+        drained, self.pending = self.pending, []
+        return drained
+
+
+@pytest.mark.unit
+class TestMessageInbox:
+
+    def test_01_messages_survive_draining_reads(self):
+        cache = _DrainingCache()
+        inbox = MessageInbox(cache)
+        cache.pending = [_message("YQ=="), _message("Yg==")]
+
+        assert len(inbox.poll()) == 2
+        assert inbox.poll() == []
+        assert inbox.find("YQ==") is not None, "Message seen by an earlier poll should still be found"
+
+    def test_02_duplicates_are_counted_not_stored(self):
+        cache = _DrainingCache()
+        inbox = MessageInbox(cache)
+        cache.pending = [_message("YQ==")]
+        inbox.poll()
+        cache.pending = [_message("YQ==")]
+
+        assert inbox.poll() == []
+        assert len(inbox) == 1
+        assert inbox.duplicates == 1
+        assert inbox.seen_count(message_hash(_message("YQ=="))) == 2
+
+    def test_03_fifo_eviction_bounds_memory(self):
+        cache = _DrainingCache()
+        inbox = MessageInbox(cache, max_messages=3)
+        cache.pending = [_message(f"m{i}", timestamp=1_700_000_000_000_000_000 + i) for i in range(5)]
+        inbox.poll()
+
+        assert len(inbox) == 3
+        assert inbox.evicted == 2
+        assert inbox.find("m0") is None
+        assert inbox.find("m4") is not None
+
+    def test_04_lru_eviction_keeps_recently_read(self):
+        cache = _DrainingCache()
+        inbox = MessageInbox(cache, max_messages=2, eviction="lru")
+        cache.pending = [_message("m0", 1), _message("m1", 2)]
+        inbox.poll()
+        inbox.find("m0")
+        cache.pending = [_message("m2", 3)]
+        inbox.poll()
+
+        assert inbox.find("m0") is not None
+        assert inbox.find("m1") is None
+
+    def test_05_lru_expiry_reaches_entries_behind_a_recent_read(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr("utils.inbox.time.monotonic", lambda: clock[0])
+        cache = _DrainingCache()
+        inbox = MessageInbox(cache, max_age=10, eviction="lru")
+        cache.pending = [_message("m0", 1), _message("m1", 2)]
+        inbox.poll()
+        inbox.find("m0")  # m0 moves behind m1 in LRU order
+        clock[0] = 111.0
+        inbox.poll()
+
+        assert len(inbox) == 0
+        assert inbox.evicted == 2
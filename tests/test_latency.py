@@ -0,0 +1,24 @@
+import pytest
+
+from utils.config import FAKE_CACHE_SIZE
+from utils.latency import PropagationTracker
+
+TOPIC = "/test/1/latency/proto"
+
+
+@pytest.mark.unit
+class TestPropagationTracker:
+
+    def test_01_arrivals_are_timed_while_publishing(self, fake_nodes):
+        node1, node2 = fake_nodes
+        tracker = PropagationTracker(node1, [node2], TOPIC, poll_interval=0.01)
+        tracker.subscribe()
+        count = FAKE_CACHE_SIZE * 2
+
+        tracker.publish(count=count, interval=0.005)
+        assert tracker.wait_for_arrivals(timeout=10)
+        report, = tracker.report().nodes.values()
+
+        # Polling only after the loop would overflow the relay cache and charge the loop's length to each message
+        assert report.received == count and report.lost == 0
+        assert report.latency.p50 < count * 0.005 / 2
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils.log_analyzer import TraceLogAnalyzer
+from utils.node_keys import NodeKey
+
+PEER_1 = "16Uiu2HAmPeerAaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+PEER_2 = "16Uiu2HAmPeerBbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb"
+PEER_3 = "16Uiu2HAmPeerCccccccccccccccccccccccccccccccccccccc"
+
+NODE1_LOG = f"""\
+INF 2024-01-10 12:00:00.000+00:00 Node setup complete                        topics="waku node"
+TRC 2024-01-10 12:00:01.000+00:00 publish message                            topics="waku relay" msg_hash=0xAB12
+TRC 2024-01-10 12:00:01.001+00:00 forwarding message                         topics="libp2p gossipsub" peer={PEER_2} msg_hash=0xab12
+TRC 2024-01-10 12:00:01.002+00:00 forwarding message                         topics="libp2p gossipsub" peer={PEER_3} msg_hash=0xab12
+"""
+
+NODE2_LOG = f"""\
+TRC 2024-01-10 12:00:01.050+00:00 received message                           topics="waku relay" from={PEER_1} msg_hash=0xab12
+TRC 2024-01-10 12:00:01.060+00:00 validated message                          topics="waku relay" msg_hash=0xab12
+DBG 2024-01-10 12:00:02.000+00:00 unrelated line without a hash              topics="waku node"
+"""
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    analyzer = TraceLogAnalyzer()
+    for name, text in (("node1", NODE1_LOG), ("node2", NODE2_LOG)):
+        path = tmp_path / f"{name}.log"
+        path.write_text(text)
+        analyzer.add_log(name, str(path))
+    return analyzer
+
+
+@pytest.mark.unit
+class TestTraceLogAnalyzer:
+
+    def test_01_events_are_indexed_by_hash(self, analyzer):
+        kinds = [(e.node, e.kind) for e in analyzer.events("0xAB12")]
+
+        assert kinds == [("node1", "publish"), ("node1", "forward"), ("node1", "forward"),
+                         ("node2", "receive"), ("node2", "receive")]
+        assert analyzer.lines_indexed == 5
+
+    def test_02_arrival_latency_and_fan_out(self, analyzer):
+        assert analyzer.arrival_latencies("0xab12") == {"node2": pytest.approx(0.05)}
+        assert analyzer.fan_out("0xab12") == {"node1": 2}
+
+        report = analyzer.report()
+        assert report.messages == 1
+        assert report.latency.max == pytest.approx(0.05)
+
+    def test_03_hop_latency_pairs_forward_and_receive(self, analyzer):
+        assert analyzer.hop_latencies("0xab12") == {}, "Peers cannot be placed without a peer map"
+
+        analyzer.peer_nodes.update({PEER_1: "node1", PEER_2: "node2", PEER_3: "node3"})
+
+        assert analyzer.hop_latencies("0xab12") == {("node1", "node2"): pytest.approx(0.049)}
+        assert analyzer.report().hop_latency.max == pytest.approx(0.049)
+
+    def test_04_peers_are_mapped_from_node_keys(self):
+        analyzer = TraceLogAnalyzer()
+
+        analyzer.map_peers([SimpleNamespace(name="node1", peer_id=PEER_1), SimpleNamespace(name="node2", peer_id=None)])
+
+        assert analyzer.peer_nodes == {PEER_1: "node1", NodeKey.from_seed("node2").peer_id: "node2"}
@@ -0,0 +1,33 @@
+import pytest
+
+from utils.log_collector import LogCollector
+
+
+@pytest.fixture
+def collector(tmp_path):
+    collector = LogCollector("node1", directory=str(tmp_path), max_lines=3)
+    yield collector
+    collector.close()
+
+
+@pytest.mark.unit
+class TestLogCollector:
+
+    def test_01_cursor_reads_only_the_window(self, collector):
+        collector("before")
+        start = collector.cursor()
+        collector("during one")
+        collector("during two")
+        end = collector.cursor()
+        collector("after")
+
+        assert collector.read(since=start, until=end) == ["during one", "during two"]
+        assert collector.read(since=end) == ["after"]
+
+    def test_02_window_older_than_buffer_is_read_from_disk(self, collector):
+        start = collector.cursor()
+        for i in range(10):
+            collector(f"line {i}")
+
+        assert collector.tail(50) == ["line 7", "line 8", "line 9"]
+        assert collector.read(since=start) == [f"line {i}" for i in range(10)]
@@ -0,0 +1,47 @@
+import re
+
+import pytest
+
+from utils.config import LOG_EVENT_PATTERNS
+
+TOPIC = "/test/1/log-events/proto"
+PEER = "16Uiu2HAmPeerAaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+
+# nwaku v0.24.0 textlines output (--log-level=TRACE) around startup, dialing and relay, with the
+# events LOG_EVENT_PATTERNS must report for each line
+NWAKU_LOG = [
+    ('INF 2024-01-10 12:00:00.100+00:00 Starting REST HTTP server                  topics="waku node rest" '
+     'url=http://0.0.0.0:8645/', {"ready"}),
+    ('INF 2024-01-10 12:00:00.200+00:00 Node setup complete                        topics="wakunode main"', {"ready"}),
+    ('INF 2024-01-10 12:00:00.300+00:00 Setting up node                            topics="wakunode main"', set()),
+    (f'DBG 2024-01-10 12:00:01.000+00:00 Peer connected                             topics="waku node peer_manager" '
+     f'peerId={PEER} direction=Outbound', {"peer_connected"}),
+    (f'DBG 2024-01-10 12:00:05.000+00:00 Peer disconnected                          topics="waku node peer_manager" '
+     f'peerId={PEER}', set()),
+    (f'TRC 2024-01-10 12:00:02.000+00:00 waku.relay received                        topics="waku node" '
+     f'peerId={PEER} pubsubTopic=/waku/2/default-waku/proto msg_hash=0xab12', {"relay_message"}),
+    ('TRC 2024-01-10 12:00:02.001+00:00 forwarding message                         topics="libp2p gossipsub" '
+     'msg_hash=0xab12', set()),
+]
+
+
+def _events(line):
+    return {name for name, pattern in LOG_EVENT_PATTERNS.items() if re.search(pattern, line)}
+
+
+@pytest.mark.unit
+class TestLogEventPatterns:
+
+    @pytest.mark.parametrize("line,expected", NWAKU_LOG, ids=[line[34:60].strip() for line, _ in NWAKU_LOG])
+    def test_01_nwaku_lines_map_to_events(self, line, expected):
+        assert _events(line) == expected
+
+    def test_02_fake_nodes_emit_every_event(self, fake_cluster, fake_nodes):
+        node1, node2 = fake_nodes
+        node1.subscribe_to_topic(TOPIC)
+        node2.subscribe_to_topic(TOPIC)
+        node1.publish_message(TOPIC, "hello")
+        assert node2.verify_message_received(TOPIC, "aGVsbG8=")
+
+        seen = set().union(*(_events(line) for node in fake_cluster.containers.values() for line in node.logs))
+        assert seen == set(LOG_EVENT_PATTERNS)
@@ -0,0 +1,33 @@
+import math
+
+import pytest
+
+from utils.metrics import LatencySummary, histogram, percentile
+
+
+@pytest.mark.unit
+class TestMetrics:
+
+    def test_01_nearest_rank_percentile(self):
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile(values, 100) == 100.0
+        assert percentile(values, 0) == 1.0
+        assert percentile([7.0], 95) == 7.0
+        assert percentile([], 50) == 0.0
+
+    def test_02_latency_summary(self):
+        summary = LatencySummary.from_values([0.3, 0.1, 0.2, 0.4])
+
+        assert (summary.count, summary.p50, summary.p95, summary.max) == (4, 0.2, 0.4, 0.4)
+        assert summary.mean == pytest.approx(0.25)
+        assert summary.as_dict()["p99"] == 0.4
+        assert str(summary) == "n=4 p50=200.0ms p95=400.0ms p99=400.0ms max=400.0ms"
+        assert LatencySummary.from_values(iter([])) == LatencySummary()
+
+    def test_03_histogram_buckets(self):
+        counts = dict(histogram([0.0005, 0.001, 0.003, 20.0], bounds=(0.001, 0.01)))
+
+        assert counts == {0.001: 2, 0.01: 1, math.inf: 1}
@@ -0,0 +1,86 @@
+import pytest
+
+from utils.docker_manager import DockerContainerManager, DockerManager
+from utils.fake_waku import FakeRelayNetwork, FakeWakuNode
+from utils.node_keys import NodeKey, decode_enr, keccak256, same_endpoint
+from utils.topology import ClusterNamespace
+
+# Example record from EIP-778
+EIP778_PRIVATE_KEY = "b71c71a67e1177ad4e901695e1b4b9ee17ae16c6668d313eac2f96dbcda3f291"
+EIP778_ENR = ("enr:-IS4QHCYrYZbAKWCBRlAy5zzaDZXJBGkcnh4MHcBFZntXNFrdvJjX04jRzjzCBOonrkTfj499SZuOh8R33Ls8RRcy5w"
+              "BgmlkgnY0gmlwhH8AAAGJc2VjcDI1NmsxoQPKY0yuDUmstAHYpMa2_oxVtw0RW_QAdpzBQA8yWM0xOIN1ZHCCdl8")
+
+
+@pytest.mark.unit
+class TestNodeKeys:
+
+    def test_01_keccak256_empty_input(self):
+        assert keccak256(b"").hex() == "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+
+    def test_02_enr_matches_eip778_example(self):
+        key = NodeKey.from_hex(EIP778_PRIVATE_KEY)
+
+        assert key.enr(ip="127.0.0.1", udp_port=30303) == EIP778_ENR
+
+    def test_03_peer_id_is_secp256k1_identity_multihash(self):
+        key = NodeKey.from_hex(EIP778_PRIVATE_KEY)
+
+        assert key.peer_id.startswith("16Uiu2HA"), f"Unexpected peer ID format: {key.peer_id}"
+
+    def test_04_seeded_keys_are_deterministic(self):
+        assert NodeKey.from_seed("node1").private_key_hex == NodeKey.from_seed("node1").private_key_hex
+        assert NodeKey.from_seed("node1").peer_id != NodeKey.from_seed("node2").peer_id
+
+    def test_05_enr_decodes_and_compares_by_endpoint(self):
+        pairs = decode_enr(EIP778_ENR)
+        key = NodeKey.from_hex(EIP778_PRIVATE_KEY)
+
+        assert pairs["ip"] == bytes([127, 0, 0, 1]) and int.from_bytes(pairs["udp"], "big") == 30303
+        assert pairs["secp256k1"] == key.public_key
+        assert same_endpoint(EIP778_ENR, key.enr(ip="127.0.0.1", tcp_port=None, seq=9))
+        assert not same_endpoint(EIP778_ENR, key.enr(ip="127.0.0.2"))
+
+
+@pytest.fixture
+def running_pair():
+    """Fake node1 started with whatever key the test picks, and a healthy fake node2"""
+    network = FakeRelayNetwork()
+    started = []
+
+    def _start(node1_key):
+        started.extend([FakeWakuNode(network, "node1", "172.18.0.2", node_key=node1_key).start(),
+                        FakeWakuNode(network, "node2", "172.18.0.3").start()])
+        return started
+
+    yield _start
+    for node in started:
+        node.stop()
+
+
+@pytest.mark.unit
+class TestBootstrapIdentity:
+
+    def _check(self, backend, fake1, fake2):
+        manager = DockerManager(backend, namespace=ClusterNamespace())
+        node1 = DockerContainerManager("node1", fake1.port, "172.18.0.2", backend, NodeKey.from_seed("node1"))
+        node2 = DockerContainerManager("node2", fake2.port, "172.18.0.3", backend, NodeKey.from_seed("node2"))
+        manager._check_bootstrap_identity(node1, node2, node1.enr_uri)
+        return node1
+
+    def test_01_matching_node_keeps_precomputed_bootstrap(self, memory_backend, running_pair):
+        fake1, fake2 = running_pair(NodeKey.from_seed("node1"))
+
+        node1 = self._check(memory_backend, fake1, fake2)
+
+        assert memory_backend.started == []
+        assert node1.peer_id == fake1.peer_id
+
+    def test_02_mismatch_restarts_node2_from_runtime_enr(self, memory_backend, running_pair):
+        fake1, fake2 = running_pair(NodeKey.from_seed("something else"))
+
+        node1 = self._check(memory_backend, fake1, fake2)
+
+        assert memory_backend.started == ["node2"]
+        assert f"--discv5-bootstrap-node={fake1.enr_uri}" in memory_backend.args["node2"]
+        assert node1.peer_id is None, "A key the node did not apply must not be trusted for its peer ID"
+
@@ -0,0 +1,41 @@
+import base64
+import json
+
+import pytest
+
+from utils.payload_sweep import payload_size_sweep, sweep_sizes
+from utils.waku_api import build_publish_body, encode_payload
+
+TOPIC = "/test/1/payload/proto"
+
+
+@pytest.mark.unit
+class TestBinaryPublish:
+
+    def test_01_publish_body_matches_json(self):
+        payload = bytes(range(256))
+        body = build_publish_body('/quoted"topic/1/x/proto', encode_payload(memoryview(payload)))
+
+        assert json.loads(body) == {"payload": base64.b64encode(payload).decode(),
+                                    "contentTopic": '/quoted"topic/1/x/proto'}
+        assert encode_payload("héllo") == base64.b64encode("héllo".encode()).decode()
+
+    def test_02_bytes_arrive_unchanged(self, fake_nodes):
+        node1, node2 = fake_nodes
+        node2.subscribe_to_topic(TOPIC)
+        payload = bytearray(b"\x00\xff" * 2048)
+
+        node1.publish_bytes(TOPIC, memoryview(payload))
+        node1.publish_message(TOPIC, "text")
+
+        received = [base64.b64decode(m["payload"]) for m in node2.get_messages(TOPIC)]
+        assert received == [bytes(payload), b"text"]
+
+    def test_03_sweep_reports_cpu_per_mb(self, fake_nodes):
+        assert sweep_sizes(1024, 5000) == [1024, 2048, 4096, 5000]
+
+        report = payload_size_sweep(fake_nodes[0], TOPIC, [1024, 65536], messages_per_size=3)
+
+        assert [p.size for p in report.points] == [1024, 65536]
+        assert all(p.failed == 0 and p.cpu_per_mb > 0 for p in report.points)
+        assert "CPU ms/MB" in str(report)
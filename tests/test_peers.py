@@ -0,0 +1,45 @@
+import pytest
+
+from utils.peers import RELAY_PROTOCOL, PeerTable
+
+PEER_ID = "16Uiu2HAmPeerAaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa"
+PEERS = [
+    {"multiaddr": f"/ip4/172.18.0.2/tcp/21162/p2p/{PEER_ID}",
+     "protocols": [{"protocol": RELAY_PROTOCOL, "connected": True}]},
+    {"multiaddr": "/ip4/172.18.0.9/tcp/21162/p2p/16Uiu2HAmPeerBbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbbb",
+     "protocols": [{"protocol": RELAY_PROTOCOL, "connected": False}]},
+]
+
+
+@pytest.mark.unit
+class TestPeerTable:
+
+    def test_01_lookups_by_id_ip_and_fragment(self):
+        table = PeerTable(PEERS, fetched_at=100.0)
+
+        assert table.has(PEER_ID) and table.has("172.18.0.9") and table.has("tcp/21162")
+        assert not table.has("172.18.0.3")
+        assert table.is_connected("172.18.0.2") and table.is_connected(PEER_ID)
+        assert not table.is_connected("172.18.0.9"), "Known but not connected over relay"
+        assert len(table) == 2 and not table.is_fresh(ttl=1.0)
+
+    def test_02_node_reuses_table_within_ttl(self, fake_cluster, fake_nodes):
+        node1, node2 = fake_nodes
+        node2.peer_table_ttl = 60.0
+        requests_before = node2.transport.stats.requests
+
+        assert node2.has_peer(fake_cluster.namespace.node_ip(0))
+        assert node2.has_peer(node1.get_node_info().listenAddresses[0].split("/p2p/")[-1])
+        assert node2.transport.stats.requests == requests_before + 1, "Second lookup should use the cached table"
+
+        node2.peer_table(max_age=0)
+        assert node2.transport.stats.requests == requests_before + 2
+
+    def test_03_connecting_peers_drops_the_cached_table(self, fake_cluster, fake_nodes):
+        node1, node2 = fake_nodes
+        node1.peer_table_ttl = 60.0
+        extra = fake_cluster._start("node3", fake_cluster.namespace.node_ip(2), [])
+
+        assert not node1.has_peer(extra.peer_id)
+        node1.connect_peers([extra.multiaddr])
+        assert node1.has_peer(extra.peer_id)
@@ -0,0 +1,39 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.poller import get_scheduler
+
+TOPIC = "/test/1/poller/proto"
+
+
+@pytest.mark.unit
+class TestSharedPolling:
+
+    def test_01_concurrent_waiters_on_one_node_share_polls(self, fake_nodes):
+        node1, node2 = fake_nodes
+        node2.subscribe_to_topic(TOPIC)
+        key = node2.message_source(TOPIC)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            waiters = [pool.submit(node2.wait_for_messages, TOPIC, 1, 5) for _ in range(2)]
+            time.sleep(0.3)
+            assert get_scheduler().poll_count(key) > 0, "Waiters should poll through the shared scheduler"
+            node1.publish_message(TOPIC, "for both")
+            results = [w.result() for w in waiters]
+
+        # The relay cache empties on every read, so both waiters seeing the message means one poll served both
+        assert results[0] == results[1] and len(results[0]) == 1
+
+    def test_02_waits_count_messages_across_polls_and_waiters(self, fake_nodes):
+        node1, node2 = fake_nodes
+        node2.subscribe_to_topic(TOPIC)
+
+        node1.publish_message(TOPIC, "first")
+        assert len(node2.wait_for_messages(TOPIC, 1, 5)) == 1
+        node1.publish_message(TOPIC, "second")
+
+        # The first message was drained from the node by the earlier wait but is still counted
+        assert len(node2.wait_for_messages(TOPIC, 2, 5)) == 2
+        assert node2.wait_for_message(TOPIC, lambda m: m["payload"] == "Zmlyc3Q=", 5)
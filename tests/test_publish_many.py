@@ -0,0 +1,72 @@
+import base64
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.transport import WakuTransport
+from utils.waku_api import WakuNodeManager, encode_payload
+
+TOPIC = "/test/1/publish/proto"
+
+
+class _RejectingHandler(BaseHTTPRequestHandler):
+    """Node without relay, which turns every publish away"""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = b"Relay protocol is not mounted"
+        self.send_response(503)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.mark.unit
+class TestPublishMany:
+
+    def test_01_every_payload_is_published_in_order(self, fake_nodes):
+        node1, node2 = fake_nodes
+        node2.subscribe_to_topic(TOPIC)
+        texts = [f"message {i}" for i in range(40)]
+
+        report = node1.publish_many(TOPIC, (t for t in texts), concurrency=4)
+
+        assert report.sent == 40 and not report.failed
+        assert [r.index for r in report.results] == list(range(40))
+        assert [r.payload for r in report.results] == [encode_payload(t) for t in texts]
+        assert report.msgs_per_sec > 0 and report.latency.count == 40
+        received = {base64.b64decode(m["payload"]).decode() for m in node2.get_messages(TOPIC)}
+        assert received == set(texts)
+
+    def test_02_pre_encoded_payloads_and_failures(self, fake_cluster, fake_nodes):
+        node1, _ = fake_nodes
+
+        encoded = node1.publish_many(TOPIC, ["aGk="], encoded=True)
+        assert encoded.results[0].payload == "aGk=" and encoded.results[0].ok
+
+        fake_cluster.containers[fake_cluster.namespace.container_name("node1")].stop()
+        # A fresh client, so no pooled keep-alive connection outlives the stopped server
+        stopped = WakuNodeManager(node1.port, WakuTransport(node1.base_url))
+        report = stopped.publish_many(TOPIC, ["lost", "also lost"], concurrency=2)
+
+        assert len(report.failed) == 2
+        assert all(r.status_code is None and r.error for r in report.failed)
+        assert report.msgs_per_sec == 0.0
+
+    def test_03_rejected_publish_keeps_status_and_body(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _RejectingHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            node = WakuNodeManager(server.server_port)
+            report = node.publish_many(TOPIC, ["aGk="], encoded=True)
+        finally:
+            server.shutdown()
+
+        rejected, = report.results
+        assert (rejected.ok, rejected.status_code) == (False, 503)
+        assert rejected.error == "Relay protocol is not mounted"
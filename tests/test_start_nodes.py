@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from utils.docker_backend import DockerError
+from utils.docker_manager import DockerManager, NodeSpec
+from utils.fake_waku import FakeRelayNetwork, FakeWakuNode
+from utils.topology import ClusterNamespace
+
+LAUNCH_TIME = 0.3
+
+
+@pytest.fixture
+def slow_backend(memory_backend):
+    """Takes LAUNCH_TIME to create each container, fails the names in .failing and counts overlapping launches"""
+    backend = memory_backend
+    backend.failing, backend.active, backend.max_active = set(), 0, 0
+    lock = threading.Lock()
+    run_container = backend.run_container
+
+    def _run(name, *args, **kwargs):
+        with lock:
+            backend.active += 1
+            backend.max_active = max(backend.max_active, backend.active)
+        try:
+            time.sleep(LAUNCH_TIME)
+            if name in backend.failing:
+                raise DockerError(f"Conflict: name {name} is already in use", 409)
+            return run_container(name, *args, **kwargs)
+        finally:
+            with lock:
+                backend.active -= 1
+
+    backend.run_container = _run
+    return backend
+
+
+@pytest.fixture
+def rest_nodes():
+    network = FakeRelayNetwork()
+    nodes = [FakeWakuNode(network, f"node{i + 1}", f"172.18.0.{i + 2}").start() for i in range(3)]
+    yield nodes
+    for node in nodes:
+        node.stop()
+
+
+def _specs(nodes):
+    return [NodeSpec(node.name, node.port, node.network_ip) for node in nodes]
+
+
+@pytest.mark.unit
+class TestStartNodes:
+
+    def test_01_nodes_start_concurrently_with_timings(self, rest_nodes, slow_backend):
+        backend = slow_backend
+        manager = DockerManager(backend, namespace=ClusterNamespace())
+
+        started = time.monotonic()
+        timings = manager.start_nodes(_specs(rest_nodes), poll_interval=0.05)
+
+        assert time.monotonic() - started < LAUNCH_TIME * len(rest_nodes)
+        assert backend.max_active == len(rest_nodes)
+        assert sorted(timings) == sorted(node.name for node in rest_nodes)
+        for timing in timings.values():
+            assert timing.error is None
+            assert LAUNCH_TIME <= timing.created <= timing.running <= timing.rest_ready
+
+    def test_02_failing_spec_is_reported_after_the_others_start(self, rest_nodes, slow_backend):
+        backend = slow_backend
+        backend.failing.add("node2")
+        manager = DockerManager(backend, namespace=ClusterNamespace())
+
+        with pytest.raises(RuntimeError, match="node2") as excinfo:
+            manager.start_nodes(_specs(rest_nodes), poll_interval=0.05)
+
+        assert "node1" not in str(excinfo.value) and "node3" not in str(excinfo.value)
+        assert sorted(backend.started) == ["node1", "node3"]
+
+    def test_03_no_specs_start_nothing(self, memory_backend):
+        manager = DockerManager(memory_backend, namespace=ClusterNamespace())
+
+        assert manager.start_nodes([]) == {}
+        assert memory_backend.started == []
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from utils.waku_api import encode_payload
+
+TOPIC = "/test/1/store/proto"
+OTHER_TOPIC = "/test/1/other/proto"
+
+
+@pytest.fixture
+def history(fake_nodes):
+    """250 messages on TOPIC and 10 on OTHER_TOPIC, published on node1; returns mid-run timestamp too"""
+    node1, node2 = fake_nodes
+    for i in range(250):
+        node1.publish_message(TOPIC, f"message {i}")
+        if i == 124:
+            middle = time.time_ns()
+        if i % 25 == 0:
+            node1.publish_message(OTHER_TOPIC, f"other {i}")
+    return node2, middle
+
+
+@pytest.mark.unit
+class TestStoreQuery:
+
+    def test_01_walks_every_page_in_order(self, history):
+        node, _ = history
+        query = node.query_store(TOPIC)
+
+        payloads = [m["payload"] for m in query]
+
+        assert payloads == [encode_payload(f"message {i}") for i in range(250)]
+        assert query.pages_fetched == 3
+
+    def test_02_time_range_topics_and_order(self, history):
+        node, middle = history
+
+        later = list(node.query_store(TOPIC, start_time=middle))
+        assert [m["payload"] for m in later] == [encode_payload(f"message {i}") for i in range(125, 250)]
+
+        both = node.query_store([TOPIC, OTHER_TOPIC], end_time=middle, page_size=40, prefetch=False)
+        assert sum(1 for _ in both) == 125 + 5
+        assert both.pages_fetched == 4
+
+        newest = next(iter(node.query_store(TOPIC, ascending=False)))
+        assert newest["payload"] == encode_payload("message 249")
+
+    def test_03_prefetches_next_page_and_stops_early(self, history):
+        node, _ = history
+        query = node.query_store(TOPIC)
+        pages = query.pages()
+
+        next(pages)
+        deadline = time.monotonic() + 5
+        while query.pages_fetched < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert query.pages_fetched == 2  # page two arrived before it was asked for
+        pages.close()
+
+        assert query.missing([encode_payload("message 3"), encode_payload("never sent")]) == {
+            encode_payload("never sent")
+        }
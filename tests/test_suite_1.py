@@ -1,7 +1,6 @@
 import pytest
 import base64
-from utils.config import CONTENT_TOPIC, MESSAGE_TIMEOUT, POLL_INTERVAL
-from utils.test_helpers import wait_for_specific_message
+from utils.config import CONTENT_TOPIC, MESSAGE_TIMEOUT
 from utils.models import NodeInfo
 from utils.validators import validate_waku_message
 
@@ -41,11 +40,10 @@ class TestBasicNodeOperation:
         
         published_payload = base64.b64encode(message_text.encode('utf-8')).decode('utf-8')
         
-        found_message_data = wait_for_specific_message(
-            lambda: subscribed_node.get_messages(CONTENT_TOPIC),
+        found_message_data = subscribed_node.wait_for_message(
+            CONTENT_TOPIC,
             lambda msg: msg.get("payload") == published_payload,
-            timeout=MESSAGE_TIMEOUT, 
-            poll_interval=POLL_INTERVAL  
+            timeout=MESSAGE_TIMEOUT
         )
 
         waku_message = validate_waku_message(
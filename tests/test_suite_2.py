@@ -1,11 +1,14 @@
 import pytest
 import json
 import base64
+import logging
 
-from utils.config import CONTENT_TOPIC, MESSAGE_TIMEOUT, POLL_INTERVAL
-from utils.test_helpers import wait_for_messages
+from utils.config import CONTENT_TOPIC, MESSAGE_TIMEOUT
+from utils.load_generator import ConstantRate
 from utils.validators import validate_waku_message
 
+logger = logging.getLogger(__name__)
+
 class TestInterNodeConnection:
     
     @pytest.mark.dependency(name="peer_connection")
@@ -28,11 +31,10 @@ class TestInterNodeConnection:
         
         published_payload = base64.b64encode(message_text.encode('utf-8')).decode('utf-8')
         
-        messages = wait_for_messages(
-            lambda: node2_api.get_messages(CONTENT_TOPIC),
+        messages = node2_api.wait_for_messages(
+            CONTENT_TOPIC,
             expected_count=1,
-            timeout=MESSAGE_TIMEOUT,
-            poll_interval=POLL_INTERVAL
+            timeout=MESSAGE_TIMEOUT
         )
         
         waku_message = validate_waku_message(
@@ -43,5 +45,26 @@ class TestInterNodeConnection:
         )
         
         assert waku_message.version == 0
+
+
+    @pytest.mark.slow
+    @pytest.mark.dependency(depends=["peer_connection"])
+    def test_03_measure_propagation_latency(self, propagation_tracker):
+        propagation_tracker.publish(count=20, interval=0.05)
+        
+        assert propagation_tracker.wait_for_arrivals(timeout=MESSAGE_TIMEOUT), "Not all messages were relayed"
+        
+        report = propagation_tracker.report()
+        logger.info(report)
+        for node_report in report.nodes.values():
+            assert node_report.lost == 0, f"{node_report.node} lost {node_report.lost} message(s)"
+            assert node_report.latency.p99 < MESSAGE_TIMEOUT
+
+    @pytest.mark.slow
+    @pytest.mark.dependency(depends=["peer_connection"])
+    def test_04_sustain_open_loop_publish_rate(self, load_generator):
+        report = load_generator(ConstantRate(20)).run(duration=5)
         
-     
\ No newline at end of file
+        assert not report.failed, f"{len(report.failed)} publish(es) failed"
+        assert report.throughput > 15, f"Delivered only {report.throughput:.1f} msg/s of 20"
+        assert report.corrected_latency.p99 < MESSAGE_TIMEOUT
@@ -0,0 +1,44 @@
+import pytest
+
+from utils.config import MANAGED_LABEL, WORKER_LABEL
+from utils.docker_backend import DockerError
+from utils.docker_manager import DockerManager
+from utils.topology import ClusterNamespace
+
+
+def _leftover(backend, name, worker):
+    backend.containers[name] = {"id": f"old-{name}", "name": name, "running": True,
+                                "labels": {MANAGED_LABEL: "true", WORKER_LABEL: worker}}
+
+
+@pytest.mark.unit
+class TestTeardown:
+
+    def test_01_report_lists_started_and_leftover_containers(self, memory_backend):
+        manager = DockerManager(memory_backend, namespace=ClusterNamespace.for_worker("gw0"))
+        manager.create_node1()
+        _leftover(memory_backend, "gw0-stale", "gw0")
+        _leftover(memory_backend, "gw1-node1", "gw1")
+
+        report = manager.teardown(grace_period=0, remove_network=False)
+
+        assert report.removed == ["gw0-node1", "gw0-stale"]
+        assert report.errors == {} and report.duration >= 0
+        assert list(memory_backend.containers) == ["gw1-node1"], "Other workers' containers are left alone"
+        assert manager.containers == {}
+
+    def test_02_failures_are_reported_per_container(self, memory_backend):
+        manager = DockerManager(memory_backend, namespace=ClusterNamespace())
+        _leftover(memory_backend, "node1", "main")
+        _leftover(memory_backend, "node2", "main")
+
+        def remove_container(name, force=False):
+            if name == "node2":
+                raise DockerError("removal of container node2 is already in progress")
+            memory_backend.containers.pop(name)
+
+        memory_backend.remove_container = remove_container
+        report = manager.teardown(grace_period=1, remove_network=False, all_workers=True)
+
+        assert report.removed == ["node1"]
+        assert report.errors == {"node2": "removal of container node2 is already in progress"}
@@ -0,0 +1,100 @@
+import pytest
+
+from utils.docker_manager import DockerManager
+from utils.fake_waku import FakeRelayNetwork, FakeWakuNode
+from utils.topology import ClusterNamespace, TopologyBuilder
+
+
+@pytest.mark.unit
+class TestTopologyBuilder:
+
+    def test_01_layouts_bootstrap_backwards(self):
+        star = TopologyBuilder(4, "star").build()
+        chain = TopologyBuilder(4, "chain").build()
+        ring = TopologyBuilder(4, "ring").build()
+
+        assert [n.bootstrap for n in star.nodes] == [[], ["node1"], ["node1"], ["node1"]]
+        assert [n.bootstrap for n in chain.nodes] == [[], ["node1"], ["node2"], ["node3"]]
+        assert ring["node4"].dial == ["node1"] and not any(n.dial for n in chain.nodes)
+        assert len(ring.edges) == 4 and ("node1", "node4") in ring.edges
+
+    def test_02_mesh_is_seeded_and_bounded_by_degree(self):
+        mesh = TopologyBuilder(8, "mesh", degree=3, seed=5).build()
+
+        assert mesh.edges == TopologyBuilder(8, "mesh", degree=3, seed=5).build().edges
+        for node in mesh.nodes:
+            assert len(node.bootstrap) == min(3, node.index)
+            assert all(mesh[peer].index < node.index for peer in node.bootstrap)
+
+    def test_03_addresses_and_ports_are_allocated_per_node(self):
+        topology = TopologyBuilder(3, subnet="10.1.0.0/29", base_port=30000, port_stride=10).build()
+
+        assert topology.gateway == "10.1.0.1"
+        assert [n.ip for n in topology.nodes] == ["10.1.0.2", "10.1.0.3", "10.1.0.4"]
+        assert [n.port for n in topology.nodes] == [30000, 30010, 30020]
+        with pytest.raises(ValueError, match="too small"):
+            TopologyBuilder(7, subnet="10.1.0.0/29").build()
+        with pytest.raises(ValueError, match="65535"):
+            TopologyBuilder(3, base_port=65520, port_stride=10).build()
+        with pytest.raises(ValueError, match="Port stride"):
+            TopologyBuilder(3, port_stride=2)
+
+    def test_04_waves_follow_bootstrap_depth(self):
+        star = TopologyBuilder(4, "star").build()
+        ring = TopologyBuilder(3, "ring").build()
+
+        assert [[n.name for n in wave] for wave in star.waves()] == [["node1"], ["node2", "node3", "node4"]]
+        assert [[n.name for n in wave] for wave in ring.waves()] == [["node1"], ["node2"], ["node3"]]
+
+    def test_05_topology_starts_in_waves_from_runtime_enrs(self, memory_backend):
+        topology = TopologyBuilder(3, "ring").build()
+        network = FakeRelayNetwork()
+        fakes = {n.name: FakeWakuNode(network, n.name, n.ip).start() for n in topology.nodes}
+        try:
+            for node in topology.nodes:
+                node.port = fakes[node.name].port
+            manager = DockerManager(memory_backend, namespace=ClusterNamespace())
+
+            manager.start_topology(topology, precompute_enrs=False)
+
+            assert memory_backend.started == ["node1", "node2", "node3"]
+            assert f"--discv5-bootstrap-node={fakes['node1'].enr_uri}" in memory_backend.args["node2"]
+            assert f"--discv5-bootstrap-node={fakes['node2'].enr_uri}" in memory_backend.args["node3"]
+            assert fakes["node1"].peer_id in fakes["node3"].peers, "The ring's closing edge should be dialled"
+        finally:
+            for fake in fakes.values():
+                fake.stop()
+
+
+@pytest.mark.unit
+class TestClusterNamespace:
+
+    def test_01_default_namespace_matches_fixed_cluster(self, monkeypatch):
+        monkeypatch.delenv("PYTEST_XDIST_WORKER", raising=False)
+        namespace = ClusterNamespace.for_worker()
+
+        assert namespace.network_name == "waku"
+        assert (namespace.node_ip(0), namespace.node_ip(1)) == ("172.18.0.2", "172.18.0.3")
+        assert (namespace.node_port(0), namespace.node_port(1)) == (21161, 21261)
+        assert namespace.container_name("node1") == "node1"
+
+    def test_02_workers_do_not_collide(self):
+        first, second = ClusterNamespace.for_worker("gw0"), ClusterNamespace.for_worker("gw1")
+
+        assert first.network_name != second.network_name
+        assert first.subnet != second.subnet
+        assert first.container_name("node1") == "gw0-node1"
+        assert first.node_port(9) + 4 < second.node_port(0)
+        assert first.gateway != first.node_ip(0)
+        built = first.topology_builder(3).build()
+        assert [node.name for node in built.nodes] == ["gw0-node1", "gw0-node2", "gw0-node3"]
+        assert built.nodes[0].ip == first.node_ip(0)
+
+    def test_03_worker_topology_must_fit_its_port_block(self):
+        namespace = ClusterNamespace.for_worker("gw0")
+
+        assert namespace.max_nodes == 10
+        assert len(namespace.topology_builder(10).build().nodes) == 10
+        with pytest.raises(ValueError, match="next worker"):
+            namespace.topology_builder(25)
+        assert ClusterNamespace().max_nodes is None
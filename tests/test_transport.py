@@ -0,0 +1,69 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.transport import EndpointPolicy, WakuTransport
+from utils.waku_api import WakuNodeManager
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    flaky_left = 0
+
+    def do_GET(self):
+        if self.path == "/flaky" and _KeepAliveHandler.flaky_left > 0:
+            _KeepAliveHandler.flaky_left -= 1
+            self._reply(503, b"unavailable")
+        else:
+            self._reply(200, b"OK")
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+class TestWakuTransport:
+
+    def test_01_connections_are_reused(self, local_server):
+        transport = WakuTransport(f"http://127.0.0.1:{local_server}")
+        for _ in range(20):
+            assert transport.get("/health").status_code == 200
+
+        stats = transport.stats
+        assert stats.requests == 20
+        assert stats.connections_opened == 1, f"Expected one pooled connection, got {stats.connections_opened}"
+        assert stats.connections_reused == 19
+
+    def test_02_retries_gateway_errors_per_policy(self, local_server):
+        transport = WakuTransport(
+            f"http://127.0.0.1:{local_server}",
+            policies={"/flaky": EndpointPolicy(retries=2, backoff=0.0)}
+        )
+        _KeepAliveHandler.flaky_left = 2
+
+        assert transport.get("/flaky").status_code == 200
+        assert transport.stats.retries == 2
+
+    def test_03_node_manager_uses_shared_transport(self, local_server):
+        first = WakuNodeManager(local_server)
+        second = WakuNodeManager(local_server)
+
+        assert first.transport is second.transport
+        assert first.check_health()
@@ -0,0 +1,53 @@
+import base64
+
+import pytest
+
+from utils.validators import validate_waku_message, validate_waku_messages
+
+TOPIC = "/test/1/validate/proto"
+TIMESTAMP = 1_700_000_000_000_000_000
+
+
+def _message(text, topic=TOPIC, **overrides):
+    message = {"payload": base64.b64encode(text.encode()).decode(), "contentTopic": topic,
+               "version": 0, "timestamp": TIMESTAMP}
+    message.update(overrides)
+    return message
+
+
+@pytest.mark.unit
+class TestBatchValidation:
+
+    def test_01_clean_batch(self):
+        texts = ["one", "two", "three"]
+        result = validate_waku_messages([_message(t) for t in texts], expected_topic=TOPIC,
+                                        expected_contents=texts)
+
+        assert result.ok
+        assert [m.content for m in result.valid_messages] == texts
+        result.raise_for_failures()
+
+    def test_02_every_failure_is_reported_with_its_index(self):
+        messages = [
+            _message("fine"),
+            _message("bad schema", timestamp="soon"),
+            _message("wrong topic", topic="/other/1/x/proto"),
+            _message("wrong text"),
+            _message("x", payload="//79"),  # valid base64, not UTF-8
+        ]
+
+        result = validate_waku_messages(messages, expected_topic=TOPIC,
+                                        expected_contents=["fine", "bad schema", "wrong topic", "other", "x"])
+
+        assert [index for index, _ in result.failures] == [1, 2, 3, 4]
+        assert "Schema validation failed: timestamp" in result.failures[0][1]
+        assert result.messages[1] is None and len(result.valid_messages) == 4
+        with pytest.raises(AssertionError, match="4 of 5 message"):
+            result.raise_for_failures()
+
+    def test_03_length_mismatch_and_single_message(self):
+        result = validate_waku_messages([_message("a")], expected_payloads=[])
+
+        assert result.failures == [(-1, "Expected 0 payloads, got 1 message(s)")]
+        with pytest.raises(AssertionError, match="Payload mismatch"):
+            validate_waku_message(_message("a"), expected_payload="Yg==")
@@ -0,0 +1,89 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.config import CONFIG_HASH_LABEL
+from utils.docker_manager import DockerContainerManager, DockerManager
+from utils.fake_waku import FakeRelayNetwork, FakeWakuNode
+from utils.topology import ClusterNamespace
+from utils.waku_api import WakuNodeManager
+
+TOPIC = "/test/1/warm/proto"
+
+
+class _NoResetHandler(BaseHTTPRequestHandler):
+    """Healthy node that refuses to drop its subscriptions"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._reply(200, b"[]" if self.path.startswith("/relay/") else b"OK")
+
+    def do_DELETE(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._reply(500, b"internal error")
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _warm(backend, port):
+    """A managed container from a previous session, left running with a matching configuration"""
+    container = DockerContainerManager("node1", port, "172.18.0.2", backend)
+    backend.containers["node1"] = {"id": "warm-id", "name": "node1", "running": True,
+                                   "labels": {**container.labels, CONFIG_HASH_LABEL: container._config_hash("waku")}}
+    return container
+
+
+@pytest.fixture
+def fake_node():
+    node = FakeWakuNode(FakeRelayNetwork(), "node1", "172.18.0.2").start()
+    yield node
+    node.stop()
+
+
+@pytest.mark.unit
+class TestWarmPool:
+
+    def test_01_reset_state_drains_and_unsubscribes(self, fake_node):
+        client = WakuNodeManager(fake_node.port)
+        client.subscribe_to_topic(TOPIC)
+        client.publish_message(TOPIC, "left over")
+        client.get_inbox(TOPIC)
+
+        client.reset_state([TOPIC])
+
+        assert fake_node.subscriptions == set()
+        assert fake_node.caches == {}
+        assert client._inboxes == {}
+
+    def test_02_matching_warm_container_is_adopted_and_reset(self, fake_node, memory_backend):
+        backend = memory_backend
+        fake_node.subscriptions.add(TOPIC)
+        manager = DockerManager(backend, warm_pool=True, reset_topics=[TOPIC], namespace=ClusterNamespace())
+
+        container = manager._launch(_warm(backend, fake_node.port))
+
+        assert container.container_id == "warm-id"
+        assert backend.started == []
+        assert fake_node.subscriptions == set()
+
+    def test_03_warm_container_that_cannot_be_reset_is_recreated(self, memory_backend):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _NoResetHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        backend = memory_backend
+        manager = DockerManager(backend, warm_pool=True, reset_topics=[TOPIC], namespace=ClusterNamespace())
+        try:
+            container = manager._launch(_warm(backend, server.server_address[1]))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert backend.started == ["node1"]
+        assert container.container_id == "node1-1"
@@ -0,0 +1,82 @@
+"""
+Asyncio counterpart of the Waku REST client.
+Calls run on a shared worker pool over the pooled transport, so operations on many
+nodes can be awaited together instead of paying one blocking round-trip per node.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.config import ASYNC_MAX_WORKERS
+from utils.models import NodeInfo
+from utils.waku_api import WakuNodeManager
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=ASYNC_MAX_WORKERS, thread_name_prefix="waku-async")
+    return _executor
+
+
+class AsyncWakuNode:
+    """Coroutine API over a WakuNodeManager (or Node)"""
+
+    def __init__(self, node: WakuNodeManager):
+        self.node = node
+
+    @classmethod
+    def for_port(cls, port: int) -> "AsyncWakuNode":
+        return cls(WakuNodeManager(port))
+
+    @property
+    def name(self) -> str:
+        return getattr(self.node, "name", str(self.node.port))
+
+    async def _call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+    async def check_health(self) -> bool:
+        return await self._call(self.node.check_health)
+
+    async def get_node_info(self) -> NodeInfo:
+        return await self._call(self.node.get_node_info)
+
+    async def subscribe_to_topic(self, content_topic: str):
+        return await self._call(self.node.subscribe_to_topic, content_topic)
+
+    async def publish_message(self, content_topic: str, message_text: str):
+        return await self._call(self.node.publish_message, content_topic, message_text)
+
+    async def get_messages(self, content_topic: str) -> List[Dict]:
+        return await self._call(self.node.get_messages, content_topic)
+
+    async def get_peers(self) -> List[Dict]:
+        return await self._call(self.node.get_peers)
+
+
+async def gather_cluster(
+    nodes: Iterable[AsyncWakuNode],
+    operation: str,
+    *args,
+    return_exceptions: bool = False,
+    **kwargs
+) -> Dict[str, Any]:
+    """Run one AsyncWakuNode operation on every node concurrently, keyed by node name"""
+    nodes = list(nodes)
+    results = await asyncio.gather(
+        *(getattr(node, operation)(*args, **kwargs) for node in nodes),
+        return_exceptions=return_exceptions
+    )
+    return {node.name: result for node, result in zip(nodes, results)}
+
+
+def run_on_cluster(nodes: Iterable[WakuNodeManager], operation: str, *args, **kwargs) -> Dict[str, Any]:
+    """Blocking helper for tests: wrap sync nodes and gather an operation across them"""
+    async_nodes = [node if isinstance(node, AsyncWakuNode) else AsyncWakuNode(node) for node in nodes]
+    return asyncio.run(gather_cluster(async_nodes, operation, *args, **kwargs))
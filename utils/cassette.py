@@ -0,0 +1,282 @@
+"""
+Record and replay of REST traffic.
+RecordingTransport wraps a WakuTransport and appends every request and response, with its
+timing, to a Cassette. Cassettes are saved as gzip-compressed JSON lines: a header with
+the nodes' container metadata, then one line per interaction. ReplayTransport serves the
+recorded responses back without any node running, either at recorded speed or instantly.
+Each interaction notes the wait it was polled for (a wait_for loop or a poll scheduler
+waiter). In instant mode the repeats of a request within one wait are answered at once, so
+waits finish on their first poll: with the response that ended the wait, or with every
+message of the wait's polls for the draining relay cache. Every other request is served one
+recorded response at a time. Publishes match on method and path only, since their payloads
+carry per-run ids and send times, and values a test draws at random (such as run ids) can be
+pinned in the cassette with Cassette.value.
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from utils.docker_backend import DockerError, LineStream
+from utils.poller import current_wait_id
+from utils.transport import TransportStats, WakuTransport, json_body, make_response
+
+CASSETTE_VERSION = 1
+PLAYBACK_SPEEDS = ("instant", "realtime")
+# Requests whose body differs between runs; replays serve them in recorded order regardless of body
+UNKEYED_BODIES = {("POST", "/relay/v1/auto/messages")}
+# Polls that drain what they return, so a collapsed wait must hand back all of its responses' items
+DRAINING_PREFIXES = ("/relay/v1/auto/messages/",)
+
+Interaction = Dict[str, Any]
+
+
+class CassetteMiss(RuntimeError):
+    """A replayed request has no matching recorded interaction left"""
+
+
+def _key(base_url: str, method: str, path: str, body: Any) -> Tuple[str, str, str, str]:
+    if (method, path) in UNKEYED_BODIES:
+        return base_url, method, path, ""
+    return base_url, method, path, json.dumps(body, sort_keys=True, separators=(",", ":"))
+
+
+def _collapse(block: List[Interaction]) -> Interaction:
+    """One response standing in for every poll of a wait"""
+    last = block[-1]
+    if len(block) == 1 or not last["p"].startswith(DRAINING_PREFIXES):
+        return last
+    items: List[Any] = []
+    for interaction in block:
+        if interaction["s"] != 200:
+            continue
+        try:
+            body = json.loads(interaction["c"])
+        except ValueError:
+            return last
+        if not isinstance(body, list):
+            return last
+        items.extend(body)
+    return dict(last, s=200, c=json.dumps(items))
+
+
+class Cassette:
+    """Recorded interactions plus the metadata of the nodes they were recorded against"""
+
+    def __init__(self, interactions: Optional[List[Interaction]] = None, nodes: Optional[List[Dict]] = None,
+                 values: Optional[Dict[str, Any]] = None):
+        self.interactions: List[Interaction] = interactions or []
+        self.nodes: List[Dict] = nodes or []
+        self.values: Dict[str, Any] = values or {}
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._blocks: Optional[Dict[tuple, Deque[List[Interaction]]]] = None
+
+    def record(self, base_url: str, method: str, path: str, body: Any, response, duration: float):
+        with self._lock:
+            self.interactions.append({
+                "u": base_url,
+                "m": method,
+                "p": path,
+                "b": body,
+                "s": response.status_code,
+                "c": response.text,
+                "t": response.headers.get("Content-Type", "text/plain"),
+                "d": round(duration, 6),
+                "o": round(time.monotonic() - self._started, 6),
+                "w": current_wait_id(),
+            })
+
+    def add_nodes(self, containers):
+        """Keep what Node needs to know about each container so replays can rebuild them"""
+        with self._lock:
+            known = {node["name"] for node in self.nodes}
+            for container in containers:
+                if container.name not in known:
+                    self.nodes.append({
+                        "name": container.name,
+                        "port": container.port,
+                        "network_ip": container.network_ip,
+                        "container_id": container.container_id,
+                        "peer_id": getattr(container, "peer_id", None),
+                    })
+
+    def value(self, name: str, make: Callable[[], Any]) -> Any:
+        """The value recorded under name, or make() recorded now; replays get the recording's value"""
+        with self._lock:
+            if name not in self.values:
+                self.values[name] = make()
+            return self.values[name]
+
+    def save(self, path: str):
+        with self._lock, gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION, "nodes": self.nodes, "values": self.values}) + "\n")
+            for interaction in self.interactions:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version {header.get('version')} in {path}")
+            return cls([json.loads(line) for line in f if line.strip()], header.get("nodes", []),
+                       header.get("values", {}))
+
+    def _index(self) -> Dict[tuple, Deque[List[Interaction]]]:
+        """Group interactions per request, merging the repeats of a request made by one wait into a block"""
+        blocks: Dict[tuple, Deque[List[Interaction]]] = {}
+        for interaction in self.interactions:
+            key = _key(interaction["u"], interaction["m"], interaction["p"], interaction["b"])
+            queue = blocks.setdefault(key, deque())
+            wait_id = interaction.get("w")
+            if queue and wait_id is not None and queue[-1][-1].get("w") == wait_id:
+                queue[-1].append(interaction)
+            else:
+                queue.append([interaction])
+        return blocks
+
+    def next_interaction(self, base_url: str, method: str, path: str, body: Any, speed: str) -> Interaction:
+        with self._lock:
+            if self._blocks is None:
+                self._blocks = self._index()
+            queue = self._blocks.get(_key(base_url, method, path, body))
+            if not queue:
+                raise CassetteMiss(f"No recorded response left for {method} {path} on {base_url}; "
+                                   f"re-record the cassette")
+            if speed == "instant":
+                return _collapse(queue.popleft())
+            block = queue[0]
+            interaction = block.pop(0)
+            if not block:
+                queue.popleft()
+            return interaction
+
+
+class RecordingTransport:
+    """Passes requests to a real transport and records each exchange"""
+
+    def __init__(self, inner: WakuTransport, cassette: Cassette):
+        self.inner = inner
+        self.cassette = cassette
+        self.base_url = inner.base_url
+
+    def request(self, method: str, path: str, timeout: Optional[float] = None, **kwargs):
+        start = time.perf_counter()
+        response = self.inner.request(method, path, timeout=timeout, **kwargs)
+        self.cassette.record(self.base_url, method.upper(), path, json_body(kwargs), response,
+                             time.perf_counter() - start)
+        return response
+
+    def get(self, path: str, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path: str, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    @property
+    def stats(self) -> TransportStats:
+        return self.inner.stats
+
+    def close(self):
+        self.inner.close()
+
+
+class ReplayTransport:
+    """Answers requests from a cassette, instantly or after the recorded response time"""
+
+    def __init__(self, base_url: str, cassette: Cassette, speed: str = "instant"):
+        if speed not in PLAYBACK_SPEEDS:
+            raise ValueError(f"Unknown playback speed '{speed}', expected one of {PLAYBACK_SPEEDS}")
+        self.base_url = base_url.rstrip('/')
+        self.cassette = cassette
+        self.speed = speed
+        self._stats = TransportStats()
+
+    def request(self, method: str, path: str, timeout: Optional[float] = None, **kwargs):
+        self._stats.requests += 1
+        interaction = self.cassette.next_interaction(self.base_url, method.upper(), path, json_body(kwargs),
+                                                     self.speed)
+        if self.speed == "realtime":
+            time.sleep(interaction["d"])
+        return make_response(interaction["s"], interaction["c"].encode('utf-8'), self.base_url + path,
+                             interaction["t"])
+
+    def get(self, path: str, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path: str, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    @property
+    def stats(self) -> TransportStats:
+        return TransportStats(requests=self._stats.requests)
+
+    def close(self):
+        pass
+
+
+class RecordedContainer:
+    """Container metadata restored from a cassette header"""
+
+    def __init__(self, node: Dict, backend: "CassetteCluster"):
+        self.name = node["name"]
+        self.port = node["port"]
+        self.network_ip = node["network_ip"]
+        self.container_id = node["container_id"]
+        self.peer_id = node.get("peer_id")
+        self.backend = backend
+        self.log_collector = None
+        self.keep_warm = False
+
+    def is_running(self) -> bool:
+        return True
+
+    def get_logs(self, tail: int = 50) -> str:
+        return ""
+
+    def stop(self, force: bool = False, grace_period: Optional[int] = None):
+        pass
+
+
+class CassetteCluster:
+    """DockerManager stand-in for replays: hands out the recorded nodes, starts nothing"""
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+        self.warm_pool = False
+        self.containers: Dict[str, RecordedContainer] = {
+            node["name"]: RecordedContainer(node, self) for node in cassette.nodes
+        }
+
+    def setup_network(self):
+        pass
+
+    def create_nodes_with_bootstrap(self) -> List[RecordedContainer]:
+        if len(self.containers) < 2:
+            raise CassetteMiss("Cassette has no recorded node pair; re-record it against node1 and node2")
+        return list(self.containers.values())[:2]
+
+    def teardown(self, *args, **kwargs):
+        pass
+
+    def cleanup_all(self):
+        pass
+
+    def get_container_status(self) -> Dict[str, bool]:
+        return {name: True for name in self.containers}
+
+    def stream_logs(self, name: str, since: Optional[float] = None, tail: Optional[int] = None) -> LineStream:
+        raise DockerError(f"Replayed node {name} has no log stream")
+
+    def stream_stats(self, name: str) -> LineStream:
+        raise DockerError(f"Replayed node {name} has no resource stats")
@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 BASE_URL = "127.0.0.1"
 CONTENT_TOPIC = "/my-app/2/chatroom-1/proto"
 
@@ -6,6 +9,80 @@ NODE2_PORT = 21261
 NODE1_IP = "172.18.0.2"
 NODE2_IP = "172.18.0.3"
 NETWORK_NAME = "waku"
+WAKU_IMAGE = "wakuorg/nwaku:v0.24.0"
 
 MESSAGE_TIMEOUT = 30.0
-POLL_INTERVAL = 0.5 
\ No newline at end of file
+POLL_INTERVAL = 0.5 
+
+HTTP_POOL_SIZE = 10
+HTTP_TIMEOUT = 10.0
+HTTP_RETRIES = 2
+HTTP_RETRY_BACKOFF = 0.2
+ASYNC_MAX_WORKERS = 32
+
+INBOX_MAX_MESSAGES = 10000
+INBOX_MAX_AGE = None
+INBOX_EVICTION = "fifo"
+
+PEER_TABLE_TTL = 1.0
+
+POLL_MIN_INTERVAL = 0.05
+POLL_BACKOFF = 1.5
+POLL_JITTER = 0.1
+
+DOCKER_BACKEND = os.environ.get("WAKU_DOCKER_BACKEND", "cli")
+DOCKER_SOCKET = os.environ.get("WAKU_DOCKER_SOCKET", "/var/run/docker.sock")
+
+NETWORK_SUBNET = "172.18.0.0/16"
+NODE_PORT_STRIDE = 100
+
+# Each pytest-xdist worker gets its own /24 from this pool and its own block of host ports
+WORKER_SUBNET_POOL = "172.30.0.0/16"
+WORKER_PORT_BLOCK = 1000
+
+WARM_POOL = os.environ.get("WAKU_WARM_POOL", "0") == "1"
+MANAGED_LABEL = "ift.waku.managed"
+CONFIG_HASH_LABEL = "ift.waku.config-hash"
+WORKER_LABEL = "ift.waku.worker"
+
+NODE_KEY_SEED = os.environ.get("WAKU_NODE_KEY_SEED", "ift-waku")
+
+# nwaku log lines that signal events worth waking waiters for; REST polling still confirms them.
+# Each alternation is pinned to a line in tests/test_log_events.py (nwaku v0.24.0 or the fake nodes)
+LOG_EVENT_PATTERNS = {
+    "ready": r"Node setup complete|Starting REST HTTP server",
+    "peer_connected": r"Peer connected",
+    "relay_message": r"waku\.relay received|Received relay message",
+}
+LOG_EVENT_HISTORY = 1000
+
+TEARDOWN_GRACE_PERIOD = 2
+
+RESOURCE_SAMPLE_INTERVAL = 1.0
+SAMPLE_RESOURCES = os.environ.get("WAKU_SAMPLE_RESOURCES", "0") == "1"
+
+LOG_DIR = os.environ.get("WAKU_LOG_DIR", os.path.join(tempfile.gettempdir(), "waku-logs"))
+LOG_BUFFER_LINES = 5000
+
+# TRACE log lines carrying a message hash, classified by the first matching event pattern
+LOG_TRACE_EVENTS = {
+    "publish": r"[Pp]ublish",
+    "receive": r"[Rr]eceived|[Vv]alidated|handling message",
+    "forward": r"[Ff]orward|sending msgs|[Bb]roadcast",
+}
+LOG_TRACE_HASH_PATTERN = r"(?:msg_?[Hh]ash|msg_?[Ii]d|messageHash)=\"?(0x[0-9a-fA-F]+|[0-9a-fA-F]{16,})"
+LOG_TRACE_PEER_PATTERN = r"(?:peer_?[Ii]d|peer|from)=\"?([1-9A-HJ-NP-Za-km-z]{20,})"
+
+# In-process stand-in for nwaku containers (see utils/fake_waku.py)
+FAKE_NODES = os.environ.get("WAKU_FAKE_NODES", "0") == "1"
+FAKE_RELAY_DELAY = float(os.environ.get("WAKU_FAKE_RELAY_DELAY", "0.0"))
+FAKE_RELAY_LOSS = float(os.environ.get("WAKU_FAKE_RELAY_LOSS", "0.0"))
+FAKE_CACHE_SIZE = 50
+
+# nwaku's default --max-msg-size (150KiB); the payload sweep stops short of it to leave room for the envelope
+RELAY_MAX_MESSAGE_SIZE = 150 * 1024
+RELAY_ENVELOPE_HEADROOM = 1024
+
+# Store queries: nwaku caps a page at 100 messages
+STORE_PAGE_SIZE = 100
+FAKE_STORE_CAPACITY = 100000
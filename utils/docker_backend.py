@@ -0,0 +1,535 @@
+"""
+Docker backends used by the container and network managers.
+The CLI backend forks the docker binary for each operation. The Engine API backend talks
+to the daemon directly over its Unix socket and keeps one connection alive per thread.
+"""
+
+import http.client
+import json
+import os
+import socket
+import struct
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+from utils.config import DOCKER_BACKEND, DOCKER_SOCKET
+
+
+class DockerError(RuntimeError):
+    """Raised when the Docker daemon rejects or fails an operation"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class LineStream(ABC):
+    """Iterator over the lines of a long-running Docker output stream; close() ends it from any thread"""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[str]:
+        ...
+
+    @abstractmethod
+    def close(self):
+        ...
+
+
+class _ProcessLineStream(LineStream):
+
+    def __init__(self, cmd: List[str]):
+        self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        text=True, bufsize=1, errors="replace")
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self.process.stdout:
+            yield line.rstrip("\n")
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process.stdout.close()
+
+
+class DockerBackend(ABC):
+    """Operations the managers need from Docker; ports map container port -> host port"""
+
+    name = "base"
+
+    @abstractmethod
+    def run_container(self, name: str, image: str, args: List[str], ports: Dict[int, int],
+                      network: Optional[str] = None, ip: Optional[str] = None,
+                      labels: Optional[Dict[str, str]] = None) -> str:
+        ...
+
+    @abstractmethod
+    def stop_container(self, name: str, timeout: Optional[int] = None):
+        ...
+
+    @abstractmethod
+    def remove_container(self, name: str, force: bool = False):
+        ...
+
+    @abstractmethod
+    def is_running(self, name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get_logs(self, name: str, tail: int = 50) -> str:
+        ...
+
+    @abstractmethod
+    def stream_logs(self, name: str, since: Optional[float] = None, tail: Optional[int] = None) -> LineStream:
+        """Follow a container's stdout and stderr line by line"""
+
+    @abstractmethod
+    def stream_stats(self, name: str) -> LineStream:
+        """Follow a container's resource stats, one JSON document per line"""
+
+    @abstractmethod
+    def list_containers(self, labels: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """All containers (running or not) carrying the labels, as dicts with id, name, running, labels"""
+
+    @abstractmethod
+    def create_network(self, name: str, subnet: str, gateway: str, labels: Optional[Dict[str, str]] = None) -> bool:
+        """Create a bridge network; returns False if it already exists"""
+
+    @abstractmethod
+    def list_networks(self, labels: Optional[Dict[str, str]] = None) -> List[str]:
+        """Names of the networks carrying the labels"""
+
+    @abstractmethod
+    def remove_network(self, name: str):
+        ...
+
+    @abstractmethod
+    def connect_network(self, network: str, container: str, ip: str):
+        ...
+
+    @abstractmethod
+    def inspect_network(self, name: str) -> List[Dict[str, Any]]:
+        ...
+
+
+class CliDockerBackend(DockerBackend):
+    """Backend that runs the docker CLI for every operation"""
+
+    name = "cli"
+
+    def _run(self, cmd: List[str]) -> str:
+        try:
+            result = subprocess.run(["docker"] + cmd, capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError as e:
+            raise DockerError((e.stderr or "").strip() or f"docker {cmd[0]} failed", e.returncode) from e
+        return result.stdout
+
+    def run_container(self, name, image, args, ports, network=None, ip=None, labels=None) -> str:
+        cmd = ["run", "--name", name, "-d"]
+        if network:
+            cmd.extend(["--network", network])
+            if ip:
+                cmd.extend(["--ip", ip])
+        for container_port, host_port in ports.items():
+            cmd.extend(["-p", f"{host_port}:{container_port}"])
+        for key, value in (labels or {}).items():
+            cmd.extend(["--label", f"{key}={value}"])
+        cmd.append(image)
+        cmd.extend(args)
+        return self._run(cmd).strip()
+
+    def stop_container(self, name, timeout=None):
+        cmd = ["stop", name] if timeout is None else ["stop", "-t", str(timeout), name]
+        self._run(cmd)
+
+    def remove_container(self, name, force=False):
+        self._run(["rm", "-f", name] if force else ["rm", name])
+
+    def is_running(self, name) -> bool:
+        try:
+            output = self._run(["ps", "--filter", f"name={name}", "--format", "{{.Names}}"])
+        except DockerError:
+            return False
+        return name in output.split()
+
+    def get_logs(self, name, tail=50) -> str:
+        return self._run(["logs", "--tail", str(tail), name])
+
+    def stream_logs(self, name, since=None, tail=None) -> LineStream:
+        cmd = ["docker", "logs", "-f"]
+        if since is not None:
+            cmd.extend(["--since", f"{since:.6f}"])
+        if tail is not None:
+            cmd.extend(["--tail", str(tail)])
+        return _ProcessLineStream(cmd + [name])
+
+    def stream_stats(self, name) -> LineStream:
+        # One long-lived `docker stats` process; it redraws the terminal between samples,
+        # so consumers should look for the JSON object inside each line
+        return _ProcessLineStream(["docker", "stats", "--format", "{{json .}}", name])
+
+    def list_containers(self, labels=None) -> List[Dict[str, Any]]:
+        cmd = ["ps", "-a", "--no-trunc", "--format", "{{json .}}"]
+        for key, value in (labels or {}).items():
+            cmd.extend(["--filter", f"label={key}={value}"])
+        containers = []
+        for line in self._run(cmd).splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            container_labels = {}
+            for pair in (entry.get("Labels") or "").split(","):
+                key, sep, value = pair.partition("=")
+                if sep:
+                    container_labels[key] = value
+            containers.append({
+                "id": entry.get("ID"),
+                "name": entry.get("Names", "").split(",")[0],
+                "running": entry.get("State") == "running",
+                "labels": container_labels
+            })
+        return containers
+
+    def create_network(self, name, subnet, gateway, labels=None) -> bool:
+        cmd = ["network", "create", "--driver", "bridge", "--subnet", subnet, "--gateway", gateway]
+        for key, value in (labels or {}).items():
+            cmd.extend(["--label", f"{key}={value}"])
+        try:
+            self._run(cmd + [name])
+        except DockerError as e:
+            if "already exists" in str(e):
+                return False
+            raise
+        return True
+
+    def list_networks(self, labels=None) -> List[str]:
+        cmd = ["network", "ls", "--format", "{{.Name}}"]
+        for key, value in (labels or {}).items():
+            cmd.extend(["--filter", f"label={key}={value}"])
+        return [line.strip() for line in self._run(cmd).splitlines() if line.strip()]
+
+    def remove_network(self, name):
+        self._run(["network", "rm", name])
+
+    def connect_network(self, network, container, ip):
+        self._run(["network", "connect", "--ip", ip, network, container])
+
+    def inspect_network(self, name) -> List[Dict[str, Any]]:
+        return json.loads(self._run(["network", "inspect", name]))
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, socket_path: str, timeout: float = 60.0):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class DockerEngineClient:
+    """Minimal Docker Engine API client over a Unix socket with keep-alive connections"""
+
+    API_VERSION = "v1.41"
+
+    def __init__(self, socket_path: str = DOCKER_SOCKET, timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connection(self) -> _UnixHTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _UnixHTTPConnection(self.socket_path, self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self.connections_opened += 1
+        return conn
+
+    def request(self, method: str, path: str, body: Any = None,
+                query: Optional[Dict[str, Any]] = None) -> Tuple[int, bytes]:
+        url = f"/{self.API_VERSION}{path}"
+        if query:
+            url += "?" + urlencode(query)
+        headers = {"Host": "docker"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, url, body=payload, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                if response.will_close:
+                    conn.close()
+                    self._local.conn = None
+                return response.status, data
+            except (OSError, http.client.HTTPException) as e:
+                # The daemon may have closed an idle keep-alive connection; reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise DockerError(f"{method} {path} failed: {e}") from e
+        raise DockerError(f"{method} {path} failed")
+
+    def call(self, method: str, path: str, body: Any = None, query: Optional[Dict[str, Any]] = None,
+             ok_statuses: Tuple[int, ...] = ()) -> Any:
+        """Request and decode JSON, raising DockerError for error statuses not listed as ok"""
+        status, data = self.request(method, path, body, query)
+        if status >= 400 and status not in ok_statuses:
+            try:
+                message = json.loads(data).get("message", data.decode('utf-8', 'replace'))
+            except ValueError:
+                message = data.decode('utf-8', 'replace')
+            raise DockerError(message, status)
+        if not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return data
+
+    def open_stream(self, method: str, path: str, query: Optional[Dict[str, Any]] = None):
+        """Open a dedicated connection for a streaming endpoint; returns (connection, response)"""
+        url = f"/{self.API_VERSION}{path}"
+        if query:
+            url += "?" + urlencode(query)
+        conn = _UnixHTTPConnection(self.socket_path, timeout=None)
+        try:
+            conn.request(method, url, headers={"Host": "docker"})
+            response = conn.getresponse()
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise DockerError(f"{method} {path} failed: {e}") from e
+        if response.status >= 400:
+            message = response.read().decode('utf-8', 'replace')
+            conn.close()
+            raise DockerError(message, response.status)
+        return conn, response
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def demux_stream(data: bytes) -> bytes:
+    """Strip the 8-byte frame headers Docker adds to non-TTY log output"""
+    out = []
+    offset = 0
+    while offset + 8 <= len(data):
+        stream_type, size = struct.unpack(">BxxxL", data[offset:offset + 8])
+        if stream_type not in (0, 1, 2):
+            # Not multiplexed (TTY container), return as-is
+            return data
+        out.append(data[offset + 8:offset + 8 + size])
+        offset += 8 + size
+    return b"".join(out)
+
+
+class _EngineLineStream(LineStream):
+    """Lines from a streaming Engine API response, demultiplexing log frames when present"""
+
+    def __init__(self, conn: http.client.HTTPConnection, response: http.client.HTTPResponse, framed: bool):
+        self.conn = conn
+        self.response = response
+        self.framed = framed
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            if not self.framed:
+                for raw in iter(self.response.readline, b""):
+                    yield raw.decode('utf-8', 'replace').rstrip("\r\n")
+                return
+            buffer = b""
+            while True:
+                header = self.response.read(8)
+                if len(header) < 8:
+                    break
+                stream_type, size = struct.unpack(">BxxxL", header)
+                if stream_type not in (0, 1, 2):
+                    # TTY container: no framing, the header bytes are log text
+                    buffer += header
+                    for raw in iter(self.response.readline, b""):
+                        yield (buffer + raw).decode('utf-8', 'replace').rstrip("\r\n")
+                        buffer = b""
+                    break
+                buffer += self.response.read(size)
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    yield line.decode('utf-8', 'replace').rstrip("\r")
+            if buffer:
+                yield buffer.decode('utf-8', 'replace')
+        except (OSError, ValueError, http.client.HTTPException):
+            # Stream closed from another thread
+            return
+
+    def close(self):
+        sock = self.conn.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.conn.close()
+
+
+class EngineApiDockerBackend(DockerBackend):
+    """Backend that talks to the Docker Engine API over its Unix socket"""
+
+    name = "engine"
+
+    def __init__(self, client: Optional[DockerEngineClient] = None, socket_path: str = DOCKER_SOCKET):
+        self.client = client or DockerEngineClient(socket_path)
+
+    def _pull(self, image: str):
+        repository, _, tag = image.partition(":")
+        self.client.call("POST", "/images/create", query={"fromImage": repository, "tag": tag or "latest"})
+
+    def run_container(self, name, image, args, ports, network=None, ip=None, labels=None) -> str:
+        body: Dict[str, Any] = {
+            "Image": image,
+            "Cmd": list(args),
+            "Labels": dict(labels or {}),
+            "ExposedPorts": {f"{port}/tcp": {} for port in ports},
+            "HostConfig": {
+                "PortBindings": {f"{port}/tcp": [{"HostPort": str(host)}] for port, host in ports.items()}
+            }
+        }
+        if network:
+            body["HostConfig"]["NetworkMode"] = network
+            endpoint: Dict[str, Any] = {}
+            if ip:
+                endpoint["IPAMConfig"] = {"IPv4Address": ip}
+            body["NetworkingConfig"] = {"EndpointsConfig": {network: endpoint}}
+
+        try:
+            created = self.client.call("POST", "/containers/create", body, query={"name": name})
+        except DockerError as e:
+            if e.status != 404:
+                raise
+            self._pull(image)
+            created = self.client.call("POST", "/containers/create", body, query={"name": name})
+
+        container_id = created["Id"]
+        self.client.call("POST", f"/containers/{container_id}/start")
+        return container_id
+
+    def stop_container(self, name, timeout=None):
+        query = {"t": timeout} if timeout is not None else None
+        self.client.call("POST", f"/containers/{quote(name)}/stop", query=query)
+
+    def remove_container(self, name, force=False):
+        self.client.call("DELETE", f"/containers/{quote(name)}", query={"force": "true"} if force else None)
+
+    def is_running(self, name) -> bool:
+        try:
+            info = self.client.call("GET", f"/containers/{quote(name)}/json")
+        except DockerError:
+            return False
+        return bool(info.get("State", {}).get("Running"))
+
+    def get_logs(self, name, tail=50) -> str:
+        status, data = self.client.request(
+            "GET", f"/containers/{quote(name)}/logs", query={"stdout": 1, "stderr": 1, "tail": tail}
+        )
+        if status >= 400:
+            raise DockerError(data.decode('utf-8', 'replace'), status)
+        return demux_stream(data).decode('utf-8', 'replace')
+
+    def stream_logs(self, name, since=None, tail=None) -> LineStream:
+        query: Dict[str, Any] = {"follow": 1, "stdout": 1, "stderr": 1}
+        if since is not None:
+            query["since"] = f"{since:.6f}"
+        if tail is not None:
+            query["tail"] = tail
+        conn, response = self.client.open_stream("GET", f"/containers/{quote(name)}/logs", query)
+        return _EngineLineStream(conn, response, framed=True)
+
+    def stream_stats(self, name) -> LineStream:
+        conn, response = self.client.open_stream("GET", f"/containers/{quote(name)}/stats", {"stream": 1})
+        return _EngineLineStream(conn, response, framed=False)
+
+    def list_containers(self, labels=None) -> List[Dict[str, Any]]:
+        query: Dict[str, Any] = {"all": "true"}
+        if labels:
+            query["filters"] = json.dumps({"label": [f"{k}={v}" for k, v in labels.items()]})
+        return [
+            {
+                "id": entry["Id"],
+                "name": (entry.get("Names") or ["/"])[0].lstrip("/"),
+                "running": entry.get("State") == "running",
+                "labels": entry.get("Labels") or {}
+            }
+            for entry in self.client.call("GET", "/containers/json", query=query) or []
+        ]
+
+    def create_network(self, name, subnet, gateway, labels=None) -> bool:
+        body = {
+            "Name": name,
+            "Driver": "bridge",
+            "CheckDuplicate": True,
+            "IPAM": {"Config": [{"Subnet": subnet, "Gateway": gateway}]},
+            "Labels": labels or {}
+        }
+        try:
+            self.client.call("POST", "/networks/create", body)
+        except DockerError as e:
+            if e.status == 409 or "already exists" in str(e):
+                return False
+            raise
+        return True
+
+    def list_networks(self, labels=None) -> List[str]:
+        query = {"filters": json.dumps({"label": [f"{k}={v}" for k, v in labels.items()]})} if labels else None
+        return [network["Name"] for network in self.client.call("GET", "/networks", query=query)]
+
+    def remove_network(self, name):
+        self.client.call("DELETE", f"/networks/{quote(name)}")
+
+    def connect_network(self, network, container, ip):
+        body = {"Container": container, "EndpointConfig": {"IPAMConfig": {"IPv4Address": ip}}}
+        self.client.call("POST", f"/networks/{quote(network)}/connect", body)
+
+    def inspect_network(self, name) -> List[Dict[str, Any]]:
+        # Same shape as `docker network inspect`, which returns a list
+        return [self.client.call("GET", f"/networks/{quote(name)}")]
+
+
+_backends: Dict[str, DockerBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: Optional[str] = None) -> DockerBackend:
+    """
+    Return the shared backend for a name. "engine" and "auto" use the Engine API when the
+    socket exists and fall back to the CLI otherwise; "cli" always forks the CLI.
+    """
+    name = name or DOCKER_BACKEND
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            if name in ("engine", "auto") and os.path.exists(DOCKER_SOCKET):
+                backend = EngineApiDockerBackend()
+            elif name in ("engine", "auto", "cli"):
+                backend = CliDockerBackend()
+            else:
+                raise ValueError(f"Unknown Docker backend '{name}', expected 'cli', 'engine' or 'auto'")
+            _backends[name] = backend
+        return backend
@@ -3,268 +3,322 @@ Docker management utilities for IFT-Automation tests.
 This module handles all Docker operations including containers, networks, and commands.
 """
 
-import subprocess
+import bisect
+import hashlib
+import json
+import re
+import threading
 import time
-from typing import Optional, List, Dict, Any
-from utils.config import NODE1_PORT, NODE2_PORT, NODE1_IP, NODE2_IP, NETWORK_NAME
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Union
+
+import requests
+
+from utils.config import (
+    WAKU_IMAGE, CONTENT_TOPIC, WARM_POOL, MANAGED_LABEL, CONFIG_HASH_LABEL, WORKER_LABEL,
+    TEARDOWN_GRACE_PERIOD, RESOURCE_SAMPLE_INTERVAL
+)
+from utils.docker_backend import DockerBackend, DockerError, LineStream, get_backend
+from utils.node_keys import NodeKey, same_endpoint
+from utils.topology import ClusterNamespace, Topology
+from utils.test_helpers import extract_peer_id
+from utils.waku_api import WakuNodeManager
+
+
+@dataclass
+class NodeSpec:
+    """Description of a node to launch with DockerManager.start_nodes"""
+    name: str
+    port: int
+    network_ip: Optional[str] = None
+    bootstrap_enr: Union[str, List[str], None] = None
+    node_key: Optional[NodeKey] = None
+
+
+@dataclass
+class NodeStartTiming:
+    """Seconds from the start_nodes call until each phase completed for one node"""
+    name: str
+    created: float = 0.0
+    running: float = 0.0
+    rest_ready: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class TeardownReport:
+    """Result of a bulk teardown"""
+    removed: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    duration: float = 0.0
 
 
 class DockerContainerManager:
     """Manages Docker container lifecycle and operations"""
     
-    def __init__(self, name: str, port: int, network_ip: str = None):
+    def __init__(self, name: str, port: int, network_ip: str = None, backend: Optional[DockerBackend] = None,
+                 node_key: Optional[NodeKey] = None):
         self.name = name
         self.port = port
         self.network_ip = network_ip
+        self.node_key = node_key
         self.container_id = None
+        self.backend = backend or get_backend()
+        self.keep_warm = False
+        self.log_collector = None
+        self.labels = {MANAGED_LABEL: "true"}
+    
+    def _port_bindings(self) -> Dict[int, int]:
+        """Container port -> host port for the REST API and the standard Waku ports"""
+        return {
+            21161: self.port,      # REST port
+            21162: self.port + 1,  # TCP port
+            21163: self.port + 2,  # WebSocket port
+            21164: self.port + 3,  # Discv5 UDP port
+            21165: self.port + 4,  # Additional port
+        }
+    
+    def _build_node_args(self, bootstrap_enr: Union[str, List[str], None] = None) -> List[str]:
+        """Build the nwaku command line arguments for this node"""
+        args = [
+            "--listen-address=0.0.0.0",
+            "--rest=true",
+            "--rest-admin=true",
+            "--websocket-support=true",
+            "--log-level=TRACE",
+            "--rest-relay-cache-capacity=100",
+            "--store=true",
+            "--websocket-port=21163",
+            "--rest-port=21161",
+            "--tcp-port=21162",
+            "--discv5-udp-port=21164",
+            "--rest-address=0.0.0.0",
+            "--peer-exchange=true",
+            "--discv5-discovery=true",
+            "--relay=true"
+        ]
+        
+        # Add NAT configuration if network IP is specified
+        if self.network_ip:
+            args.append(f"--nat=extip:{self.network_ip}")
+        
+        if self.node_key:
+            args.append(f"--nodekey={self.node_key.private_key_hex}")
+        
+        if isinstance(bootstrap_enr, str):
+            bootstrap_enr = [bootstrap_enr]
+        for enr in bootstrap_enr or []:
+            args.append(f"--discv5-bootstrap-node={enr}")
+        
+        return args
+    
+    @property
+    def peer_id(self) -> Optional[str]:
+        """Peer ID derived from the pre-generated node key, if one was given"""
+        return self.node_key.peer_id if self.node_key else None
+    
+    @property
+    def enr_uri(self) -> Optional[str]:
+        """ENR computed locally from the node key, usable as a bootstrap before the node is up"""
+        if not self.node_key or not self.network_ip:
+            return None
+        return self.node_key.enr(self.network_ip, tcp_port=21162, udp_port=21164)
+    
+    def _config_hash(self, network_name: str = None, bootstrap_enr: Union[str, List[str], None] = None) -> str:
+        """Fingerprint of everything that defines this container, used to decide if a warm one can be reused"""
+        config = [WAKU_IMAGE, self._build_node_args(bootstrap_enr), sorted(self._port_bindings().items()),
+                  network_name, self.network_ip if network_name else None]
+        return hashlib.sha256(json.dumps(config).encode('utf-8')).hexdigest()[:16]
+    
+    def _run(self, network_name: str = None, bootstrap_enr: Union[str, List[str], None] = None) -> str:
+        self.container_id = self.backend.run_container(
+            self.name,
+            WAKU_IMAGE,
+            self._build_node_args(bootstrap_enr),
+            self._port_bindings(),
+            network=network_name,
+            ip=self.network_ip if network_name else None,
+            labels={**self.labels, CONFIG_HASH_LABEL: self._config_hash(network_name, bootstrap_enr)}
+        )
+        return self.container_id
+    
+    def adopt(self, network_name: str = None, bootstrap_enr: Union[str, List[str], None] = None) -> bool:
+        """
+        Take over a running container left by a previous session if its configuration matches.
+        A stale container with this name is removed so a fresh one can be started.
+        """
+        expected_hash = self._config_hash(network_name, bootstrap_enr)
+        for existing in self.backend.list_containers({MANAGED_LABEL: "true"}):
+            if existing["name"] != self.name:
+                continue
+            if existing["running"] and existing["labels"].get(CONFIG_HASH_LABEL) == expected_hash:
+                self.container_id = existing["id"]
+                return True
+            print(f"Removing stale {self.name} (config changed or not running)")
+            self.backend.remove_container(self.name, force=True)
+        return False
     
     def start(self, network_name: str = None) -> str:
         """Start the Waku node container"""
         try:
-            cmd = [
-                "docker", "run", "--name", self.name, "-d",
-                "-p", f"{self.port}:21161"
-            ]
-            
-            # Add network configuration if specified
-            if network_name:
-                cmd.extend(["--network", network_name])
-                if self.network_ip:
-                    cmd.extend(["--ip", self.network_ip])
-            
-            # Add all the standard ports
-            cmd.extend([
-                "-p", f"{self.port + 1}:21162",  # TCP port
-                "-p", f"{self.port + 2}:21163",  # WebSocket port
-                "-p", f"{self.port + 3}:21164",  # Discv5 UDP port
-                "-p", f"{self.port + 4}:21165",  # Additional port
-            ])
-            
-            # Add Waku image and configuration
-            cmd.extend([
-                "wakuorg/nwaku:v0.24.0",
-                "--listen-address=0.0.0.0",
-                "--rest=true",
-                "--rest-admin=true",
-                "--websocket-support=true",
-                "--log-level=TRACE",
-                "--rest-relay-cache-capacity=100",
-                "--websocket-port=21163",
-                "--rest-port=21161",
-                "--tcp-port=21162",
-                "--discv5-udp-port=21164",
-                "--rest-address=0.0.0.0",
-                "--peer-exchange=true",
-                "--discv5-discovery=true",
-                "--relay=true"
-            ])
-            
-            # Add NAT configuration if network IP is specified
-            if self.network_ip:
-                cmd.append(f"--nat=extip:{self.network_ip}")
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            self.container_id = result.stdout.strip()
+            self._run(network_name)
             
             print(f"Started {self.name} with container ID: {self.container_id}")
             return self.container_id
             
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to start {self.name}: {e.stderr}")
+        except DockerError as e:
+            raise RuntimeError(f"Failed to start {self.name}: {e}")
     
-    def start_with_bootstrap(self, bootstrap_enr: str, network_name: str = "waku") -> str:
+    def start_with_bootstrap(self, bootstrap_enr: Union[str, List[str]], network_name: str = "waku") -> str:
         """Start the Waku node container with bootstrap configuration from the start"""
         try:
-            cmd = [
-                "docker", "run", "--name", self.name, "-d",
-                "--network", network_name,
-                "--ip", self.network_ip,
-                "-p", f"{self.port}:21161",
-                "-p", f"{self.port + 1}:21162",
-                "-p", f"{self.port + 2}:21163",
-                "-p", f"{self.port + 3}:21164",
-                "-p", f"{self.port + 4}:21165",
-                "wakuorg/nwaku:v0.24.0",
-                "--listen-address=0.0.0.0",
-                "--rest=true",
-                "--rest-admin=true",
-                "--websocket-support=true",
-                "--log-level=TRACE",
-                "--rest-relay-cache-capacity=100",
-                "--websocket-port=21163",
-                "--rest-port=21161",
-                "--tcp-port=21162",
-                "--discv5-udp-port=21164",
-                "--rest-address=0.0.0.0",
-                f"--nat=extip:{self.network_ip}",
-                "--peer-exchange=true",
-                "--discv5-discovery=true",
-                "--relay=true",
-                f"--discv5-bootstrap-node={bootstrap_enr}"
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            self.container_id = result.stdout.strip()
+            self._run(network_name, bootstrap_enr)
             
             print(f"Started {self.name} with bootstrap configuration. Container ID: {self.container_id}")
             return self.container_id
             
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to start {self.name} with bootstrap: {e.stderr}")
+        except DockerError as e:
+            raise RuntimeError(f"Failed to start {self.name} with bootstrap: {e}")
     
-    def stop(self):
-        """Stop and remove the container"""
+    def stop(self, force: bool = False, grace_period: Optional[int] = None):
+        """Stop and remove the container; warm containers are left running unless forced"""
+        if self.keep_warm and not force:
+            print(f"Leaving {self.name} running for the next session")
+            return
         try:
-            subprocess.run(["docker", "stop", self.name], capture_output=True, check=True)
-            subprocess.run(["docker", "rm", self.name], capture_output=True, check=True)
+            self.backend.stop_container(self.name, timeout=grace_period)
+            self.backend.remove_container(self.name)
             print(f"Stopped and removed {self.name}")
-        except subprocess.CalledProcessError:
+        except DockerError:
             # Container might not exist, which is fine
             pass
     
     def restart_with_bootstrap(self, bootstrap_enr: str, network_name: str = "waku") -> str:
         """Restart container with bootstrap configuration (used for node2)"""
         # Stop current container
-        self.stop()
+        self.stop(force=True)
         
         # Start with bootstrap configuration
-        cmd = [
-            "docker", "run", "--name", self.name, "-d",
-            "--network", network_name,
-            "--ip", self.network_ip,
-            "-p", f"{self.port}:21161",
-            "-p", f"{self.port + 1}:21162",
-            "-p", f"{self.port + 2}:21163",
-            "-p", f"{self.port + 3}:21164",
-            "-p", f"{self.port + 4}:21165",
-            "wakuorg/nwaku:v0.24.0",
-            "--listen-address=0.0.0.0",
-            "--rest=true",
-            "--rest-admin=true",
-            "--websocket-support=true",
-            "--log-level=TRACE",
-            "--rest-relay-cache-capacity=100",
-            "--websocket-port=21163",
-            "--rest-port=21161",
-            "--tcp-port=21162",
-            "--discv5-udp-port=21164",
-            "--rest-address=0.0.0.0",
-            "--nat=extip:172.18.0.3",
-            "--peer-exchange=true",
-            "--discv5-discovery=true",
-            "--relay=true",
-            f"--discv5-bootstrap-node={bootstrap_enr}"
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        container_id = result.stdout.strip()
-        self.container_id = container_id
+        container_id = self._run(network_name, bootstrap_enr)
         
         print(f"{self.name} restarted with bootstrap configuration. Container ID: {container_id}")
         return container_id
     
     def get_logs(self, tail: int = 50) -> str:
         """Get container logs"""
+        # A collector attached to the log stream already holds the recent lines
+        if self.log_collector is not None:
+            return "".join(line + "\n" for line in self.log_collector.tail(tail))
         try:
-            result = subprocess.run(
-                ["docker", "logs", "--tail", str(tail), self.name],
-                capture_output=True, text=True, check=True
-            )
-            return result.stdout
-        except subprocess.CalledProcessError:
+            return self.backend.get_logs(self.name, tail)
+        except DockerError:
             return "No logs available"
     
     def is_running(self) -> bool:
         """Check if container is running"""
-        try:
-            result = subprocess.run(
-                ["docker", "ps", "--filter", f"name={self.name}", "--format", "{{.Names}}"],
-                capture_output=True, text=True, check=True
-            )
-            return self.name in result.stdout
-        except subprocess.CalledProcessError:
-            return False
+        return self.backend.is_running(self.name)
 
 
 class DockerNetworkManager:
     """Manages Docker network for inter-node communication"""
     
-    def __init__(self, name: str = "waku", subnet: str = "172.18.0.0/16", gateway: str = "172.18.0.1"):
+    def __init__(self, name: str = "waku", subnet: str = "172.18.0.0/16", gateway: str = "172.18.0.1",
+                 backend: Optional[DockerBackend] = None, labels: Optional[Dict[str, str]] = None):
         self.name = name
         self.subnet = subnet
         self.gateway = gateway
+        self.backend = backend or get_backend()
+        self.labels = labels or {}
     
     def create(self):
         """Create the Docker network"""
         try:
-            subprocess.run([
-                "docker", "network", "create",
-                "--driver", "bridge",
-                "--subnet", self.subnet,
-                "--gateway", self.gateway,
-                self.name
-            ], capture_output=True, check=True)
-            print(f"Created Docker network: {self.name}")
-        except subprocess.CalledProcessError as e:
-            if "already exists" in e.stderr.decode:
-                print(f"Network {self.name} already exists")
+            if self.backend.create_network(self.name, self.subnet, self.gateway, self.labels):
+                print(f"Created Docker network: {self.name}")
             else:
-                raise RuntimeError(f"Failed to create Docker network: {e.stderr}")
+                print(f"Network {self.name} already exists")
+        except DockerError as e:
+            raise RuntimeError(f"Failed to create Docker network: {e}")
     
     def remove(self):
         """Remove the Docker network"""
         try:
-            subprocess.run(["docker", "network", "rm", self.name], capture_output=True, check=True)
+            self.backend.remove_network(self.name)
             print(f"Removed Docker network: {self.name}")
-        except subprocess.CalledProcessError:
+        except DockerError:
             # Network might not exist, which is fine
             pass
     
     def connect_container(self, container_name: str, ip: str):
         """Connect a container to the network with a specific IP"""
         try:
-            result = subprocess.run([
-                "docker", "network", "connect", 
-                "--ip", ip, 
-                self.name, 
-                container_name
-            ], capture_output=True, text=True, check=True)
+            self.backend.connect_network(self.name, container_name, ip)
             
             print(f"{container_name} connected to network {self.name} with IP {ip}")
             return True
             
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to connect {container_name} to network: {e.stderr}")
+        except DockerError as e:
+            raise RuntimeError(f"Failed to connect {container_name} to network: {e}")
     
     def list_containers(self) -> List[str]:
         """List containers connected to this network"""
-        try:
-            result = subprocess.run([
-                "docker", "network", "inspect", self.name, "--format", "{{range .Containers}}{{.Name}} {{end}}"
-            ], capture_output=True, text=True, check=True)
-            return result.stdout.strip().split() if result.stdout.strip() else []
-        except subprocess.CalledProcessError:
+        info = self.get_network_info()
+        if not info:
             return []
+        containers = info[0].get("Containers") or {}
+        return [container.get("Name") for container in containers.values() if container.get("Name")]
     
-    def get_network_info(self) -> Dict[str, Any]:
+    def get_network_info(self) -> List[Dict[str, Any]]:
         """Get detailed network information"""
         try:
-            result = subprocess.run([
-                "docker", "network", "inspect", self.name
-            ], capture_output=True, text=True, check=True)
-            
-            import json
-            return json.loads(result.stdout)
-        except (subprocess.CalledProcessError, json.JSONDecodeError):
-            return {}
+            return self.backend.inspect_network(self.name)
+        except (DockerError, ValueError):
+            return []
 
 
 class DockerManager:
     """High-level Docker manager that coordinates containers and networks"""
     
-    def __init__(self):
-        self.network_manager = DockerNetworkManager(NETWORK_NAME)
+    def __init__(self, backend: Optional[DockerBackend] = None, warm_pool: bool = WARM_POOL,
+                 reset_topics: Optional[List[str]] = None, namespace: Optional[ClusterNamespace] = None):
+        self.backend = backend or get_backend()
+        # Under pytest-xdist every worker gets its own network, subnet, names and ports
+        self.namespace = namespace or ClusterNamespace.for_worker()
+        self.network_name = self.namespace.network_name
+        self.network_manager = DockerNetworkManager(self.network_name, self.namespace.subnet,
+                                                    self.namespace.gateway, self.backend,
+                                                    {MANAGED_LABEL: "true", WORKER_LABEL: self.namespace.worker})
         self.containers = {}
+        self.warm_pool = warm_pool
+        self.reset_topics = reset_topics if reset_topics is not None else [CONTENT_TOPIC]
+    
+    def _launch(self, container: DockerContainerManager,
+                bootstrap_enr: Union[str, List[str], None] = None) -> DockerContainerManager:
+        """Start a container, or adopt and reset a matching warm one when the warm pool is enabled"""
+        self.containers[container.name] = container
+        container.labels[WORKER_LABEL] = self.namespace.worker
+        if self.warm_pool:
+            container.keep_warm = True
+            if container.adopt(self.network_name, bootstrap_enr):
+                node = WakuNodeManager(container.port)
+                if node.check_health():
+                    try:
+                        node.reset_state(self.reset_topics)
+                        print(f"Adopted warm container {container.name} ({container.container_id[:12]})")
+                        return container
+                    except requests.exceptions.RequestException as e:
+                        print(f"Warm container {container.name} could not be reset ({e}), recreating it")
+                else:
+                    print(f"Warm container {container.name} is unhealthy, recreating it")
+                container.stop(force=True)
+        
+        if bootstrap_enr:
+            container.start_with_bootstrap(bootstrap_enr, self.network_name)
+        else:
+            container.start(self.network_name)
+        return container
     
     def setup_network(self):
         """Set up the Docker network"""
@@ -274,42 +328,395 @@ class DockerManager:
         """Clean up the Docker network"""
         self.network_manager.remove()
     
+    def start_nodes(self, specs: List[NodeSpec], ready_timeout: float = 60.0,
+                    poll_interval: float = 0.25) -> Dict[str, NodeStartTiming]:
+        """Launch all nodes concurrently and wait for every REST API in parallel"""
+        started_at = time.monotonic()
+        
+        def _start(spec: NodeSpec) -> NodeStartTiming:
+            timing = NodeStartTiming(spec.name)
+            container = DockerContainerManager(spec.name, spec.port, spec.network_ip, self.backend, spec.node_key)
+            try:
+                self._launch(container, spec.bootstrap_enr)
+                timing.created = time.monotonic() - started_at
+                
+                deadline = time.monotonic() + ready_timeout
+                while not container.is_running():
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"{spec.name} did not reach running state within {ready_timeout}s")
+                    time.sleep(poll_interval)
+                timing.running = time.monotonic() - started_at
+                
+                remaining = max(deadline - time.monotonic(), 0)
+                WakuNodeManager(spec.port).wait_for_ready(timeout=remaining, poll_interval=poll_interval)
+                timing.rest_ready = time.monotonic() - started_at
+            except (RuntimeError, TimeoutError) as e:
+                timing.error = str(e)
+            return timing
+        
+        if not specs:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(specs), thread_name_prefix="docker-start") as pool:
+            timings = {timing.name: timing for timing in pool.map(_start, specs)}
+        
+        failed = {name: t.error for name, t in timings.items() if t.error}
+        if failed:
+            raise RuntimeError(f"Failed to start nodes: {failed}")
+        
+        for timing in timings.values():
+            print(f"{timing.name}: created {timing.created:.2f}s, running {timing.running:.2f}s, "
+                  f"REST ready {timing.rest_ready:.2f}s")
+        return timings
+    
+    def start_topology(self, topology: Topology, ready_timeout: float = 60.0,
+                       precompute_enrs: bool = True) -> Dict[str, DockerContainerManager]:
+        """
+        Start every node of a topology. By default node keys are generated up front so all
+        bootstrap ENRs are known before launch and every node starts at once. With
+        precompute_enrs=False the topology starts in waves instead, each wave bootstrapping
+        from the ENRs the previous waves report. Edges that are not bootstrap edges are
+        dialled over the admin API afterwards. The network must already exist with the
+        topology's subnet.
+        """
+        if precompute_enrs:
+            keys = {node.name: NodeKey.from_seed(node.name) for node in topology.nodes}
+            enrs = {node.name: keys[node.name].enr(node.ip, tcp_port=21162, udp_port=21164)
+                    for node in topology.nodes}
+            specs = [
+                NodeSpec(node.name, node.port, node.ip, [enrs[peer] for peer in node.bootstrap] or None,
+                         keys[node.name])
+                for node in topology.nodes
+            ]
+            self.start_nodes(specs, ready_timeout=ready_timeout)
+            peer_ids = {name: key.peer_id for name, key in keys.items()}
+        else:
+            enrs, peer_ids = {}, {}
+            for wave in topology.waves():
+                self.start_nodes([NodeSpec(node.name, node.port, node.ip,
+                                           [enrs[peer] for peer in node.bootstrap] or None) for node in wave],
+                                 ready_timeout=ready_timeout)
+                for node in wave:
+                    info = WakuNodeManager(node.port).get_node_info(refresh=True)
+                    enrs[node.name] = info.enrUri
+                    peer_ids[node.name] = next(filter(None, map(extract_peer_id, info.listenAddresses)), None)
+        
+        for node in topology.nodes:
+            if node.dial:
+                multiaddrs = [f"/ip4/{topology[peer].ip}/tcp/21162/p2p/{peer_ids[peer]}" for peer in node.dial]
+                WakuNodeManager(node.port).connect_peers(multiaddrs)
+        
+        print(f"Started {topology.layout} topology with {len(topology.nodes)} node(s)")
+        return {node.name: self.containers[node.name] for node in topology.nodes}
+    
+    def _node_spec(self, index: int, bootstrap_enr: Union[str, List[str], None] = None) -> NodeSpec:
+        """Spec for node<index + 1>, named and addressed inside this manager's namespace"""
+        name = self.namespace.container_name(f"node{index + 1}")
+        return NodeSpec(name, self.namespace.node_port(index), self.namespace.node_ip(index),
+                        bootstrap_enr, NodeKey.from_seed(name))
+    
+    def _container(self, spec: NodeSpec) -> DockerContainerManager:
+        return DockerContainerManager(spec.name, spec.port, spec.network_ip, self.backend, spec.node_key)
+    
+    def create_nodes_with_bootstrap(self) -> List[DockerContainerManager]:
+        """Start node1 and node2 together, node2 bootstrapping from node1's precomputed ENR"""
+        node1 = self._node_spec(0)
+        node2 = self._node_spec(1, node1.node_key.enr(node1.network_ip, tcp_port=21162, udp_port=21164))
+        self.start_nodes([node1, node2])
+        containers = [self.containers[node1.name], self.containers[node2.name]]
+        self._check_bootstrap_identity(*containers, node2.bootstrap_enr)
+        return containers
+    
+    def _check_bootstrap_identity(self, node1: DockerContainerManager, node2: DockerContainerManager,
+                                  precomputed_enr: str, ready_timeout: float = 60.0):
+        """
+        node2 was started with an ENR computed before node1 ran. If node1 reports a different
+        peer ID or endpoint, restart node2 from the ENR node1 actually advertises.
+        """
+        info = WakuNodeManager(node1.port).get_node_info(refresh=True)
+        peer_ids = {extract_peer_id(address) for address in info.listenAddresses} - {None}
+        problems = []
+        if node1.peer_id not in peer_ids:
+            problems.append(f"peer ID {node1.peer_id} not in {sorted(peer_ids)}")
+        if not same_endpoint(precomputed_enr, info.enrUri):
+            problems.append("ENR key or endpoint differs")
+        if not problems:
+            return
+        
+        print(f"Precomputed identity of {node1.name} does not match the running node ({'; '.join(problems)}), "
+              f"restarting {node2.name} with the runtime ENR")
+        if node1.peer_id not in peer_ids:
+            # The key was not applied; drop it so the peer ID is read from the node instead
+            node1.node_key = None
+        node2.restart_with_bootstrap(info.enrUri, self.network_name)
+        WakuNodeManager(node2.port).wait_for_ready(timeout=ready_timeout, poll_interval=0.25)
+    
     def create_node1(self) -> DockerContainerManager:
         """Create and start node1"""
-        node1 = DockerContainerManager("node1", NODE1_PORT, NODE1_IP)
-        node1.start(NETWORK_NAME)
-        self.containers["node1"] = node1
-        return node1
+        return self._launch(self._container(self._node_spec(0)))
     
     def create_node2(self) -> DockerContainerManager:
         """Create and start node2"""
-        node2 = DockerContainerManager("node2", NODE2_PORT, NODE2_IP)
-        node2.start(NETWORK_NAME)
-        self.containers["node2"] = node2
-        return node2
+        return self._launch(self._container(self._node_spec(1)))
     
     def create_node2_with_bootstrap(self, bootstrap_enr: str) -> DockerContainerManager:
         """Create and start node2 with bootstrap configuration from the start"""
-        node2 = DockerContainerManager("node2", NODE2_PORT, NODE2_IP)
-        node2.start_with_bootstrap(bootstrap_enr, NETWORK_NAME)
-        self.containers["node2"] = node2
-        return node2
+        return self._launch(self._container(self._node_spec(1)), bootstrap_enr)
     
     def restart_node2_with_bootstrap(self, bootstrap_enr: str) -> str:
         """Restart node2 with bootstrap configuration"""
-        if "node2" not in self.containers:
+        name = self.namespace.container_name("node2")
+        if name not in self.containers:
             raise RuntimeError("Node2 not created yet")
         
-        return self.containers["node2"].restart_with_bootstrap(bootstrap_enr, NETWORK_NAME)
+        return self.containers[name].restart_with_bootstrap(bootstrap_enr, self.network_name)
     
-    def cleanup_all(self):
-        """Clean up all containers and network"""
-        for container in self.containers.values():
-            container.stop()
+    def teardown(self, grace_period: int = TEARDOWN_GRACE_PERIOD, include_leftovers: bool = True,
+                 remove_network: bool = True, all_workers: bool = False) -> TeardownReport:
+        """
+        Remove every managed container concurrently. Besides the containers this manager
+        started, leftovers from earlier runs are found by the managed label rather than
+        by name, limited to this manager's worker unless all_workers is set, in which case
+        every worker's network is removed too. Each container gets grace_period seconds to
+        stop before it is killed.
+        """
+        started_at = time.monotonic()
+        names = set(self.containers)
+        if include_leftovers:
+            labels = {MANAGED_LABEL: "true"}
+            if not all_workers:
+                labels[WORKER_LABEL] = self.namespace.worker
+            try:
+                names.update(c["name"] for c in self.backend.list_containers(labels))
+            except DockerError as e:
+                print(f"Could not list leftover containers: {e}")
+        
+        def _remove(name: str) -> Optional[str]:
+            try:
+                if grace_period > 0:
+                    try:
+                        self.backend.stop_container(name, timeout=grace_period)
+                    except DockerError:
+                        # Already stopped; removal below still applies
+                        pass
+                self.backend.remove_container(name, force=True)
+                return None
+            except DockerError as e:
+                return str(e)
+        
+        report = TeardownReport()
+        if names:
+            with ThreadPoolExecutor(max_workers=min(len(names), 32), thread_name_prefix="docker-teardown") as pool:
+                for name, error in zip(sorted(names), pool.map(_remove, sorted(names))):
+                    if error:
+                        report.errors[name] = error
+                    else:
+                        report.removed.append(name)
         
-        self.cleanup_network()
+        if remove_network:
+            self.cleanup_network()
+            if all_workers:
+                self._remove_worker_networks()
         self.containers.clear()
+        report.duration = time.monotonic() - started_at
+        
+        print(f"Removed {len(report.removed)} container(s) in {report.duration:.2f}s")
+        for name, error in report.errors.items():
+            print(f"Failed to remove {name}: {error}")
+        return report
+    
+    def _remove_worker_networks(self):
+        """Remove the per-worker networks, which otherwise keep holding their subnets"""
+        try:
+            names = self.backend.list_networks({MANAGED_LABEL: "true"})
+        except DockerError as e:
+            print(f"Could not list worker networks: {e}")
+            return
+        for name in names:
+            if name == self.network_name:
+                continue
+            try:
+                self.backend.remove_network(name)
+                print(f"Removed Docker network: {name}")
+            except DockerError as e:
+                print(f"Failed to remove network {name}: {e}")
+    
+    def cleanup_all(self):
+        """Clean up all containers and network; in warm pool mode everything is left running"""
+        if self.warm_pool:
+            print(f"Warm pool enabled, keeping {len(self.containers)} container(s) and network {self.network_name}")
+            self.containers.clear()
+            return
+        
+        self.teardown()
     
     def get_container_status(self) -> Dict[str, bool]:
         """Get status of all containers"""
-        return {name: container.is_running() for name, container in self.containers.items()} 
\ No newline at end of file
+        return {name: container.is_running() for name, container in self.containers.items()}
+
+
+_SIZE_UNITS = {
+    "b": 1, "kb": 1e3, "mb": 1e6, "gb": 1e9, "tb": 1e12,
+    "kib": 1024, "mib": 1024 ** 2, "gib": 1024 ** 3, "tib": 1024 ** 4,
+}
+_SIZE_PATTERN = re.compile(r"([\d.]+)\s*([a-zA-Z]*)")
+
+
+def _parse_size(text: str) -> float:
+    """Parse CLI sizes such as '12.5MiB' or '648B' into bytes"""
+    match = _SIZE_PATTERN.match(text.strip())
+    if not match:
+        return 0.0
+    return float(match.group(1)) * _SIZE_UNITS.get(match.group(2).lower() or "b", 1)
+
+
+def parse_stats(doc: Dict[str, Any]) -> Optional[tuple]:
+    """
+    Normalize one stats document, from the Engine API or `docker stats --format json`, into
+    (cpu_percent, memory_bytes, net_rx, net_tx, block_read, block_write).
+    """
+    if "cpu_stats" in doc:
+        cpu, precpu = doc.get("cpu_stats") or {}, doc.get("precpu_stats") or {}
+        cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get("cpu_usage", {}).get("total_usage", 0)
+        system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+        cpus = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+        cpu_percent = cpu_delta / system_delta * cpus * 100.0 if system_delta > 0 and cpu_delta > 0 else 0.0
+        
+        memory = doc.get("memory_stats") or {}
+        memory_stats = memory.get("stats") or {}
+        memory_bytes = memory.get("usage", 0) - memory_stats.get("inactive_file", memory_stats.get("cache", 0))
+        
+        networks = (doc.get("networks") or {}).values()
+        rx = sum(n.get("rx_bytes", 0) for n in networks)
+        tx = sum(n.get("tx_bytes", 0) for n in networks)
+        
+        io = (doc.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+        read = sum(e.get("value", 0) for e in io if e.get("op", "").lower() == "read")
+        write = sum(e.get("value", 0) for e in io if e.get("op", "").lower() == "write")
+        return cpu_percent, max(memory_bytes, 0), rx, tx, read, write
+    
+    if "CPUPerc" in doc:
+        rx, _, tx = doc.get("NetIO", "0B / 0B").partition("/")
+        read, _, write = doc.get("BlockIO", "0B / 0B").partition("/")
+        return (
+            float(doc["CPUPerc"].rstrip("%") or 0),
+            _parse_size(doc.get("MemUsage", "0B").split("/")[0]),
+            _parse_size(rx), _parse_size(tx or "0B"),
+            _parse_size(read), _parse_size(write or "0B")
+        )
+    return None
+
+
+@dataclass
+class ResourceSummary:
+    """Resource use of one container over a time window; I/O values are deltas in bytes"""
+    samples: int = 0
+    cpu_mean: float = 0.0
+    cpu_max: float = 0.0
+    memory_max: float = 0.0
+    net_rx: float = 0.0
+    net_tx: float = 0.0
+    block_read: float = 0.0
+    block_write: float = 0.0
+    
+    def __str__(self) -> str:
+        return (f"cpu mean {self.cpu_mean:.1f}% max {self.cpu_max:.1f}%, mem max {self.memory_max / 2 ** 20:.1f}MiB, "
+                f"net rx {self.net_rx / 1024:.1f}KiB tx {self.net_tx / 1024:.1f}KiB, "
+                f"block r {self.block_read / 1024:.1f}KiB w {self.block_write / 1024:.1f}KiB")
+
+
+class ResourceSeries:
+    """Compact array-backed time series of resource samples for one container"""
+    
+    FIELDS = ("time", "cpu_percent", "memory_bytes", "net_rx", "net_tx", "block_read", "block_write")
+    
+    def __init__(self):
+        self.columns = {name: array('d') for name in self.FIELDS}
+        self._lock = threading.Lock()
+    
+    def append(self, timestamp: float, values: tuple):
+        with self._lock:
+            self.columns["time"].append(timestamp)
+            for name, value in zip(self.FIELDS[1:], values):
+                self.columns[name].append(float(value))
+    
+    def __len__(self) -> int:
+        return len(self.columns["time"])
+    
+    def summary(self, start: float = float("-inf"), end: float = float("inf")) -> ResourceSummary:
+        """Summarize samples taken between start and end (monotonic seconds)"""
+        with self._lock:
+            times = self.columns["time"]
+            lo, hi = bisect.bisect_left(times, start), bisect.bisect_right(times, end)
+            if hi <= lo:
+                return ResourceSummary()
+            cpu = self.columns["cpu_percent"][lo:hi]
+            # Counters are cumulative, so the delta needs the last sample before the window too
+            base = max(lo - 1, 0)
+            
+            def delta(name):
+                column = self.columns[name]
+                return column[hi - 1] - column[base]
+            
+            return ResourceSummary(
+                samples=hi - lo,
+                cpu_mean=sum(cpu) / len(cpu),
+                cpu_max=max(cpu),
+                memory_max=max(self.columns["memory_bytes"][lo:hi]),
+                net_rx=delta("net_rx"),
+                net_tx=delta("net_tx"),
+                block_read=delta("block_read"),
+                block_write=delta("block_write")
+            )
+
+
+class ResourceSampler:
+    """Background sampler recording CPU, memory, network and block I/O per container from the stats stream"""
+    
+    def __init__(self, interval: float = RESOURCE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.series: Dict[str, ResourceSeries] = {}
+        self._streams: Dict[str, LineStream] = {}
+        self._threads: List[threading.Thread] = []
+    
+    def add(self, container: DockerContainerManager):
+        if container.name in self.series:
+            return
+        try:
+            stream = container.backend.stream_stats(container.name)
+        except (DockerError, OSError) as e:
+            print(f"Could not sample resources of {container.name}: {e}")
+            return
+        self.series[container.name] = ResourceSeries()
+        self._streams[container.name] = stream
+        thread = threading.Thread(target=self._run, args=(container.name, stream),
+                                  name=f"stats-{container.name}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+    
+    def _run(self, name: str, stream: LineStream):
+        series = self.series[name]
+        last = float("-inf")
+        for line in stream:
+            start = line.find("{")
+            if start < 0:
+                continue
+            try:
+                values = parse_stats(json.loads(line[start:]))
+            except (ValueError, KeyError):
+                continue
+            now = time.monotonic()
+            if values is None or now - last < self.interval * 0.9:
+                continue
+            last = now
+            series.append(now, values)
+    
+    def summary(self, start: float = float("-inf"), end: float = float("inf")) -> Dict[str, ResourceSummary]:
+        return {name: series.summary(start, end) for name, series in self.series.items()}
+    
+    def stop(self):
+        for stream in self._streams.values():
+            stream.close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._streams.clear()
+        self._threads.clear()
@@ -0,0 +1,469 @@
+"""
+In-process stand-in for nwaku containers.
+FakeWakuNode serves the REST endpoints WakuNodeManager uses from a threaded HTTP server on
+localhost, and FakeRelayNetwork floods published messages between connected fake nodes
+with configurable per-hop delay and loss. FakeWakuCluster mirrors the parts of DockerManager
+the fixtures use, so the client stack can be exercised and benchmarked without Docker.
+Every node also keeps a store of the messages it has seen and answers cursor-paginated
+/store/v1/messages queries from it.
+"""
+
+import base64
+import heapq
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, unquote
+
+from utils.config import (BASE_URL, CONTENT_TOPIC, FAKE_RELAY_DELAY, FAKE_RELAY_LOSS, FAKE_CACHE_SIZE,
+                          FAKE_STORE_CAPACITY, STORE_PAGE_SIZE)
+from utils.docker_backend import DockerError, LineStream
+from utils.inbox import message_hash
+from utils.node_keys import NodeKey
+from utils.peers import RELAY_PROTOCOL
+from utils.test_helpers import extract_peer_id
+from utils.topology import ClusterNamespace, Topology
+
+logger = logging.getLogger(__name__)
+
+FAKE_TCP_PORT = 21162
+FAKE_UDP_PORT = 21164
+FAKE_PUBSUB_TOPIC = "/waku/2/default-waku/proto"
+SEEN_CACHE_SIZE = 10000
+
+
+class _QueueLineStream(LineStream):
+    """Log lines pushed by a fake node, consumed by a LogFollower"""
+
+    def __init__(self, backlog: List[str]):
+        self._lines: Deque[Optional[str]] = deque(backlog)
+        self._cond = threading.Condition()
+
+    def push(self, line: Optional[str]):
+        with self._cond:
+            self._lines.append(line)
+            self._cond.notify()
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            with self._cond:
+                while not self._lines:
+                    self._cond.wait()
+                line = self._lines.popleft()
+            if line is None:
+                return
+            yield line
+
+    def close(self):
+        self.push(None)
+
+
+class FakeRelayNetwork:
+    """Connects fake nodes and delivers relayed messages after a delay, dropping some"""
+
+    def __init__(self, delay: float = FAKE_RELAY_DELAY, loss: float = FAKE_RELAY_LOSS, seed: Optional[int] = None):
+        self.delay = delay
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.nodes: Dict[str, "FakeWakuNode"] = {}
+        self.delivered = 0
+        self.dropped = 0
+
+        self._queue: List = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, node: "FakeWakuNode"):
+        self.nodes[node.peer_id] = node
+
+    def unregister(self, node: "FakeWakuNode"):
+        self.nodes.pop(node.peer_id, None)
+        for other in self.nodes.values():
+            other.peers.discard(node.peer_id)
+
+    def connect(self, a: "FakeWakuNode", b: "FakeWakuNode"):
+        for node, peer in ((a, b), (b, a)):
+            if peer.peer_id not in node.peers:
+                node.peers.add(peer.peer_id)
+                node.log(f"Peer connected                               peerId={peer.peer_id}")
+
+    def deliver(self, sender: "FakeWakuNode", message: Dict):
+        """Forward a message from sender to each of its peers"""
+        for peer_id in list(sender.peers):
+            peer = self.nodes.get(peer_id)
+            if peer is None:
+                continue
+            with self._cond:
+                lost = self.random.random() < self.loss
+                if lost:
+                    self.dropped += 1
+                else:
+                    self.delivered += 1
+            if lost:
+                continue
+            sender.log(f"forwarding message                           peer={peer_id} "
+                       f"msg_hash=0x{message_hash(message)}")
+            if self.delay > 0:
+                self._schedule(self.delay, lambda p=peer: p.receive(message, sender.peer_id))
+            else:
+                peer.receive(message, sender.peer_id)
+
+    def _schedule(self, delay: float, action: Callable[[], None]):
+        with self._cond:
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._counter), action))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="fake-relay", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    timeout = self._queue[0][0] - time.monotonic() if self._queue else None
+                    self._cond.wait(timeout)
+                _, _, action = heapq.heappop(self._queue)
+            try:
+                action()
+            except Exception as e:
+                logger.debug(f"Fake relay delivery failed: {e}")
+
+    # Log access, so LogFollower and get_logs work on fake nodes as they do on containers
+
+    def stream_logs(self, name: str, since: Optional[float] = None, tail: Optional[int] = None) -> LineStream:
+        return self._by_name(name).open_log_stream()
+
+    def get_logs(self, name: str, tail: int = 50) -> str:
+        return "".join(line + "\n" for line in list(self._by_name(name).logs)[-tail:])
+
+    def stream_stats(self, name: str) -> LineStream:
+        raise DockerError(f"No resource stats for in-process node {name}")
+
+    def _by_name(self, name: str) -> "FakeWakuNode":
+        for node in self.nodes.values():
+            if node.name == name:
+                return node
+        raise DockerError(f"No such fake node: {name}", 404)
+
+
+class _FakeRestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; with Nagle on, each reply waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _reply(self, status: int, payload=None, text: str = "OK"):
+        if payload is None:
+            data, content_type = text.encode('utf-8'), "text/plain"
+        else:
+            data, content_type = json.dumps(payload).encode('utf-8'), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        node = self.server.node
+        path, _, query = self.path.partition("?")
+        if path == "/store/v1/messages":
+            status, payload = node.store_query(dict(parse_qsl(query)))
+            if isinstance(payload, str):
+                return self._reply(status, text=payload)
+            return self._reply(status, payload)
+        if self.path == "/health":
+            return self._reply(200, text="Node is healthy")
+        if self.path == "/debug/v1/info":
+            return self._reply(200, node.info())
+        if self.path == "/admin/v1/peers":
+            return self._reply(200, node.peer_list())
+        if self.path.startswith("/relay/v1/auto/messages/"):
+            topic = unquote(self.path[len("/relay/v1/auto/messages/"):])
+            messages = node.drain(topic)
+            if messages is None:
+                return self._reply(400, text=f"Not subscribed to topic: {topic}")
+            return self._reply(200, messages)
+        self._reply(404, text="Not found")
+
+    def do_POST(self):
+        node = self.server.node
+        body = self._body()
+        if self.path == "/relay/v1/auto/subscriptions":
+            node.subscriptions.update(body or [])
+            return self._reply(200)
+        if self.path == "/relay/v1/auto/messages":
+            if not body or "payload" not in body or "contentTopic" not in body:
+                return self._reply(400, text="Missing payload or contentTopic")
+            node.publish(body)
+            return self._reply(200)
+        if self.path == "/admin/v1/peers":
+            unknown = [addr for addr in body or [] if not node.dial(addr)]
+            if unknown:
+                return self._reply(400, text=f"Failed to connect to peers: {unknown}")
+            return self._reply(200)
+        self._reply(404, text="Not found")
+
+    def do_DELETE(self):
+        node = self.server.node
+        body = self._body()
+        if self.path == "/relay/v1/auto/subscriptions":
+            node.subscriptions.difference_update(body or [])
+            for topic in body or []:
+                node.caches.pop(topic, None)
+            return self._reply(200)
+        self._reply(404, text="Not found")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeWakuNode:
+    """One fake nwaku node; doubles as the container object Node and the fixtures expect"""
+
+    def __init__(self, network: FakeRelayNetwork, name: str, network_ip: str, port: int = 0,
+                 node_key: Optional[NodeKey] = None, cache_size: int = FAKE_CACHE_SIZE,
+                 store_capacity: int = FAKE_STORE_CAPACITY):
+        self.network = network
+        self.backend = network
+        self.name = name
+        self.network_ip = network_ip
+        self.node_key = node_key or NodeKey.from_seed(name)
+        self.peer_id = self.node_key.peer_id
+        self.enr_uri = self.node_key.enr(network_ip, tcp_port=FAKE_TCP_PORT, udp_port=FAKE_UDP_PORT)
+        self.container_id = f"fake-{name}"
+        self.cache_size = cache_size
+        self.store_capacity = store_capacity
+        self.log_collector = None
+        self.keep_warm = False
+
+        self.subscriptions: Set[str] = set()
+        self.caches: Dict[str, Deque[Dict]] = {}
+        self.peers: Set[str] = set()
+        self.logs: Deque[str] = deque(maxlen=1000)
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        # Parallel lists in store order: unique, increasing store times and (digest, message)
+        self._store_times: List[int] = []
+        self._stored: List[Tuple[str, Dict]] = []
+        self._lock = threading.Lock()
+        self._streams: List[_QueueLineStream] = []
+
+        self.server = ThreadingHTTPServer((BASE_URL, port), _FakeRestHandler)
+        self.server.daemon_threads = True
+        self.server.node = self
+        self.port = self.server.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def multiaddr(self) -> str:
+        return f"/ip4/{self.network_ip}/tcp/{FAKE_TCP_PORT}/p2p/{self.peer_id}"
+
+    def start(self) -> "FakeWakuNode":
+        self.network.register(self)
+        self._thread = threading.Thread(target=self.server.serve_forever, name=f"fake-{self.name}", daemon=True)
+        self._thread.start()
+        self.log("Node setup complete")
+        return self
+
+    def stop(self, force: bool = False, grace_period: Optional[int] = None):
+        if self._thread is None:
+            return
+        self.network.unregister(self)
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread = None
+        with self._lock:
+            streams, self._streams = self._streams, []
+        for stream in streams:
+            stream.close()
+
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def get_logs(self, tail: int = 50) -> str:
+        return self.network.get_logs(self.name, tail)
+
+    def log(self, message: str):
+        timestamp = datetime.now(timezone.utc).isoformat(sep=" ", timespec="milliseconds")
+        line = f"TRC {timestamp} {message}"
+        with self._lock:
+            self.logs.append(line)
+            streams = list(self._streams)
+        for stream in streams:
+            stream.push(line)
+
+    def open_log_stream(self) -> LineStream:
+        with self._lock:
+            stream = _QueueLineStream(list(self.logs))
+            self._streams.append(stream)
+        return stream
+
+    # REST behaviour
+
+    def info(self) -> Dict:
+        return {"listenAddresses": [self.multiaddr], "enrUri": self.enr_uri}
+
+    def peer_list(self) -> List[Dict]:
+        peers = [self.network.nodes[p] for p in list(self.peers) if p in self.network.nodes]
+        return [{"multiaddr": peer.multiaddr, "protocols": [{"protocol": RELAY_PROTOCOL, "connected": True}]}
+                for peer in peers]
+
+    def dial(self, multiaddr: str) -> bool:
+        peer = self.network.nodes.get(extract_peer_id(multiaddr) or "")
+        if peer is None:
+            return False
+        self.network.connect(self, peer)
+        return True
+
+    def drain(self, content_topic: str) -> Optional[List[Dict]]:
+        with self._lock:
+            if content_topic not in self.subscriptions:
+                return None
+            cache = self.caches.pop(content_topic, None)
+        return list(cache or [])
+
+    def publish(self, body: Dict):
+        message = {
+            "payload": body["payload"],
+            "contentTopic": body["contentTopic"],
+            "version": body.get("version", 0),
+            "timestamp": body.get("timestamp") or time.time_ns(),
+        }
+        if body.get("meta"):
+            message["meta"] = body["meta"]
+        self.log(f"publish message                              msg_hash=0x{message_hash(message)}")
+        self.receive(message, None)
+
+    def receive(self, message: Dict, from_peer: Optional[str]):
+        key = message_hash(message)
+        with self._lock:
+            if key in self._seen:
+                return
+            self._seen[key] = None
+            if len(self._seen) > SEEN_CACHE_SIZE:
+                self._seen.popitem(last=False)
+            if message["contentTopic"] in self.subscriptions:
+                self.caches.setdefault(message["contentTopic"], deque(maxlen=self.cache_size)).append(message)
+            self._archive(key, message)
+        if from_peer is not None:
+            self.log(f"Received relay message                       from={from_peer} msg_hash=0x{key}")
+        self.network.deliver(self, message)
+
+    def _archive(self, key: str, message: Dict):
+        """Add a message to the store; called with the lock held"""
+        store_time = time.time_ns()
+        if self._store_times and store_time <= self._store_times[-1]:
+            store_time = self._store_times[-1] + 1
+        self._store_times.append(store_time)
+        self._stored.append((base64.b64encode(bytes.fromhex(key)).decode('ascii'), message))
+        # Trim in batches so a full store does not shift the lists on every message
+        excess = len(self._stored) - self.store_capacity
+        if excess > self.store_capacity // 10:
+            del self._store_times[:excess]
+            del self._stored[:excess]
+
+    def _cursor(self, index: int) -> Dict:
+        digest, message = self._stored[index]
+        return {"pubsubTopic": FAKE_PUBSUB_TOPIC, "senderTime": message["timestamp"],
+                "storeTime": self._store_times[index], "digest": digest}
+
+    def store_query(self, params: Dict[str, str]):
+        """Answer a store query the way nwaku's REST API does: one page plus a cursor when it is full"""
+        topics = {t for t in params.get("contentTopics", "").split(",") if t}
+        if params.get("pubsubTopic", FAKE_PUBSUB_TOPIC) != FAKE_PUBSUB_TOPIC:
+            return 200, {"messages": [], "cursor": None, "errorMessage": ""}
+        try:
+            start = int(params["startTime"]) if "startTime" in params else None
+            end = int(params["endTime"]) if "endTime" in params else None
+            page_size = min(int(params.get("pageSize") or STORE_PAGE_SIZE), STORE_PAGE_SIZE)
+            store_time = int(params["storeTime"]) if "storeTime" in params else None
+        except ValueError as e:
+            return 400, f"Invalid store query: {e}"
+        ascending = params.get("ascending", "true") != "false"
+        step = 1 if ascending else -1
+        
+        messages: List[Dict] = []
+        last = None
+        with self._lock:
+            if store_time is None:
+                index = 0 if ascending else len(self._stored) - 1
+            else:
+                found = bisect_left(self._store_times, store_time)
+                if (found == len(self._stored) or self._store_times[found] != store_time
+                        or self._stored[found][0] != params.get("digest")):
+                    return 400, "Cursor not found in store"
+                index = found + step
+            while 0 <= index < len(self._stored) and len(messages) < page_size:
+                message = self._stored[index][1]
+                if ((not topics or message["contentTopic"] in topics)
+                        and (start is None or message["timestamp"] >= start)
+                        and (end is None or message["timestamp"] <= end)):
+                    messages.append(dict(message))
+                    last = index
+                index += step
+            cursor = self._cursor(last) if len(messages) == page_size else None
+        
+        return 200, {"messages": messages, "cursor": cursor, "errorMessage": ""}
+
+
+class FakeWakuCluster:
+    """DockerManager stand-in that runs fake nodes in this process"""
+
+    def __init__(self, delay: float = FAKE_RELAY_DELAY, loss: float = FAKE_RELAY_LOSS, seed: Optional[int] = None,
+                 namespace: Optional[ClusterNamespace] = None, reset_topics: Optional[List[str]] = None):
+        self.network = FakeRelayNetwork(delay, loss, seed)
+        self.namespace = namespace or ClusterNamespace.for_worker()
+        self.network_name = self.namespace.network_name
+        # fake nodes die with the process, so there is never a pool to keep warm
+        self.warm_pool = False
+        self.reset_topics = reset_topics if reset_topics is not None else [CONTENT_TOPIC]
+        self.containers: Dict[str, FakeWakuNode] = {}
+
+    def setup_network(self):
+        pass
+
+    def cleanup_network(self):
+        pass
+
+    def _start(self, name: str, ip: str, bootstrap: List[FakeWakuNode]) -> FakeWakuNode:
+        node = FakeWakuNode(self.network, name, ip).start()
+        self.containers[name] = node
+        for peer in bootstrap:
+            self.network.connect(node, peer)
+        return node
+
+    def create_nodes_with_bootstrap(self) -> List[FakeWakuNode]:
+        """Start node1 and node2, node2 bootstrapped from node1"""
+        node1 = self._start(self.namespace.container_name("node1"), self.namespace.node_ip(0), [])
+        node2 = self._start(self.namespace.container_name("node2"), self.namespace.node_ip(1), [node1])
+        return [node1, node2]
+
+    def start_topology(self, topology: Topology, ready_timeout: float = 60.0) -> Dict[str, FakeWakuNode]:
+        for node in topology.nodes:
+            self._start(node.name, node.ip, [self.containers[peer] for peer in node.bootstrap])
+        for node in topology.nodes:
+            for peer in node.dial:
+                self.network.connect(self.containers[node.name], self.containers[peer])
+        return {node.name: self.containers[node.name] for node in topology.nodes}
+
+    def teardown(self, *args, **kwargs):
+        for node in self.containers.values():
+            node.stop()
+        self.containers.clear()
+
+    def cleanup_all(self):
+        self.teardown()
+
+    def get_container_status(self) -> Dict[str, bool]:
+        return {name: node.is_running() for name, node in self.containers.items()}
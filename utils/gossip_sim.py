@@ -0,0 +1,443 @@
+"""
+Discrete-event simulation of Waku relay over large topologies.
+Connections and the GossipSub mesh are stored as compact CSR arrays and events sit in a
+single heap, so a message can be pushed through thousands of simulated nodes in well under
+a second. Each simulated node is a regular Node whose transport answers REST calls from
+the simulator, so the wait helpers, inboxes and validators run against it unchanged.
+Eager push goes over mesh links; peers outside the mesh learn of messages through IHAVE
+gossip at the next heartbeat and fetch them with an IWANT round trip.
+"""
+
+import heapq
+import ipaddress
+import json
+import random
+import threading
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from urllib.parse import unquote
+
+from utils.config import FAKE_CACHE_SIZE
+from utils.docker_backend import DockerError, LineStream
+from utils.metrics import LatencySummary
+from utils.node_keys import NodeKey
+from utils.peers import RELAY_PROTOCOL
+from utils.test_helpers import extract_peer_id
+from utils.topology import Topology
+from utils.transport import TransportStats, json_body, make_response
+from utils.waku_api import Node
+
+EVENT_MESSAGE = 0
+EVENT_IHAVE = 1
+
+SIM_SUBNET = "10.0.0.0/8"
+SIM_TCP_PORT = 60000
+
+
+def _csr(size: int, adjacency: List[List[Tuple[int, float]]]) -> Tuple[array, array, array]:
+    """Pack per-node (neighbor, latency) lists into offsets, targets and latencies arrays"""
+    offsets, targets, latencies = array('i', [0]), array('i'), array('d')
+    for node in range(size):
+        for target, latency in adjacency[node]:
+            targets.append(target)
+            latencies.append(latency)
+        offsets.append(len(targets))
+    return offsets, targets, latencies
+
+
+@dataclass
+class PropagationStats:
+    """How one simulated message spread"""
+    reached: int
+    size: int
+    latency: LatencySummary
+    max_hops: int
+
+    @property
+    def coverage(self) -> float:
+        return self.reached / self.size if self.size else 0.0
+
+    def __str__(self) -> str:
+        return f"reached {self.reached}/{self.size} ({self.coverage:.1%}) in {self.max_hops} hop(s): {self.latency}"
+
+
+class SimulatedContainer:
+    """The container attributes Node reads, backed by the simulator"""
+
+    def __init__(self, simulator: "GossipSimulator", index: int):
+        self.simulator = simulator
+        self.backend = simulator
+        self.index = index
+        self.name = simulator.names[index]
+        self.port = index
+        self.network_ip = simulator.ips[index]
+        self.container_id = f"sim-{self.name}"
+        self.log_collector = None
+
+    @property
+    def peer_id(self) -> str:
+        return self.simulator.peer_id(self.index)
+
+    def is_running(self) -> bool:
+        return True
+
+    def get_logs(self, tail: int = 50) -> str:
+        return ""
+
+
+class SimTransport:
+    """WakuTransport stand-in that hands requests to the simulator instead of the network"""
+
+    def __init__(self, simulator: "GossipSimulator", index: int):
+        self.simulator = simulator
+        self.index = index
+        self.base_url = f"sim://{simulator.names[index]}"
+        self._stats = TransportStats()
+
+    def request(self, method: str, path: str, timeout: Optional[float] = None, **kwargs):
+        self._stats.requests += 1
+        status, payload = self.simulator.handle(self.index, method.upper(), path, json_body(kwargs))
+        if isinstance(payload, str):
+            return make_response(status, payload.encode('utf-8'), self.base_url + path, "text/plain")
+        return make_response(status, json.dumps(payload).encode('utf-8'), self.base_url + path)
+
+    def get(self, path: str, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path: str, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    @property
+    def stats(self) -> TransportStats:
+        return TransportStats(requests=self._stats.requests)
+
+    def close(self):
+        pass
+
+
+class SimulatedNode(Node):
+    """A Node whose REST calls are answered by the simulator"""
+
+    def __init__(self, simulator: "GossipSimulator", index: int):
+        super().__init__(SimulatedContainer(simulator, index), transport=SimTransport(simulator, index))
+        self.index = index
+
+
+class GossipSimulator:
+    """Relay mesh formation and message propagation over a static connection graph"""
+
+    def __init__(
+        self,
+        size: int,
+        degree: int = 8,
+        edges: Optional[Iterable[Tuple[int, int]]] = None,
+        link_latency: Tuple[float, float] = (0.005, 0.05),
+        mesh_degree: int = 6,
+        mesh_low: int = 4,
+        mesh_high: int = 12,
+        gossip_degree: int = 6,
+        heartbeat: float = 1.0,
+        processing_delay: float = 0.0005,
+        names: Optional[Sequence[str]] = None,
+        ips: Optional[Sequence[str]] = None,
+        realtime: bool = True,
+        time_scale: float = 1.0,
+        cache_size: int = FAKE_CACHE_SIZE,
+        seed: Optional[int] = None
+    ):
+        if size < 1:
+            raise ValueError("Simulation needs at least one node")
+        self.size = size
+        self.random = random.Random(seed)
+        self.link_latency = link_latency
+        self.mesh_degree, self.mesh_low, self.mesh_high = mesh_degree, mesh_low, mesh_high
+        self.gossip_degree = gossip_degree
+        self.heartbeat = heartbeat
+        self.processing_delay = processing_delay
+        self.realtime = realtime
+        self.time_scale = time_scale
+        self.cache_size = cache_size
+
+        self.names = list(names) if names else [f"node{i + 1}" for i in range(size)]
+        base = ipaddress.ip_network(SIM_SUBNET).network_address
+        self.ips = list(ips) if ips else [str(base + i + 2) for i in range(size)]
+
+        pairs = set(edges) if edges is not None else self._random_edges(degree)
+        adjacency: List[List[Tuple[int, float]]] = [[] for _ in range(size)]
+        for a, b in pairs:
+            if a == b:
+                continue
+            latency = self.random.uniform(*link_latency)
+            adjacency[a].append((b, latency))
+            adjacency[b].append((a, latency))
+        self.offsets, self.targets, self.latencies = _csr(size, adjacency)
+        self.mesh_offsets, self.mesh_targets, self.mesh_latencies = self._form_mesh(adjacency)
+
+        self._events: List[tuple] = []
+        self._seq = 0
+        self._clock = 0.0
+        self._epoch = time.monotonic()
+        self._lock = threading.RLock()
+        self._messages: List[Dict] = []
+        self._published_at = array('d')
+        self._seen: List[bytearray] = []
+        self._arrival: List[array] = []
+        self._hops: List[array] = []
+        self.duplicates = 0
+        self.events_processed = 0
+
+        self._subscriptions: Dict[int, Set[str]] = {}
+        self._caches: Dict[Tuple[int, str], Deque[Dict]] = {}
+        self._peer_ids: Dict[int, str] = {}
+        self._keys: Dict[int, NodeKey] = {}
+        self._nodes: Dict[int, SimulatedNode] = {}
+
+    @classmethod
+    def from_topology(cls, topology: Topology, **kwargs) -> "GossipSimulator":
+        """Simulate a TopologyBuilder layout, keeping its node names and addresses"""
+        index = {node.name: node.index for node in topology.nodes}
+        edges = [(index[a], index[b]) for a, b in topology.edges]
+        return cls(len(topology.nodes), edges=edges, names=[n.name for n in topology.nodes],
+                   ips=[n.ip for n in topology.nodes], **kwargs)
+
+    def _random_edges(self, degree: int) -> Set[Tuple[int, int]]:
+        """Connected random graph with roughly the given mean degree"""
+        edges: Set[Tuple[int, int]] = set()
+        for node in range(1, self.size):
+            edges.add((self.random.randrange(node), node))
+        extra = max(degree // 2 - 1, 0)
+        for node in range(self.size):
+            for _ in range(extra):
+                other = self.random.randrange(self.size)
+                if other != node:
+                    edges.add((min(node, other), max(node, other)))
+        return edges
+
+    def _form_mesh(self, adjacency: List[List[Tuple[int, float]]]) -> Tuple[array, array, array]:
+        """
+        GRAFT random neighbors until each node has mesh_degree, respecting mesh_high on both
+        ends, then top up nodes still below mesh_low the way a heartbeat would: from the
+        least-loaded neighbor with room, or else from a full neighbor that first PRUNEs a peer
+        it can spare (one still above mesh_low), so no mesh ever exceeds mesh_high.
+        """
+        mesh: List[Dict[int, float]] = [{} for _ in range(self.size)]
+        order = list(range(self.size))
+        self.random.shuffle(order)
+        for node in order:
+            candidates = [(peer, latency) for peer, latency in adjacency[node]
+                          if peer not in mesh[node] and len(mesh[peer]) < self.mesh_high]
+            self.random.shuffle(candidates)
+            while len(mesh[node]) < self.mesh_degree and candidates:
+                peer, latency = candidates.pop()
+                mesh[node][peer] = latency
+                mesh[peer][node] = latency
+        for node in order:
+            while len(mesh[node]) < self.mesh_low:
+                outside = [(peer, latency) for peer, latency in adjacency[node] if peer not in mesh[node]]
+                self.random.shuffle(outside)
+                with_room = [(peer, latency) for peer, latency in outside if len(mesh[peer]) < self.mesh_high]
+                if with_room:
+                    peer, latency = min(with_room, key=lambda candidate: len(mesh[candidate[0]]))
+                else:
+                    spare = next(((peer, latency, other) for peer, latency in outside
+                                  for other in mesh[peer] if len(mesh[other]) > self.mesh_low), None)
+                    if spare is None:
+                        break
+                    peer, latency, other = spare
+                    del mesh[peer][other]
+                    del mesh[other][peer]
+                mesh[node][peer] = latency
+                mesh[peer][node] = latency
+        return _csr(self.size, [list(links.items()) for links in mesh])
+
+    # --- clock and event loop ---
+
+    def now(self) -> float:
+        if self.realtime:
+            return max((time.monotonic() - self._epoch) * self.time_scale, self._clock)
+        return self._clock
+
+    def _push(self, t: float, kind: int, node: int, sender: int, msg: int, hops: int, latency: float = 0.0):
+        self._seq += 1
+        heapq.heappush(self._events, (t, self._seq, kind, node, sender, msg, hops, latency))
+
+    def run(self, until: Optional[float] = None) -> int:
+        """Process events up to simulated time until (default: until nothing is left) and return how many"""
+        processed = 0
+        with self._lock:
+            events = self._events
+            while events and (until is None or events[0][0] <= until):
+                t, _, kind, node, sender, msg, hops, latency = heapq.heappop(events)
+                self._clock = t
+                if kind == EVENT_MESSAGE:
+                    self._receive(t, node, sender, msg, hops)
+                elif not self._seen[msg][node]:
+                    # IHAVE for a message we lack: IWANT goes back and the message follows
+                    self._push(t + 2 * latency, EVENT_MESSAGE, node, sender, msg, hops)
+                processed += 1
+            if until is not None:
+                self._clock = max(self._clock, until)
+            self.events_processed += processed
+        return processed
+
+    def _sync(self):
+        if self.realtime:
+            self.run(until=self.now())
+
+    def _receive(self, t: float, node: int, sender: int, msg: int, hops: int):
+        seen = self._seen[msg]
+        if seen[node]:
+            self.duplicates += 1
+            return
+        seen[node] = 1
+        self._arrival[msg][node] = t
+        self._hops[msg][node] = hops
+
+        message = self._messages[msg]
+        topic = message["contentTopic"]
+        if topic in self._subscriptions.get(node, ()):
+            cache = self._caches.get((node, topic))
+            if cache is None:
+                cache = self._caches[(node, topic)] = deque(maxlen=self.cache_size)
+            cache.append(message)
+
+        forward_at = t + self.processing_delay
+        offsets, targets, latencies = self.mesh_offsets, self.mesh_targets, self.mesh_latencies
+        mesh_peers = set()
+        for k in range(offsets[node], offsets[node + 1]):
+            peer = targets[k]
+            mesh_peers.add(peer)
+            if peer != sender:
+                self._push(forward_at + latencies[k], EVENT_MESSAGE, peer, node, msg, hops + 1)
+
+        if self.gossip_degree:
+            lazy = [k for k in range(self.offsets[node], self.offsets[node + 1])
+                    if self.targets[k] not in mesh_peers and self.targets[k] != sender]
+            if lazy:
+                next_heartbeat = (int(t / self.heartbeat) + 1) * self.heartbeat
+                for k in self.random.sample(lazy, min(self.gossip_degree, len(lazy))):
+                    self._push(next_heartbeat + self.latencies[k], EVENT_IHAVE, self.targets[k], node, msg,
+                               hops + 1, self.latencies[k])
+
+    # --- publishing and results ---
+
+    def publish(self, node: int, content_topic: str, payload_b64: str, at: Optional[float] = None) -> int:
+        """Inject a message at node and return its message index"""
+        with self._lock:
+            t = self.now() if at is None else at
+            msg = len(self._messages)
+            self._messages.append({
+                "payload": payload_b64,
+                "contentTopic": content_topic,
+                "version": 0,
+                "timestamp": time.time_ns(),
+            })
+            self._published_at.append(t)
+            self._seen.append(bytearray(self.size))
+            self._arrival.append(array('d', [float("inf")]) * self.size)
+            self._hops.append(array('i', [0]) * self.size)
+            self._push(t, EVENT_MESSAGE, node, -1, msg, 0)
+            return msg
+
+    def propagation(self, msg: int) -> PropagationStats:
+        with self._lock:
+            start = self._published_at[msg]
+            arrivals = self._arrival[msg]
+            reached = [i for i in range(self.size) if self._seen[msg][i]]
+            return PropagationStats(
+                reached=len(reached),
+                size=self.size,
+                latency=LatencySummary.from_values(arrivals[i] - start for i in reached),
+                max_hops=max((self._hops[msg][i] for i in reached), default=0)
+            )
+
+    def node(self, index: int) -> SimulatedNode:
+        node = self._nodes.get(index)
+        if node is None:
+            node = self._nodes[index] = SimulatedNode(self, index)
+        return node
+
+    @property
+    def nodes(self) -> List[SimulatedNode]:
+        return [self.node(i) for i in range(self.size)]
+
+    def neighbors(self, index: int) -> List[int]:
+        return list(self.targets[self.offsets[index]:self.offsets[index + 1]])
+
+    def mesh_peers(self, index: int) -> List[int]:
+        return list(self.mesh_targets[self.mesh_offsets[index]:self.mesh_offsets[index + 1]])
+
+    # --- identities, derived on demand since key generation dominates at this scale ---
+
+    def _key(self, index: int) -> NodeKey:
+        key = self._keys.get(index)
+        if key is None:
+            key = self._keys[index] = NodeKey.from_seed(self.names[index])
+        return key
+
+    def peer_id(self, index: int) -> str:
+        peer_id = self._peer_ids.get(index)
+        if peer_id is None:
+            peer_id = self._peer_ids[index] = self._key(index).peer_id
+        return peer_id
+
+    def multiaddr(self, index: int) -> str:
+        return f"/ip4/{self.ips[index]}/tcp/{SIM_TCP_PORT}/p2p/{self.peer_id(index)}"
+
+    # --- REST emulation for SimTransport ---
+
+    def handle(self, index: int, method: str, path: str, body=None):
+        with self._lock:
+            self._sync()
+            if method == "GET" and path == "/health":
+                return 200, "Node is healthy"
+            if method == "GET" and path == "/debug/v1/info":
+                return 200, {"listenAddresses": [self.multiaddr(index)],
+                             "enrUri": self._key(index).enr(self.ips[index], SIM_TCP_PORT, SIM_TCP_PORT)}
+            if path == "/admin/v1/peers":
+                neighbors = self.neighbors(index)
+                if method == "GET":
+                    return 200, [{"multiaddr": self.multiaddr(peer),
+                                  "protocols": [{"protocol": RELAY_PROTOCOL, "connected": True}]}
+                                 for peer in neighbors]
+                known = {self.peer_id(peer) for peer in neighbors}
+                missing = [addr for addr in body or [] if extract_peer_id(addr) not in known]
+                if missing:
+                    return 400, f"Dialling outside the simulated topology is not supported: {missing}"
+                return 200, "OK"
+            if path == "/relay/v1/auto/subscriptions":
+                topics = self._subscriptions.setdefault(index, set())
+                if method == "POST":
+                    topics.update(body or [])
+                else:
+                    topics.difference_update(body or [])
+                    for topic in body or []:
+                        self._caches.pop((index, topic), None)
+                return 200, "OK"
+            if method == "POST" and path == "/relay/v1/auto/messages":
+                if not body or "payload" not in body or "contentTopic" not in body:
+                    return 400, "Missing payload or contentTopic"
+                self.publish(index, body["contentTopic"], body["payload"])
+                # Deliver anything due immediately, such as the publisher's own copy
+                self._sync()
+                return 200, "OK"
+            if method == "GET" and path.startswith("/relay/v1/auto/messages/"):
+                topic = unquote(path[len("/relay/v1/auto/messages/"):])
+                if topic not in self._subscriptions.get(index, ()):
+                    return 400, f"Not subscribed to topic: {topic}"
+                return 200, list(self._caches.pop((index, topic), []))
+            return 404, "Not found"
+
+    # Log access for LogFollower; simulated nodes have no logs, so followers fall back to polling
+
+    def stream_logs(self, name: str, since: Optional[float] = None, tail: Optional[int] = None) -> LineStream:
+        raise DockerError(f"Simulated node {name} has no log stream")
+
+    def stream_stats(self, name: str) -> LineStream:
+        raise DockerError(f"Simulated node {name} has no resource stats")
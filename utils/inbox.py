@@ -0,0 +1,176 @@
+"""
+Accumulating message inbox for a node's relay cache.
+nwaku drains /relay/v1/auto/messages on every read, so anything one poll returns is gone
+for the next caller. The inbox keeps every polled message, deduplicated and indexed by
+message hash and payload, so several waiters can share one polling stream.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from utils.config import INBOX_MAX_MESSAGES, INBOX_MAX_AGE, INBOX_EVICTION, MESSAGE_TIMEOUT
+from utils.test_helpers import wait_for, wait_for_shared
+
+EVICTION_POLICIES = ("fifo", "lru")
+
+
+def message_hash(message: dict) -> str:
+    """Stable identity of a relay message; uses the node-provided hash when present"""
+    for key in ("messageHash", "hash"):
+        if message.get(key):
+            return message[key]
+    digest = hashlib.sha256()
+    for key in ("contentTopic", "payload", "timestamp", "meta", "version"):
+        digest.update(str(message.get(key, "")).encode('utf-8'))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class MessageInbox:
+    """Bounded, deduplicated store of the messages polled for one node and content topic"""
+
+    def __init__(
+        self,
+        fetch: Callable[[], List[dict]],
+        max_messages: int = INBOX_MAX_MESSAGES,
+        max_age: Optional[float] = INBOX_MAX_AGE,
+        eviction: str = INBOX_EVICTION
+    ):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{eviction}', expected one of {EVICTION_POLICIES}")
+        self.fetch = fetch
+        self.max_messages = max_messages
+        self.max_age = max_age
+        self.eviction = eviction
+
+        self._messages: "OrderedDict[str, dict]" = OrderedDict()
+        self._received_at: Dict[str, float] = {}
+        self._by_payload: Dict[str, List[str]] = {}
+        self._seen_counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self.duplicates = 0
+        self.evicted = 0
+
+    def poll(self) -> List[dict]:
+        """Fetch once from the node and return only the messages not seen before"""
+        with self._poll_lock:
+            fetched = self.fetch() or []
+            new_messages = []
+            now = time.monotonic()
+            with self._lock:
+                for message in fetched:
+                    key = message_hash(message)
+                    self._seen_counts[key] = self._seen_counts.get(key, 0) + 1
+                    if key in self._messages:
+                        self.duplicates += 1
+                        continue
+                    self._messages[key] = message
+                    self._received_at[key] = now
+                    self._by_payload.setdefault(message.get("payload", ""), []).append(key)
+                    new_messages.append(message)
+                self._evict(now)
+            return new_messages
+
+    def refresh(self) -> List[dict]:
+        """Poll, then return every retained message; a drop-in get_messages_func for the wait helpers"""
+        self.poll()
+        return self.messages()
+
+    @property
+    def source_key(self) -> tuple:
+        """Poll scheduler key shared by every wait on this inbox"""
+        return ("inbox", id(self))
+
+    def messages(self) -> List[dict]:
+        with self._lock:
+            return list(self._messages.values())
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            message = self._messages.get(key)
+            if message is not None and self.eviction == "lru":
+                self._messages.move_to_end(key)
+            return message
+
+    def find(self, payload: str) -> Optional[dict]:
+        """Return the most recent retained message with this base64 payload"""
+        with self._lock:
+            keys = self._by_payload.get(payload)
+            if not keys:
+                return None
+            if self.eviction == "lru":
+                self._messages.move_to_end(keys[-1])
+            return self._messages[keys[-1]]
+
+    def received_at(self, key: str) -> Optional[float]:
+        """Monotonic time at which the message was first polled"""
+        with self._lock:
+            return self._received_at.get(key)
+
+    def seen_count(self, key: str) -> int:
+        """How many polls returned a retained message"""
+        with self._lock:
+            return self._seen_counts.get(key, 0)
+
+    def wait_for_payload(self, payload: str, timeout: float = MESSAGE_TIMEOUT,
+                         poll_interval: Optional[float] = None) -> dict:
+        """
+        Wait until a message with this payload has been polled. By default all waiters on
+        this inbox share the coalescing poll scheduler; pass poll_interval for a private
+        fixed-interval loop instead.
+        """
+        error_message = f"Payload {payload} not received within {timeout} seconds"
+        found = self.find(payload)
+        if found is not None:
+            return found
+
+        if poll_interval is not None:
+            return wait_for(
+                lambda: self.find(payload) or (self.poll() and self.find(payload)),
+                timeout=timeout,
+                poll_interval=poll_interval,
+                error_message=error_message
+            )
+        return wait_for_shared(self.source_key, self.refresh, lambda _: self.find(payload),
+                               timeout=timeout, error_message=error_message)
+
+    def clear(self):
+        with self._lock:
+            self._messages.clear()
+            self._received_at.clear()
+            self._by_payload.clear()
+            self._seen_counts.clear()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._messages
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._messages)
+
+    def _evict(self, now: float):
+        # _received_at keeps arrival order even when LRU reorders _messages, so expiry scans it
+        if self.max_age is not None:
+            while self._received_at:
+                key, received_at = next(iter(self._received_at.items()))
+                if now - received_at <= self.max_age:
+                    break
+                self._remove(key)
+        while len(self._messages) > self.max_messages:
+            self._remove(next(iter(self._messages)))
+
+    def _remove(self, key: str):
+        message = self._messages.pop(key)
+        del self._received_at[key]
+        self._seen_counts.pop(key, None)
+        payload_keys = self._by_payload.get(message.get("payload", ""), [])
+        if key in payload_keys:
+            payload_keys.remove(key)
+        if not payload_keys:
+            self._by_payload.pop(message.get("payload", ""), None)
+        self.evicted += 1
@@ -0,0 +1,184 @@
+"""
+End-to-end propagation latency tracking across nodes.
+Each published payload carries a run ID, sequence number and send time. Receiving nodes
+are polled through their message inboxes on a background thread from the first publish on,
+so arrivals are timed as they happen and the relay cache is drained before it overflows,
+and every arrival is matched back to its send.
+"""
+
+import base64
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from utils.config import MESSAGE_TIMEOUT, POLL_MIN_INTERVAL
+from utils.inbox import message_hash
+from utils.metrics import LatencySummary
+
+logger = logging.getLogger(__name__)
+
+STAMP_PREFIX = "lat"
+
+
+def stamp_payload(run_id: str, seq: int, sent_ns: int, body: str = "") -> str:
+    return f"{STAMP_PREFIX}|{run_id}|{seq}|{sent_ns}|{body}"
+
+
+def parse_stamp(text: str):
+    """Return (run_id, seq, sent_ns) from a stamped payload, or None if it is not one"""
+    parts = text.split("|", 4)
+    if len(parts) < 5 or parts[0] != STAMP_PREFIX:
+        return None
+    try:
+        return parts[1], int(parts[2]), int(parts[3])
+    except ValueError:
+        return None
+
+
+@dataclass
+class NodeLatencyReport:
+    node: str
+    latency: LatencySummary
+    received: int
+    lost: int
+    duplicates: int
+
+
+@dataclass
+class PropagationReport:
+    sent: int
+    nodes: Dict[str, NodeLatencyReport] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        lines = [f"Propagation of {self.sent} message(s):"]
+        for report in self.nodes.values():
+            lines.append(f"  {report.node}: {report.latency} received={report.received} "
+                         f"lost={report.lost} duplicates={report.duplicates}")
+        return "\n".join(lines)
+
+
+class PropagationTracker:
+    """Publishes stamped messages on one node and measures their arrival on the others"""
+
+    def __init__(self, publisher, receivers: Sequence, content_topic: str,
+                 poll_interval: float = POLL_MIN_INTERVAL, run_id: Optional[str] = None):
+        self.publisher = publisher
+        self.receivers = list(receivers)
+        self.content_topic = content_topic
+        self.poll_interval = poll_interval
+        self.run_id = run_id or uuid.uuid4().hex[:8]
+
+        self._sent: Dict[int, int] = {}
+        self._arrivals: Dict[str, Dict[int, int]] = {self._name(r): {} for r in self.receivers}
+        self._arrival_keys: Dict[str, Dict[int, str]] = {self._name(r): {} for r in self.receivers}
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _name(node) -> str:
+        return getattr(node, "name", None) or str(node.port)
+
+    def subscribe(self):
+        for receiver in self.receivers:
+            receiver.subscribe_to_topic(self.content_topic)
+
+    def publish(self, count: int = 1, body: str = "", interval: float = 0.0) -> List[int]:
+        """Publish count stamped messages and return their sequence numbers"""
+        self.start_polling()
+        sequences = []
+        for _ in range(count):
+            with self._lock:
+                seq = self._next_seq
+                self._next_seq += 1
+            sent_ns = time.time_ns()
+            self.publisher.publish_message(self.content_topic, stamp_payload(self.run_id, seq, sent_ns, body))
+            with self._lock:
+                self._sent[seq] = sent_ns
+            sequences.append(seq)
+            if interval:
+                time.sleep(interval)
+        return sequences
+
+    def poll(self):
+        """Poll every receiver once and record new arrivals"""
+        for receiver in self.receivers:
+            name = self._name(receiver)
+            inbox = receiver.get_inbox(self.content_topic)
+            new_messages = inbox.poll()
+            arrived_ns = time.time_ns()
+            with self._lock:
+                for message in new_messages:
+                    try:
+                        stamp = parse_stamp(base64.b64decode(message.get("payload", "")).decode('utf-8'))
+                    except (ValueError, UnicodeDecodeError):
+                        continue
+                    if stamp is None or stamp[0] != self.run_id:
+                        continue
+                    seq = stamp[1]
+                    if seq not in self._arrivals[name]:
+                        self._arrivals[name][seq] = arrived_ns
+                        self._arrival_keys[name][seq] = message_hash(message)
+
+    def start_polling(self):
+        """Poll the receivers in the background until stop_polling; publish starts this itself"""
+        with self._lock:
+            if self._poller is not None and self._poller.is_alive():
+                return
+            self._stop.clear()
+            self._poller = threading.Thread(target=self._poll_loop, name="waku-latency-poll", daemon=True)
+            self._poller.start()
+
+    def stop_polling(self):
+        self._stop.set()
+        poller = self._poller
+        if poller is not None and poller is not threading.current_thread():
+            poller.join()
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.debug(f"Arrival poll failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def wait_for_arrivals(self, timeout: float = MESSAGE_TIMEOUT) -> bool:
+        """Wait until every sent message has reached every receiver, then stop polling; False on timeout"""
+        deadline = time.monotonic() + timeout
+        self.start_polling()
+        try:
+            while not self._all_arrived():
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Not all messages arrived within {timeout}s")
+                    return False
+                time.sleep(self.poll_interval)
+            return True
+        finally:
+            self.stop_polling()
+
+    def report(self) -> PropagationReport:
+        with self._lock:
+            report = PropagationReport(sent=len(self._sent))
+            for receiver in self.receivers:
+                name = self._name(receiver)
+                arrivals = self._arrivals[name]
+                latencies = [(arrivals[seq] - self._sent[seq]) / 1e9 for seq in arrivals if seq in self._sent]
+                inbox = receiver.get_inbox(self.content_topic)
+                duplicates = sum(max(inbox.seen_count(key) - 1, 0) for key in self._arrival_keys[name].values())
+                report.nodes[name] = NodeLatencyReport(
+                    node=name,
+                    latency=LatencySummary.from_values(latencies),
+                    received=len(arrivals),
+                    lost=len(self._sent) - len(arrivals),
+                    duplicates=duplicates
+                )
+            return report
+
+    def _all_arrived(self) -> bool:
+        with self._lock:
+            return all(len(arrivals) >= len(self._sent) for arrivals in self._arrivals.values())
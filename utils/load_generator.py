@@ -0,0 +1,248 @@
+"""
+Open-loop load generation.
+Messages are published on a fixed timetable derived from a rate schedule, whether or not
+earlier requests have returned. Every send records when it was meant to go out as well as
+when it actually did, so latency can be measured from the intended time and queueing delay
+is not hidden (coordinated omission).
+"""
+
+import logging
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import requests
+
+from utils.config import ASYNC_MAX_WORKERS, CONTENT_TOPIC
+from utils.metrics import LatencySummary, histogram
+from utils.waku_api import encode_payload
+
+logger = logging.getLogger(__name__)
+
+
+class RateSchedule(ABC):
+    """Target publish rate, in messages per second, as a function of seconds into the run"""
+
+    @abstractmethod
+    def rate_at(self, t: float) -> float:
+        ...
+
+    def send_times(self, duration: float) -> Iterator[float]:
+        """
+        Intended send offsets for a run of the given length: one send each time the
+        integral of the rate crosses a whole number, integrated in 1ms steps.
+        """
+        step = 0.001
+        end = duration - 1e-9  # a send landing on the end after float drift belongs to the next run
+        t, due = 0.0, 0.0
+        while t < end:
+            rate = self.rate_at(t)
+            if rate > 0 and due <= rate * step:
+                t += due / rate
+                if t < end:
+                    yield t
+                due = 1.0
+                continue
+            due -= rate * step
+            t += step
+
+
+@dataclass
+class ConstantRate(RateSchedule):
+    rate: float
+
+    def rate_at(self, t: float) -> float:
+        return self.rate
+
+
+@dataclass
+class RampRate(RateSchedule):
+    """Linear ramp from start to end over ramp_time seconds, then hold end"""
+    start: float
+    end: float
+    ramp_time: float
+
+    def rate_at(self, t: float) -> float:
+        if self.ramp_time <= 0 or t >= self.ramp_time:
+            return self.end
+        return self.start + (self.end - self.start) * t / self.ramp_time
+
+
+@dataclass
+class StepRate(RateSchedule):
+    """Consecutive (seconds, rate) steps; the last rate holds after the final step"""
+    steps: List[Tuple[float, float]]
+
+    def rate_at(self, t: float) -> float:
+        elapsed = 0.0
+        for seconds, rate in self.steps:
+            elapsed += seconds
+            if t < elapsed:
+                return rate
+        return self.steps[-1][1] if self.steps else 0.0
+
+
+@dataclass
+class BurstRate(RateSchedule):
+    """Base rate with a burst of burst_rate lasting burst_length seconds every period seconds"""
+    base: float
+    burst_rate: float
+    period: float
+    burst_length: float
+
+    def rate_at(self, t: float) -> float:
+        return self.burst_rate if t % self.period < self.burst_length else self.base
+
+
+def parse_schedule(spec: str, duration: float) -> RateSchedule:
+    """
+    Build a schedule from a command-line spec:
+    "constant:RATE", "ramp:START:END" (over the whole run), "step:SECONDS@RATE,SECONDS@RATE,..."
+    or "burst:BASE:PEAK:PERIOD:LENGTH".
+    """
+    kind, _, args = spec.partition(":")
+    try:
+        if kind == "constant":
+            return ConstantRate(float(args))
+        if kind == "ramp":
+            start, end = (float(v) for v in args.split(":"))
+            return RampRate(start, end, duration)
+        if kind == "step":
+            steps = [tuple(float(v) for v in step.split("@")) for step in args.split(",")]
+            return StepRate([(seconds, rate) for seconds, rate in steps])
+        if kind == "burst":
+            base, peak, period, length = (float(v) for v in args.split(":"))
+            return BurstRate(base, peak, period, length)
+    except ValueError:
+        raise ValueError(f"Malformed schedule '{spec}'")
+    raise ValueError(f"Unknown schedule '{kind}', expected constant, ramp, step or burst")
+
+
+@dataclass
+class LoadSample:
+    seq: int
+    node: str
+    intended: float
+    started: float
+    finished: float
+    ok: bool
+    error: Optional[str] = None
+
+    @property
+    def service_time(self) -> float:
+        """What a closed-loop client would report: request start to response"""
+        return self.finished - self.started
+
+    @property
+    def corrected_latency(self) -> float:
+        """Intended send time to response, including any time spent queued behind earlier sends"""
+        return self.finished - self.intended
+
+
+@dataclass
+class LoadReport:
+    schedule: RateSchedule
+    duration: float = 0.0
+    samples: List[LoadSample] = field(default_factory=list)
+
+    @property
+    def sent(self) -> int:
+        return len(self.samples)
+
+    @property
+    def failed(self) -> List[LoadSample]:
+        return [s for s in self.samples if not s.ok]
+
+    @property
+    def throughput(self) -> float:
+        delivered = self.sent - len(self.failed)
+        return delivered / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def service_latency(self) -> LatencySummary:
+        return LatencySummary.from_values(s.service_time for s in self.samples if s.ok)
+
+    @property
+    def corrected_latency(self) -> LatencySummary:
+        return LatencySummary.from_values(s.corrected_latency for s in self.samples if s.ok)
+
+    @property
+    def send_lag(self) -> LatencySummary:
+        """How far actual sends trailed the timetable"""
+        return LatencySummary.from_values(s.started - s.intended for s in self.samples)
+
+    def histogram(self, corrected: bool = True) -> List[Tuple[float, int]]:
+        return histogram(s.corrected_latency if corrected else s.service_time for s in self.samples if s.ok)
+
+    def __str__(self) -> str:
+        lines = [
+            f"Sent {self.sent} message(s) in {self.duration:.2f}s: {self.throughput:.1f} msg/s delivered, "
+            f"{len(self.failed)} failed",
+            f"  service latency:   {self.service_latency}",
+            f"  corrected latency: {self.corrected_latency}",
+            f"  send lag:          {self.send_lag}",
+            "  corrected latency histogram:",
+        ]
+        for bound, count in self.histogram():
+            if count:
+                label = f"<= {bound * 1000:g}ms" if bound != float("inf") else "slower"
+                lines.append(f"    {label:>10}: {count}")
+        return "\n".join(lines)
+
+
+class LoadGenerator:
+    """Publishes to one or more nodes on an open-loop timetable and reports corrected latency"""
+
+    def __init__(self, nodes: Sequence, schedule: RateSchedule, content_topic: str = CONTENT_TOPIC,
+                 payload_size: int = 64, max_workers: int = ASYNC_MAX_WORKERS):
+        if not nodes:
+            raise ValueError("Load generator needs at least one node")
+        self.nodes = list(nodes)
+        self.schedule = schedule
+        self.content_topic = content_topic
+        self.payload_size = payload_size
+        self.max_workers = max_workers
+        self.run_id = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+
+    def _payload(self, seq: int) -> str:
+        prefix = f"load|{self.run_id}|{seq}|"
+        return encode_payload(prefix + "x" * max(self.payload_size - len(prefix), 0))
+
+    @staticmethod
+    def _name(node) -> str:
+        return getattr(node, "name", None) or str(node.port)
+
+    def run(self, duration: float) -> LoadReport:
+        report = LoadReport(self.schedule)
+
+        def _send(seq: int, node, intended: float):
+            started = time.perf_counter()
+            try:
+                node.publish_encoded(self.content_topic, self._payload(seq))
+                ok, error = True, None
+            except requests.exceptions.HTTPError as e:
+                ok, error = False, f"{e.response.status_code}: {e.response.text}"
+            except requests.exceptions.RequestException as e:
+                ok, error = False, str(e)
+            sample = LoadSample(seq, self._name(node), intended, started, time.perf_counter(), ok, error)
+            with self._lock:
+                report.samples.append(sample)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="waku-load") as pool:
+            for seq, offset in enumerate(self.schedule.send_times(duration)):
+                intended = start + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                # Never wait for earlier sends: a saturated pool shows up as send lag
+                pool.submit(_send, seq, self.nodes[seq % len(self.nodes)], intended)
+        report.duration = time.perf_counter() - start
+        report.samples.sort(key=lambda s: s.seq)
+        logger.info(str(report))
+        return report
@@ -0,0 +1,184 @@
+"""
+Offline analysis of nwaku TRACE logs.
+Captured log files are memory-mapped and scanned once with precompiled byte patterns, so
+multi-gigabyte logs are never loaded into memory. Every line that carries a message hash
+becomes an event in a message-hash -> events index, from which each node's arrival latency
+(time since the message's origin), per-hop relay latency and gossip fan-out are computed
+across nodes (containers share the host clock). Per-hop latency pairs a sender's forward
+event with the receiver's receive event, so it needs the peer ID -> node mapping, which
+map_peers builds from the containers' node keys.
+"""
+
+import mmap
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.config import LOG_TRACE_EVENTS, LOG_TRACE_HASH_PATTERN, LOG_TRACE_PEER_PATTERN
+from utils.metrics import LatencySummary
+from utils.node_keys import NodeKey
+
+# chronicles textlines prefix, e.g. "TRC 2024-01-10 12:34:56.789+00:00"
+_TIMESTAMP_PATTERN = rb"^[A-Z]{3} (\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d(?:\.\d+)?(?:[+-]\d\d:\d\d|Z)?)"
+
+
+@dataclass
+class TraceEvent:
+    node: str
+    kind: str
+    timestamp: Optional[float]
+    peer: Optional[str]
+    offset: int
+
+
+@dataclass
+class RelayReport:
+    """Arrival latency, per-hop latency and fan-out over every indexed message"""
+    messages: int
+    latency: LatencySummary
+    fan_out: Dict[str, float] = field(default_factory=dict)
+    hop_latency: LatencySummary = field(default_factory=LatencySummary)
+
+    def __str__(self) -> str:
+        lines = [f"Arrival latency of {self.messages} message(s): {self.latency}"]
+        if self.hop_latency.count:
+            lines.append(f"  per hop: {self.hop_latency}")
+        for node, mean in sorted(self.fan_out.items()):
+            lines.append(f"  {node}: mean fan-out {mean:.1f}")
+        return "\n".join(lines)
+
+
+class TraceLogAnalyzer:
+    """Builds a message-hash -> events index from nwaku TRACE logs"""
+
+    def __init__(self, events: Optional[Dict[str, str]] = None, hash_pattern: str = LOG_TRACE_HASH_PATTERN,
+                 peer_pattern: str = LOG_TRACE_PEER_PATTERN, peer_nodes: Optional[Dict[str, str]] = None):
+        # Only lines with a hash are candidates; the event patterns then classify them
+        self._line_re = re.compile(rb"(?m)^.*?" + hash_pattern.encode() + rb".*$")
+        self._event_res = [(kind, re.compile(pattern.encode()))
+                           for kind, pattern in (events or LOG_TRACE_EVENTS).items()]
+        self._peer_re = re.compile(peer_pattern.encode())
+        self._timestamp_re = re.compile(_TIMESTAMP_PATTERN)
+        self._timestamps: Dict[bytes, Optional[float]] = {}
+        self.index: Dict[str, List[TraceEvent]] = defaultdict(list)
+        self.lines_indexed = 0
+        # peer ID -> node name, to tell which node a logged peer is
+        self.peer_nodes: Dict[str, str] = dict(peer_nodes or {})
+
+    def add_log(self, node: str, path: str) -> int:
+        """Scan one node's log file and return the number of events indexed from it"""
+        if os.path.getsize(path) == 0:
+            return 0
+        indexed = 0
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for match in self._line_re.finditer(mapped):
+                line = match.group(0)
+                kind = next((k for k, pattern in self._event_res if pattern.search(line)), None)
+                if kind is None:
+                    continue
+                peer = self._peer_re.search(line)
+                self.index[match.group(1).decode('ascii').lower()].append(TraceEvent(
+                    node=node,
+                    kind=kind,
+                    timestamp=self._timestamp(line),
+                    peer=peer.group(1).decode('ascii') if peer else None,
+                    offset=match.start()
+                ))
+                indexed += 1
+        self.lines_indexed += indexed
+        return indexed
+
+    def add_collectors(self, collectors) -> int:
+        """Index the on-disk files of LogCollectors, keyed by container name"""
+        return sum(self.add_log(name, collector.path) for name, collector in collectors.items())
+
+    def map_peers(self, containers: Iterable):
+        """Learn each container's peer ID, from its node key or the key its name seeds"""
+        for container in containers:
+            peer_id = getattr(container, "peer_id", None) or NodeKey.from_seed(container.name).peer_id
+            self.peer_nodes[peer_id] = container.name
+
+    def _timestamp(self, line: bytes) -> Optional[float]:
+        match = self._timestamp_re.match(line)
+        if not match:
+            return None
+        text = match.group(1)
+        # Many lines share a timestamp at millisecond resolution, so parse each one once
+        if text not in self._timestamps:
+            try:
+                self._timestamps[text] = datetime.fromisoformat(text.decode('ascii').replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                self._timestamps[text] = None
+        return self._timestamps[text]
+
+    def events(self, msg_hash: str) -> List[TraceEvent]:
+        return self.index.get(msg_hash.lower(), [])
+
+    def first_seen(self, msg_hash: str) -> Dict[str, float]:
+        """Earliest timestamp at which each node logged the message"""
+        seen: Dict[str, float] = {}
+        for event in self.events(msg_hash):
+            if event.timestamp is not None and event.timestamp < seen.get(event.node, float("inf")):
+                seen[event.node] = event.timestamp
+        return seen
+
+    def arrival_latencies(self, msg_hash: str) -> Dict[str, float]:
+        """Seconds from the message's origin (its publish, else its earliest event) to each other node"""
+        events = [e for e in self.events(msg_hash) if e.timestamp is not None]
+        if not events:
+            return {}
+        published = [e for e in events if e.kind == "publish"]
+        origin = min(published or events, key=lambda e: e.timestamp)
+        return {node: seen - origin.timestamp
+                for node, seen in self.first_seen(msg_hash).items() if node != origin.node}
+
+    def hop_latencies(self, msg_hash: str) -> Dict[Tuple[str, str], float]:
+        """
+        Seconds from a sender's forward event to the receiver's receive event naming that
+        sender, per (sender, receiver) hop; hops whose peers are not in peer_nodes are skipped
+        """
+        node_peers = {node: peer for peer, node in self.peer_nodes.items()}
+        forwarded: Dict[Tuple[str, str], float] = {}
+        received: Dict[Tuple[str, str], float] = {}
+        for event in self.events(msg_hash):
+            if event.timestamp is None or event.peer is None:
+                continue
+            if event.kind == "forward":
+                receiver = self.peer_nodes.get(event.peer)
+                if receiver is not None:
+                    hop = (event.node, receiver)
+                    forwarded[hop] = min(forwarded.get(hop, event.timestamp), event.timestamp)
+            elif event.kind == "receive":
+                sender = self.peer_nodes.get(event.peer)
+                if sender is not None and event.node in node_peers:
+                    hop = (sender, event.node)
+                    received[hop] = min(received.get(hop, event.timestamp), event.timestamp)
+        return {hop: received[hop] - sent for hop, sent in forwarded.items() if hop in received}
+
+    def fan_out(self, msg_hash: str) -> Dict[str, int]:
+        """Distinct peers each node forwarded the message to (forward events without a peer count once)"""
+        targets: Dict[str, set] = defaultdict(set)
+        for event in self.events(msg_hash):
+            if event.kind == "forward":
+                targets[event.node].add(event.peer or event.offset)
+        return {node: len(peers) for node, peers in targets.items()}
+
+    def report(self, hashes: Optional[Iterable[str]] = None) -> RelayReport:
+        hashes = list(self.index) if hashes is None else list(hashes)
+        latencies: List[float] = []
+        hops: List[float] = []
+        fan_outs: Dict[str, List[int]] = defaultdict(list)
+        for msg_hash in hashes:
+            latencies.extend(self.arrival_latencies(msg_hash).values())
+            hops.extend(self.hop_latencies(msg_hash).values())
+            for node, count in self.fan_out(msg_hash).items():
+                fan_outs[node].append(count)
+        return RelayReport(
+            messages=len(hashes),
+            latency=LatencySummary.from_values(latencies),
+            fan_out={node: sum(counts) / len(counts) for node, counts in fan_outs.items()},
+            hop_latency=LatencySummary.from_values(hops)
+        )
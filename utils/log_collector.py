@@ -0,0 +1,104 @@
+"""
+Bounded, incremental capture of container logs.
+A LogCollector listens on a LogFollower, appends every line to a file on disk and keeps
+only the most recent lines in memory. Cursors mark a position in the stream so a test can
+read back exactly the lines written since it started, from memory when they are still
+buffered and from the file otherwise.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.config import LOG_DIR, LOG_BUFFER_LINES
+
+logger = logging.getLogger(__name__)
+
+_collectors: Dict[str, "LogCollector"] = {}
+_registry_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class LogCursor:
+    """Position in a collector's stream: next line number and its byte offset in the log file"""
+    seq: int
+    offset: int
+    timestamp: float
+
+
+class LogCollector:
+    """Writes one container's log lines to disk and keeps a ring buffer of the recent ones"""
+
+    def __init__(self, name: str, directory: str = LOG_DIR, max_lines: int = LOG_BUFFER_LINES):
+        self.name = name
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.log")
+        self._file = open(self.path, "ab")
+        self._offset = self._file.tell()
+        self._seq = 0
+        self._buffer: Deque[Tuple[int, float, str]] = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self.start_cursor = self.cursor()
+
+    def __call__(self, line: str):
+        """LogFollower listener: record one line"""
+        data = (line + "\n").encode('utf-8', 'replace')
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(data)
+            self._offset += len(data)
+            self._buffer.append((self._seq, time.monotonic(), line))
+            self._seq += 1
+
+    def cursor(self) -> LogCursor:
+        with self._lock:
+            return LogCursor(self._seq, self._offset, time.monotonic())
+
+    def read(self, since: Optional[LogCursor] = None, until: Optional[LogCursor] = None) -> List[str]:
+        """Lines written between the since and until cursors (default: from the start up to now)"""
+        since = since or self.start_cursor
+        with self._lock:
+            end_seq = until.seq if until else self._seq
+            if self._buffer and self._buffer[0][0] <= since.seq or since.seq >= self._seq:
+                return [line for seq, _, line in self._buffer if since.seq <= seq < end_seq]
+            # The window starts before the ring buffer, so read it back from disk
+            self._file.flush()
+            end_offset = until.offset if until else self._offset
+        with open(self.path, "rb") as f:
+            f.seek(since.offset)
+            data = f.read(end_offset - since.offset)
+        return data.decode('utf-8', 'replace').splitlines()
+
+    def tail(self, lines: int = 50) -> List[str]:
+        with self._lock:
+            return [line for _, _, line in list(self._buffer)[-lines:]]
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        with _registry_lock:
+            if _collectors.get(self.name) is self:
+                del _collectors[self.name]
+
+
+def collect_logs(follower, directory: str = LOG_DIR, max_lines: int = LOG_BUFFER_LINES) -> LogCollector:
+    """Attach a collector for the follower's container and register it for failure reports"""
+    collector = LogCollector(follower.container.name, directory, max_lines)
+    follower.add_listener(collector)
+    with _registry_lock:
+        previous = _collectors.get(collector.name)
+        _collectors[collector.name] = collector
+    if previous is not None:
+        previous.close()
+    return collector
+
+
+def get_collectors() -> Dict[str, LogCollector]:
+    with _registry_lock:
+        return dict(_collectors)
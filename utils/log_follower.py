@@ -0,0 +1,116 @@
+"""
+Streaming follower for container logs.
+Follows `docker logs -f` (or the Engine API log stream) on a background thread, matches each
+line against named patterns and wakes anyone waiting for that event as soon as the line is
+written. Callers keep polling REST as the fallback, so a missed or reworded log line only
+costs the old polling latency.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional
+
+from utils.config import LOG_EVENT_PATTERNS, LOG_EVENT_HISTORY
+from utils.docker_backend import DockerError, LineStream
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LogEvent:
+    name: str
+    line: str
+    seq: int
+    timestamp: float
+
+
+class LogFollower:
+    """Follows one container's log stream and publishes matched events"""
+
+    def __init__(self, container, patterns: Optional[Dict[str, str]] = None, history: int = LOG_EVENT_HISTORY):
+        self.container = container
+        self.patterns = {name: re.compile(pattern) for name, pattern in (patterns or LOG_EVENT_PATTERNS).items()}
+        self.events: Deque[LogEvent] = deque(maxlen=history)
+        self.lines_read = 0
+
+        self._counts: Dict[str, int] = {name: 0 for name in self.patterns}
+        self._listeners: List[Callable[[str], None]] = []
+        self._cond = threading.Condition()
+        self._stream: Optional[LineStream] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def add_listener(self, callback: Callable[[str], None]):
+        """Call callback(line) for every log line read, on the follower thread"""
+        with self._cond:
+            self._listeners.append(callback)
+
+    def start(self, since: Optional[float] = None) -> "LogFollower":
+        if self._thread is not None:
+            return self
+        try:
+            self._stream = self.container.backend.stream_logs(self.container.name, since=since)
+        except (DockerError, OSError) as e:
+            logger.warning(f"Could not follow logs of {self.container.name}, falling back to polling: {e}")
+            return self
+        self._thread = threading.Thread(target=self._run, name=f"logs-{self.container.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._stream is not None:
+            self._stream.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def count(self, name: str) -> int:
+        with self._cond:
+            return self._counts.get(name, 0)
+
+    def wait_for(self, name: str, timeout: float, after: Optional[int] = None) -> Optional[LogEvent]:
+        """
+        Wait until event name has been seen more than `after` times (default: its current
+        count, i.e. a new occurrence) and return the latest one, or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            threshold = self._counts.get(name, 0) if after is None else after
+            while self._counts.get(name, 0) <= threshold and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.active:
+                    return None
+                self._cond.wait(remaining)
+            for event in reversed(self.events):
+                if event.name == name:
+                    return event
+            return None
+
+    def _run(self):
+        for line in self._stream:
+            matched = [name for name, pattern in self.patterns.items() if pattern.search(line)]
+            with self._cond:
+                self.lines_read += 1
+                listeners = list(self._listeners)
+                for name in matched:
+                    self._counts[name] += 1
+                    self.events.append(LogEvent(name, line, self._counts[name], time.monotonic()))
+                if matched:
+                    self._cond.notify_all()
+            for listener in listeners:
+                try:
+                    listener(line)
+                except Exception as e:
+                    logger.debug(f"Log listener failed: {e}")
+        with self._cond:
+            self._cond.notify_all()
@@ -0,0 +1,66 @@
+"""
+Small statistics helpers shared by the throughput and latency tools.
+"""
+
+import bisect
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def histogram(values: Iterable[float], bounds: Sequence[float] = LATENCY_BUCKETS) -> List[Tuple[float, int]]:
+    """Count of values per bucket as (upper bound, count); the last bucket, bound inf, takes the rest"""
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        counts[bisect.bisect_left(bounds, value)] += 1
+    return list(zip(list(bounds) + [math.inf], counts))
+
+
+@dataclass
+class LatencySummary:
+    """Distribution summary of a set of latencies, in seconds"""
+    count: int = 0
+    mean: float = 0.0
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+    max: float = 0.0
+
+    @classmethod
+    def from_values(cls, values: Iterable[float]) -> "LatencySummary":
+        ordered: List[float] = sorted(values)
+        if not ordered:
+            return cls()
+        return cls(
+            count=len(ordered),
+            mean=sum(ordered) / len(ordered),
+            p50=percentile(ordered, 50),
+            p95=percentile(ordered, 95),
+            p99=percentile(ordered, 99),
+            max=ordered[-1]
+        )
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.p50,
+            "p95": self.p95,
+            "p99": self.p99,
+            "max": self.max
+        }
+
+    def __str__(self) -> str:
+        return (f"n={self.count} p50={self.p50 * 1000:.1f}ms p95={self.p95 * 1000:.1f}ms "
+                f"p99={self.p99 * 1000:.1f}ms max={self.max * 1000:.1f}ms")
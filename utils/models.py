@@ -1,5 +1,7 @@
 from pydantic import BaseModel, field_validator
+from functools import cached_property
 from typing import List
+import base64
 
 class NodeInfo(BaseModel):
     """Pydantic model for validating the /debug/v1/info response schema."""
@@ -31,4 +33,9 @@ class WakuMessage(BaseModel):
         # Check if it's a reasonable timestamp (between 2000-01-01 and 2030-01-01)
         if timestamp_seconds < 946684800 or timestamp_seconds > 1893456000:
             raise ValueError(f'Timestamp {v} is not within a reasonable range')
-        return v
\ No newline at end of file
+        return v
+
+    @cached_property
+    def content(self) -> str:
+        """Decoded UTF-8 payload, computed only when first accessed"""
+        return base64.b64decode(self.payload).decode('utf-8')
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Deterministic node keys.
+With a node's secp256k1 private key known before launch, its libp2p peer ID and a signed
+ENR (EIP-778, "v4" identity scheme) can be computed locally. Nodes bootstrapping from it
+can then start at the same time instead of waiting for it to come up.
+Everything here is pure Python so no crypto dependency is needed.
+"""
+
+import base64
+import hashlib
+import hmac
+import ipaddress
+from typing import Dict, List, Optional, Tuple, Union
+
+from utils.config import NODE_KEY_SEED
+
+# secp256k1 domain parameters
+_P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+_G = (0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+      0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8)
+
+_BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+# --- Keccak-256 (the pre-standard padding Ethereum uses, not hashlib's sha3_256) ---
+
+_KECCAK_ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+_KECCAK_ROTATIONS = [
+    [0, 36, 3, 41, 18], [1, 44, 10, 45, 2], [62, 6, 43, 15, 61], [28, 55, 25, 21, 56], [27, 20, 39, 8, 14],
+]
+_MASK64 = (1 << 64) - 1
+
+
+def _rotl64(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (64 - shift))) & _MASK64 if shift else value
+
+
+def _keccak_f(state: List[List[int]]):
+    for round_constant in _KECCAK_ROUND_CONSTANTS:
+        c = [state[x][0] ^ state[x][1] ^ state[x][2] ^ state[x][3] ^ state[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rotl64(c[(x + 1) % 5], 1) for x in range(5)]
+        for x in range(5):
+            for y in range(5):
+                state[x][y] ^= d[x]
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                b[y][(2 * x + 3 * y) % 5] = _rotl64(state[x][y], _KECCAK_ROTATIONS[x][y])
+        for x in range(5):
+            for y in range(5):
+                state[x][y] = b[x][y] ^ ((~b[(x + 1) % 5][y]) & b[(x + 2) % 5][y])
+        state[0][0] ^= round_constant
+
+
+def keccak256(data: bytes) -> bytes:
+    rate = 136
+    padded = bytearray(data) + b"\x01" + b"\x00" * ((rate - (len(data) + 1) % rate) % rate)
+    padded[-1] |= 0x80
+    state = [[0] * 5 for _ in range(5)]
+    for offset in range(0, len(padded), rate):
+        block = padded[offset:offset + rate]
+        for i in range(rate // 8):
+            state[i % 5][i // 5] ^= int.from_bytes(block[i * 8:i * 8 + 8], "little")
+        _keccak_f(state)
+    return b"".join(state[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+
+
+# --- secp256k1 ---
+
+def _point_add(a: Optional[Tuple[int, int]], b: Optional[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a[0] == b[0] and (a[1] + b[1]) % _P == 0:
+        return None
+    if a == b:
+        slope = 3 * a[0] * a[0] * pow(2 * a[1], -1, _P) % _P
+    else:
+        slope = (b[1] - a[1]) * pow(b[0] - a[0], -1, _P) % _P
+    x = (slope * slope - a[0] - b[0]) % _P
+    return x, (slope * (a[0] - x) - a[1]) % _P
+
+
+def _point_mul(k: int, point: Tuple[int, int] = _G) -> Tuple[int, int]:
+    result = None
+    addend: Optional[Tuple[int, int]] = point
+    while k:
+        if k & 1:
+            result = _point_add(result, addend)
+        addend = _point_add(addend, addend)
+        k >>= 1
+    return result
+
+
+def _rfc6979_nonce(private_key: int, digest: bytes) -> int:
+    key = private_key.to_bytes(32, "big")
+    msg = (int.from_bytes(digest, "big") % _N).to_bytes(32, "big")
+    v, k = b"\x01" * 32, b"\x00" * 32
+    k = hmac.new(k, v + b"\x00" + key + msg, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    k = hmac.new(k, v + b"\x01" + key + msg, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    while True:
+        v = hmac.new(k, v, hashlib.sha256).digest()
+        candidate = int.from_bytes(v, "big")
+        if 1 <= candidate < _N:
+            return candidate
+        k = hmac.new(k, v + b"\x00", hashlib.sha256).digest()
+        v = hmac.new(k, v, hashlib.sha256).digest()
+
+
+def _sign(private_key: int, digest: bytes) -> bytes:
+    """Deterministic low-s ECDSA signature as 64 bytes r || s"""
+    z = int.from_bytes(digest, "big")
+    k = _rfc6979_nonce(private_key, digest)
+    r = _point_mul(k)[0] % _N
+    s = pow(k, -1, _N) * (z + r * private_key) % _N
+    if s > _N // 2:
+        s = _N - s
+    return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+
+# --- encodings ---
+
+RlpItem = Union[bytes, int, List["RlpItem"]]
+
+
+def rlp_encode(item: RlpItem) -> bytes:
+    if isinstance(item, int):
+        item = item.to_bytes((item.bit_length() + 7) // 8, "big")
+    if isinstance(item, bytes):
+        if len(item) == 1 and item[0] < 0x80:
+            return item
+        return _rlp_length(len(item), 0x80) + item
+    payload = b"".join(rlp_encode(element) for element in item)
+    return _rlp_length(len(payload), 0xC0) + payload
+
+
+def _rlp_length(length: int, offset: int) -> bytes:
+    if length < 56:
+        return bytes([offset + length])
+    encoded = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([offset + 55 + len(encoded)]) + encoded
+
+
+def _rlp_item(data: bytes, pos: int) -> Tuple[Union[bytes, list], int]:
+    """Decode the RLP item starting at pos; returns it and the position after it"""
+    prefix = data[pos]
+    if prefix < 0x80:
+        return data[pos:pos + 1], pos + 1
+    if prefix < 0xb8:
+        end = pos + 1 + prefix - 0x80
+        return data[pos + 1:end], end
+    if prefix < 0xc0:
+        size = prefix - 0xb7
+        start = pos + 1 + size
+        end = start + int.from_bytes(data[pos + 1:start], "big")
+        return data[start:end], end
+    if prefix < 0xf8:
+        start, end = pos + 1, pos + 1 + prefix - 0xc0
+    else:
+        size = prefix - 0xf7
+        start = pos + 1 + size
+        end = start + int.from_bytes(data[pos + 1:start], "big")
+    items = []
+    while start < end:
+        item, start = _rlp_item(data, start)
+        items.append(item)
+    return items, end
+
+
+def rlp_decode(data: bytes) -> Union[bytes, list]:
+    item, end = _rlp_item(data, 0)
+    if end != len(data):
+        raise ValueError("Trailing bytes after RLP item")
+    return item
+
+
+def decode_enr(enr: str) -> Dict[str, bytes]:
+    """Key/value pairs of an "enr:..." record, plus its sequence number under "seq"; the signature is not checked"""
+    if not enr.startswith("enr:"):
+        raise ValueError(f"Not an ENR: {enr[:16]}")
+    text = enr[4:]
+    record = rlp_decode(base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)))
+    if not isinstance(record, list) or len(record) < 2 or len(record) % 2:
+        raise ValueError("Malformed ENR record")
+    pairs = {"seq": record[1]}
+    for key, value in zip(record[2::2], record[3::2]):
+        pairs[key.decode('ascii')] = value
+    return pairs
+
+
+def same_endpoint(expected_enr: str, actual_enr: str) -> bool:
+    """
+    Whether two ENRs name the same node at the same address. Sequence numbers and extra
+    fields (nwaku adds waku2, multiaddrs, ...) are allowed to differ.
+    """
+    expected, actual = decode_enr(expected_enr), decode_enr(actual_enr)
+    return all(expected.get(key) == actual.get(key) for key in ("secp256k1", "ip", "tcp"))
+
+
+def base58_encode(data: bytes) -> str:
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = _BASE58_ALPHABET[remainder] + encoded
+    leading_zeros = len(data) - len(data.lstrip(b"\x00"))
+    return "1" * leading_zeros + encoded
+
+
+class NodeKey:
+    """A secp256k1 node key with its derived peer ID and ENR"""
+
+    def __init__(self, private_key: int):
+        if not 1 <= private_key < _N:
+            raise ValueError("Private key out of range for secp256k1")
+        self.private_key = private_key
+        x, y = _point_mul(private_key)
+        self.public_key = bytes([0x02 | (y & 1)]) + x.to_bytes(32, "big")
+
+    @classmethod
+    def from_hex(cls, private_key_hex: str) -> "NodeKey":
+        return cls(int(private_key_hex, 16))
+
+    @classmethod
+    def from_seed(cls, name: str, seed: str = NODE_KEY_SEED) -> "NodeKey":
+        """Same name and seed always give the same key"""
+        digest = hashlib.sha256(f"{seed}:{name}".encode('utf-8')).digest()
+        return cls(int.from_bytes(digest, "big") % (_N - 1) + 1)
+
+    @property
+    def private_key_hex(self) -> str:
+        return self.private_key.to_bytes(32, "big").hex()
+
+    @property
+    def peer_id(self) -> str:
+        """libp2p peer ID: identity multihash of the protobuf-encoded secp256k1 public key"""
+        protobuf_key = b"\x08\x02\x12" + bytes([len(self.public_key)]) + self.public_key
+        return base58_encode(b"\x00" + bytes([len(protobuf_key)]) + protobuf_key)
+
+    def enr(self, ip: Optional[str] = None, tcp_port: Optional[int] = None,
+            udp_port: Optional[int] = None, seq: int = 1) -> str:
+        """Signed ENR text form ("enr:...") advertising the given endpoint"""
+        pairs: Dict[bytes, RlpItem] = {b"id": b"v4", b"secp256k1": self.public_key}
+        if ip is not None:
+            pairs[b"ip"] = ipaddress.IPv4Address(ip).packed
+        if tcp_port is not None:
+            pairs[b"tcp"] = tcp_port
+        if udp_port is not None:
+            pairs[b"udp"] = udp_port
+
+        content: List[RlpItem] = [seq]
+        for key in sorted(pairs):
+            content.extend([key, pairs[key]])
+        signature = _sign(self.private_key, keccak256(rlp_encode(content)))
+        record = rlp_encode([signature] + content)
+        return "enr:" + base64.urlsafe_b64encode(record).decode('ascii').rstrip("=")
@@ -0,0 +1,112 @@
+"""
+Payload-size sweep.
+Publishes messages of doubling size, from 1KB up to the largest payload relay accepts, and
+reports the client CPU spent per MB of payload at each size. Messages are published one at a
+time from the calling thread and CPU is read from that thread's clock, so in-process fake
+nodes serving the requests are not counted.
+"""
+
+import logging
+import os
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import requests
+
+from utils.config import CONTENT_TOPIC, RELAY_ENVELOPE_HEADROOM, RELAY_MAX_MESSAGE_SIZE
+from utils.waku_api import encode_payload
+
+logger = logging.getLogger(__name__)
+
+MB = 1_000_000
+SWEEP_MODES = ("bytes", "json")
+
+
+def sweep_sizes(start: int = 1024, max_size: int = RELAY_MAX_MESSAGE_SIZE - RELAY_ENVELOPE_HEADROOM) -> List[int]:
+    """Doubling sizes from start, ending exactly at max_size"""
+    sizes = []
+    size = start
+    while size < max_size:
+        sizes.append(size)
+        size *= 2
+    sizes.append(max_size)
+    return sizes
+
+
+@dataclass
+class SweepPoint:
+    size: int
+    messages: int
+    cpu_time: float
+    wall_time: float
+    failed: int = 0
+
+    @property
+    def megabytes(self) -> float:
+        return self.size * self.messages / MB
+
+    @property
+    def cpu_per_mb(self) -> float:
+        return self.cpu_time / self.megabytes if self.megabytes else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.megabytes / self.wall_time if self.wall_time > 0 else 0.0
+
+
+@dataclass
+class PayloadSweepReport:
+    mode: str
+    points: List[SweepPoint] = field(default_factory=list)
+
+    def __str__(self) -> str:
+        lines = [f"Payload sweep ({self.mode} publish path):",
+                 f"  {'size':>9}  {'msgs':>5}  {'CPU ms/MB':>10}  {'MB/s':>8}  failed"]
+        for p in self.points:
+            lines.append(f"  {p.size:>9}  {p.messages:>5}  {p.cpu_per_mb * 1000:>10.2f}  "
+                         f"{p.mb_per_sec:>8.2f}  {p.failed}")
+        return "\n".join(lines)
+
+
+def payload_size_sweep(node, content_topic: str = CONTENT_TOPIC, sizes: Optional[Sequence[int]] = None,
+                       messages_per_size: int = 20, mode: str = "bytes") -> PayloadSweepReport:
+    """
+    Publish messages_per_size messages at each size and measure client CPU per MB.
+    
+    mode "bytes" uses publish_bytes on one reused buffer; "json" builds the request the way
+    a plain requests client would (base64 str in a dict serialized by requests), for comparison.
+    """
+    if mode not in SWEEP_MODES:
+        raise ValueError(f"Unknown sweep mode '{mode}', expected one of {SWEEP_MODES}")
+    report = PayloadSweepReport(mode)
+    
+    for size in sizes or sweep_sizes():
+        # Random bytes keep base64 honest; the leading sequence number keeps every message distinct
+        buffer = bytearray(os.urandom(max(size, 8)))
+        view = memoryview(buffer)
+        failed = 0
+        cpu_start, wall_start = time.thread_time(), time.perf_counter()
+        for seq in range(messages_per_size):
+            struct.pack_into(">Q", buffer, 0, seq)
+            try:
+                if mode == "bytes":
+                    response = node.publish_bytes(content_topic, view)
+                else:
+                    response = node.transport.post(
+                        "/relay/v1/auto/messages",
+                        headers={"content-type": "application/json"},
+                        json={"payload": encode_payload(bytes(buffer)), "contentTopic": content_topic}
+                    )
+                    response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logger.debug(f"Publishing {size} bytes failed: {e}")
+                failed += 1
+        point = SweepPoint(len(buffer), messages_per_size, time.thread_time() - cpu_start,
+                           time.perf_counter() - wall_start, failed)
+        report.points.append(point)
+        logger.info(f"{point.size} byte payloads: {point.cpu_per_mb * 1000:.2f} ms CPU/MB, "
+                    f"{point.mb_per_sec:.2f} MB/s, {failed} failed")
+    
+    return report
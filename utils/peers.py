@@ -0,0 +1,68 @@
+"""
+Snapshot of a node's /admin/v1/peers response, indexed for repeated lookups.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from utils.test_helpers import extract_peer_id
+
+RELAY_PROTOCOL = "/vac/waku/relay/2.0.0"
+
+
+def extract_ip(multiaddr: str) -> Optional[str]:
+    parts = multiaddr.split("/")
+    for index, part in enumerate(parts[:-1]):
+        if part in ("ip4", "ip6", "dns4", "dns6"):
+            return parts[index + 1]
+    return None
+
+
+class PeerTable:
+    """Peers of one node at a point in time, indexed by peer ID, IP and protocol"""
+
+    def __init__(self, peers: List[Dict], fetched_at: Optional[float] = None):
+        self.peers = peers
+        self.fetched_at = time.monotonic() if fetched_at is None else fetched_at
+
+        self.by_id: Dict[str, Dict] = {}
+        self.by_ip: Dict[str, List[Dict]] = {}
+        self.by_protocol: Dict[str, List[Dict]] = {}
+        for peer in peers:
+            multiaddr = peer.get("multiaddr", "")
+            peer_id = extract_peer_id(multiaddr)
+            if peer_id:
+                self.by_id[peer_id] = peer
+            ip = extract_ip(multiaddr)
+            if ip:
+                self.by_ip.setdefault(ip, []).append(peer)
+            for protocol in peer.get("protocols", []):
+                if protocol.get("connected"):
+                    self.by_protocol.setdefault(protocol.get("protocol"), []).append(peer)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return self.age <= ttl
+
+    def peer_ids(self) -> List[str]:
+        return list(self.by_id)
+
+    def has(self, identifier: str) -> bool:
+        """True if identifier is a peer ID, an IP, or any fragment of a peer's multiaddr"""
+        if identifier in self.by_id or identifier in self.by_ip:
+            return True
+        return any(identifier in peer.get("multiaddr", "") for peer in self.peers)
+
+    def is_connected(self, identifier: str, protocol: str = RELAY_PROTOCOL) -> bool:
+        """True if the peer with this IP or peer ID is connected over the given protocol"""
+        candidates = self.by_ip.get(identifier, [])
+        if identifier in self.by_id:
+            candidates = candidates + [self.by_id[identifier]]
+        connected = self.by_protocol.get(protocol, [])
+        return any(peer is other for peer in candidates for other in connected)
+
+    def __len__(self) -> int:
+        return len(self.peers)
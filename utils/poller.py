@@ -0,0 +1,191 @@
+"""
+Coalescing poll scheduler.
+Every distinct source (for example a node's messages endpoint) is fetched at most once per
+tick, and the result is handed to every condition waiting on that source. Intervals start
+short, back off exponentially while nothing matches, and are jittered so sources do not
+line up.
+"""
+
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+from utils.config import MESSAGE_TIMEOUT, POLL_INTERVAL, POLL_MIN_INTERVAL, POLL_BACKOFF, POLL_JITTER
+
+logger = logging.getLogger(__name__)
+
+_wait_ids = itertools.count(1)
+_wait_context = threading.local()
+
+
+def current_wait_id() -> Optional[int]:
+    """Id of the wait the current thread is polling for, so polls belonging to one wait can be grouped"""
+    return getattr(_wait_context, "wait_id", None)
+
+
+@contextmanager
+def wait_scope(wait_id: Optional[int] = None) -> Iterator[int]:
+    """Tag requests made on this thread with a wait id (a fresh one by default)"""
+    outer = current_wait_id()
+    _wait_context.wait_id = next(_wait_ids) if wait_id is None else wait_id
+    try:
+        yield _wait_context.wait_id
+    finally:
+        _wait_context.wait_id = outer
+
+
+class _Waiter:
+
+    def __init__(self, condition: Callable[[Any], Any], deadline: float):
+        self.condition = condition
+        self.deadline = deadline
+        self.wait_id = next(_wait_ids)
+        self.result = None
+        self.done = threading.Event()
+
+
+class _Source:
+
+    def __init__(self, key: Hashable, fetch: Callable[[], Any], interval: float):
+        self.key = key
+        self.fetch = fetch
+        self.interval = interval
+        self.next_due = time.monotonic()
+        self.waiters: List[_Waiter] = []
+        self.in_flight = False
+        self.polls = 0
+
+
+class PollScheduler:
+    """Shares one polling loop per source between any number of waiting conditions"""
+
+    def __init__(
+        self,
+        min_interval: float = POLL_MIN_INTERVAL,
+        max_interval: float = POLL_INTERVAL,
+        backoff: float = POLL_BACKOFF,
+        jitter: float = POLL_JITTER,
+        max_workers: int = 8
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+
+        self._sources: Dict[Hashable, _Source] = {}
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="waku-poll")
+        self._thread: Optional[threading.Thread] = None
+
+    def wait(
+        self,
+        source_key: Hashable,
+        fetch: Callable[[], Any],
+        condition: Callable[[Any], Any],
+        timeout: float = MESSAGE_TIMEOUT,
+        error_message: Optional[str] = None
+    ) -> Any:
+        """Block until condition(fetch()) is truthy for the shared source, and return its value"""
+        waiter = _Waiter(condition, time.monotonic() + timeout)
+        with self._cond:
+            source = self._sources.get(source_key)
+            if source is None:
+                source = self._sources[source_key] = _Source(source_key, fetch, self.min_interval)
+            source.fetch = fetch
+            # A new waiter wants an answer soon, so restart the source at the fast interval
+            source.interval = self.min_interval
+            source.next_due = min(source.next_due, time.monotonic())
+            source.waiters.append(waiter)
+            self._ensure_thread()
+            self._cond.notify_all()
+
+        finished = waiter.done.wait(max(waiter.deadline - time.monotonic(), 0))
+
+        with self._cond:
+            if waiter in source.waiters:
+                source.waiters.remove(waiter)
+            if not source.waiters and not source.in_flight and self._sources.get(source_key) is source:
+                del self._sources[source_key]
+
+        if finished:
+            return waiter.result
+        raise TimeoutError(error_message or f"Condition not met within {timeout} seconds")
+
+    def poll_count(self, source_key: Hashable) -> int:
+        with self._cond:
+            source = self._sources.get(source_key)
+            return source.polls if source else 0
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="waku-poll-scheduler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                next_wakeup = None
+                for source in self._sources.values():
+                    if not source.waiters or source.in_flight:
+                        continue
+                    if source.next_due <= now:
+                        source.in_flight = True
+                        # Polls are made on behalf of the longest-waiting condition
+                        self._pool.submit(self._poll, source, source.waiters[0].wait_id)
+                    else:
+                        next_wakeup = source.next_due if next_wakeup is None else min(next_wakeup, source.next_due)
+                self._cond.wait(None if next_wakeup is None else next_wakeup - now)
+
+    def _poll(self, source: _Source, wait_id: int):
+        try:
+            with wait_scope(wait_id):
+                result = source.fetch()
+            failed = False
+        except Exception as e:
+            logger.debug(f"Poll failed: {e}")
+            result, failed = None, True
+
+        with self._cond:
+            source.polls += 1
+            source.in_flight = False
+            matched = False
+            if not failed:
+                for waiter in list(source.waiters):
+                    try:
+                        value = waiter.condition(result)
+                    except Exception as e:
+                        logger.debug(f"Condition raised: {e}")
+                        continue
+                    if value:
+                        waiter.result = value
+                        waiter.done.set()
+                        source.waiters.remove(waiter)
+                        matched = True
+            if not source.waiters:
+                if self._sources.get(source.key) is source:
+                    del self._sources[source.key]
+                return
+            if not matched:
+                source.interval = min(source.interval * self.backoff, self.max_interval)
+            spread = source.interval * self.jitter
+            source.next_due = time.monotonic() + source.interval + random.uniform(-spread, spread)
+            self._cond.notify_all()
+
+
+_scheduler: Optional[PollScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> PollScheduler:
+    """Return the process-wide scheduler shared by all wait helpers"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PollScheduler()
+        return _scheduler
@@ -5,11 +5,12 @@ from datetime import datetime
 
 
 class WakuTestReporter:
-    def __init__(self):
+    def __init__(self, resource_sampler=None):
         self.test_results = []
         self.node_status = {}
         self.start_time = None
         self.end_time = None
+        self.resource_sampler = resource_sampler
     
     @pytest.hookimpl(hookwrapper=True)
     def pytest_runtest_protocol(self, item):
@@ -22,6 +23,7 @@ class WakuTestReporter:
         print(f"{'='*60}")
         
         start_time = time.time()
+        window_start = time.monotonic()
         
         try:
             yield
@@ -33,17 +35,23 @@ class WakuTestReporter:
             status = "FAILED"
             error_msg = str(e)
         
+        resources = self.resource_sampler.summary(window_start, time.monotonic()) if self.resource_sampler else {}
+        
         self.test_results.append({
             'test_name': test_name,
             'test_class': test_class,
             'status': status,
             'duration': duration,
             'error': error_msg,
-            'timestamp': datetime.now()
+            'timestamp': datetime.now(),
+            'resources': resources
         })
         
         print(f"\n📊 Test Result: {status}")
         print(f"⏱️  Duration: {duration:.2f}s")
+        for container, summary in resources.items():
+            if summary.samples:
+                print(f"🖥️  {container}: {summary}")
         if error_msg:
             print(f"❌ Error: {error_msg}")
         print(f"{'='*60}")
@@ -56,6 +64,8 @@ class WakuTestReporter:
     
     def pytest_sessionfinish(self, session, exitstatus):
         self.end_time = time.time()
+        if self.resource_sampler:
+            self.resource_sampler.stop()
         total_duration = self.end_time - self.start_time
         
         print(f"\n{'='*80}")
@@ -69,7 +79,8 @@ class WakuTestReporter:
         print(f"❌ Failed: {failed}")
         print(f"📊 Total: {len(self.test_results)}")
         print(f"⏱️  Total Duration: {total_duration:.2f}s")
-        print(f"📈 Success Rate: {(passed/len(self.test_results)*100):.1f}%")
+        if self.test_results:
+            print(f"📈 Success Rate: {(passed/len(self.test_results)*100):.1f}%")
         
         if failed > 0:
             print(f"\n❌ FAILED TESTS:")
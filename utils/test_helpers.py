@@ -1,7 +1,8 @@
 import time
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Hashable, Optional
 from functools import wraps
 from utils.config import MESSAGE_TIMEOUT, POLL_INTERVAL
+from utils.poller import get_scheduler, wait_scope
 
 
 def extract_peer_id(multiaddr: str) -> Optional[str]:
@@ -17,16 +18,21 @@ def wait_for(
     condition_func: Callable[[], Any],
     timeout: float = MESSAGE_TIMEOUT,
     poll_interval: float = POLL_INTERVAL,
-    error_message: Optional[str] = None
+    error_message: Optional[str] = None,
+    wait_func: Callable[[float], Any] = time.sleep
 ) -> Any:
-    start_time = time.time()
+    deadline = time.monotonic() + timeout
     
-    while time.time() - start_time < timeout:
-        result = condition_func()
-        if result:
-            return result
-        
-        time.sleep(poll_interval)
+    with wait_scope():
+        while True:
+            result = condition_func()
+            if result:
+                return result
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_func(min(poll_interval, remaining))
     
     if error_message is None:
         error_message = f"Condition not met within {timeout} seconds"
@@ -34,12 +40,33 @@ def wait_for(
     raise TimeoutError(error_message)
 
 
+def wait_for_shared(
+    source_key: Hashable,
+    fetch_func: Callable[[], Any],
+    condition_func: Callable[[Any], Any],
+    timeout: float = MESSAGE_TIMEOUT,
+    error_message: Optional[str] = None
+) -> Any:
+    return get_scheduler().wait(source_key, fetch_func, condition_func, timeout=timeout, error_message=error_message)
+
+
 def wait_for_messages(
     get_messages_func: Callable[[], list],
     expected_count: int = 1,
     timeout: float = MESSAGE_TIMEOUT,
-    poll_interval: float = POLL_INTERVAL
+    poll_interval: float = POLL_INTERVAL,
+    source_key: Optional[Hashable] = None
 ) -> list:
+    error_message = f"Expected at least {expected_count} message(s) within {timeout} seconds"
+    if source_key is not None:
+        return wait_for_shared(
+            source_key,
+            get_messages_func,
+            lambda messages: messages if len(messages) >= expected_count else None,
+            timeout=timeout,
+            error_message=error_message
+        )
+    
     def check_messages():
         messages = get_messages_func()
         return messages if len(messages) >= expected_count else None
@@ -48,7 +75,7 @@ def wait_for_messages(
         check_messages,
         timeout=timeout,
         poll_interval=poll_interval,
-        error_message=f"Expected at least {expected_count} message(s) within {timeout} seconds"
+        error_message=error_message
     )
 
 
@@ -56,18 +83,22 @@ def wait_for_specific_message(
     get_messages_func: Callable[[], list],
     message_filter: Callable[[dict], bool],
     timeout: float = MESSAGE_TIMEOUT,
-    poll_interval: float = POLL_INTERVAL
+    poll_interval: float = POLL_INTERVAL,
+    source_key: Optional[Hashable] = None
 ) -> dict:
-    def check_for_message():
-        messages = get_messages_func()
+    def find_message(messages):
         for message in messages:
             if message_filter(message):
                 return message
         return None
     
+    error_message = f"Expected message not found within {timeout} seconds"
+    if source_key is not None:
+        return wait_for_shared(source_key, get_messages_func, find_message, timeout=timeout, error_message=error_message)
+    
     return wait_for(
-        check_for_message,
+        lambda: find_message(get_messages_func()),
         timeout=timeout,
         poll_interval=poll_interval,
-        error_message=f"Expected message not found within {timeout} seconds"
+        error_message=error_message
     ) 
\ No newline at end of file
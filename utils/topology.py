@@ -0,0 +1,199 @@
+"""
+N-node topology builder.
+Allocates container names, subnet IPs and host port blocks for any number of nodes and
+decides which nodes bootstrap from which. Bootstrap edges always point at lower-numbered
+nodes, so the layout can also be started in waves when ENRs are only known at runtime
+(DockerManager.start_topology with precompute_enrs=False);
+edges that would point forward (such as the edge closing a ring) are dialled over the
+admin API after startup.
+ClusterNamespace gives each pytest-xdist worker its own network, subnet, container name
+prefix and port block, so parallel workers never collide.
+"""
+
+import ipaddress
+import os
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from utils.config import (
+    NETWORK_NAME, NETWORK_SUBNET, NODE1_PORT, NODE_PORT_STRIDE, WORKER_SUBNET_POOL, WORKER_PORT_BLOCK
+)
+
+LAYOUTS = ("star", "chain", "ring", "mesh")
+PORTS_PER_NODE = 5
+
+
+@dataclass
+class TopologyNode:
+    name: str
+    index: int
+    ip: str
+    port: int
+    bootstrap: List[str] = field(default_factory=list)
+    dial: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Topology:
+    layout: str
+    subnet: str
+    gateway: str
+    nodes: List[TopologyNode] = field(default_factory=list)
+
+    def __getitem__(self, name: str) -> TopologyNode:
+        for node in self.nodes:
+            if node.name == name:
+                return node
+        raise KeyError(name)
+
+    @property
+    def edges(self) -> Set[Tuple[str, str]]:
+        """Undirected edges, each as a sorted name pair"""
+        edges = set()
+        for node in self.nodes:
+            for peer in node.bootstrap + node.dial:
+                edges.add(tuple(sorted((node.name, peer))))
+        return edges
+
+    def waves(self) -> List[List[TopologyNode]]:
+        """Group nodes so every node's bootstrap peers are in an earlier wave"""
+        depth: Dict[str, int] = {}
+        for node in self.nodes:
+            depth[node.name] = max((depth[peer] + 1 for peer in node.bootstrap), default=0)
+        waves: List[List[TopologyNode]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for node in self.nodes:
+            waves[depth[node.name]].append(node)
+        return waves
+
+
+class TopologyBuilder:
+    """Builds star, chain, ring and random-mesh layouts of any size"""
+
+    def __init__(
+        self,
+        size: int,
+        layout: str = "star",
+        subnet: str = NETWORK_SUBNET,
+        base_port: int = NODE1_PORT,
+        port_stride: int = NODE_PORT_STRIDE,
+        name_prefix: str = "node",
+        degree: int = 3,
+        seed: Optional[int] = None
+    ):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUTS}")
+        if size < 1:
+            raise ValueError("Topology needs at least one node")
+        if port_stride < PORTS_PER_NODE:
+            raise ValueError(f"Port stride must leave room for {PORTS_PER_NODE} ports per node")
+        self.size = size
+        self.layout = layout
+        self.network = ipaddress.ip_network(subnet)
+        self.base_port = base_port
+        self.port_stride = port_stride
+        self.name_prefix = name_prefix
+        self.degree = degree
+        self.random = random.Random(seed)
+
+    def allocate_ips(self) -> Tuple[str, List[str]]:
+        """Return the gateway and one address per node, skipping the gateway"""
+        hosts = self.network.hosts()
+        gateway = str(next(hosts))
+        ips = []
+        for _ in range(self.size):
+            try:
+                ips.append(str(next(hosts)))
+            except StopIteration:
+                raise ValueError(f"Subnet {self.network} is too small for {self.size} nodes")
+        return gateway, ips
+
+    def allocate_ports(self) -> List[int]:
+        ports = [self.base_port + i * self.port_stride for i in range(self.size)]
+        if ports[-1] + PORTS_PER_NODE - 1 > 65535:
+            raise ValueError(f"Port block for {self.size} nodes exceeds 65535")
+        return ports
+
+    def build(self) -> Topology:
+        gateway, ips = self.allocate_ips()
+        ports = self.allocate_ports()
+        topology = Topology(self.layout, str(self.network), gateway)
+        for i in range(self.size):
+            topology.nodes.append(TopologyNode(f"{self.name_prefix}{i + 1}", i, ips[i], ports[i]))
+
+        nodes = topology.nodes
+        for i, node in enumerate(nodes[1:], start=1):
+            if self.layout == "star":
+                node.bootstrap.append(nodes[0].name)
+            elif self.layout in ("chain", "ring"):
+                node.bootstrap.append(nodes[i - 1].name)
+            else:
+                picks = self.random.sample(range(i), min(self.degree, i))
+                node.bootstrap.extend(nodes[p].name for p in sorted(picks))
+
+        if self.layout == "ring" and self.size > 2:
+            nodes[-1].dial.append(nodes[0].name)
+        return topology
+
+
+@dataclass(frozen=True)
+class ClusterNamespace:
+    """Network, subnet, container names and host ports owned by one test process"""
+    worker: str = "main"
+    network_name: str = NETWORK_NAME
+    subnet: str = NETWORK_SUBNET
+    prefix: str = ""
+    base_port: int = NODE1_PORT
+    port_stride: int = NODE_PORT_STRIDE
+    # Host ports this namespace may use from base_port on; None outside xdist, where nothing runs alongside
+    port_block: Optional[int] = None
+
+    @classmethod
+    def for_worker(cls, worker_id: Optional[str] = None) -> "ClusterNamespace":
+        """Namespace for a pytest-xdist worker ("gw0", "gw1", ...); the defaults outside xdist"""
+        worker_id = worker_id or os.environ.get("PYTEST_XDIST_WORKER")
+        if not worker_id:
+            return cls()
+        index = int(re.sub(r"\D", "", worker_id) or 0)
+        pool = ipaddress.ip_network(WORKER_SUBNET_POOL)
+        if index >= 2 ** (24 - pool.prefixlen):
+            raise ValueError(f"Worker {worker_id} has no /24 left in {WORKER_SUBNET_POOL}")
+        base_port = NODE1_PORT + (index + 1) * WORKER_PORT_BLOCK
+        if base_port + WORKER_PORT_BLOCK > 65535:
+            raise ValueError(f"Worker {worker_id} has no port block left below 65535")
+        return cls(
+            worker=worker_id,
+            network_name=f"{NETWORK_NAME}-{worker_id}",
+            subnet=str(ipaddress.ip_network((int(pool.network_address) + index * 256, 24))),
+            prefix=f"{worker_id}-",
+            base_port=base_port,
+            port_block=WORKER_PORT_BLOCK
+        )
+
+    @property
+    def gateway(self) -> str:
+        return str(next(ipaddress.ip_network(self.subnet).hosts()))
+
+    def container_name(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    def node_ip(self, index: int) -> str:
+        """Address of the index-th node; the first host address is the gateway"""
+        return str(ipaddress.ip_network(self.subnet).network_address + index + 2)
+
+    def node_port(self, index: int) -> int:
+        return self.base_port + index * self.port_stride
+
+    @property
+    def max_nodes(self) -> Optional[int]:
+        return self.port_block // self.port_stride if self.port_block is not None else None
+
+    def topology_builder(self, size: int, layout: str = "star", **kwargs) -> TopologyBuilder:
+        """TopologyBuilder whose names, addresses and ports stay inside this namespace"""
+        if self.max_nodes is not None and size > self.max_nodes:
+            raise ValueError(f"Worker {self.worker} has ports for {self.max_nodes} node(s), "
+                             f"a {size}-node topology would use the next worker's ports")
+        kwargs.setdefault("name_prefix", self.container_name("node"))
+        return TopologyBuilder(size, layout, subnet=self.subnet, base_port=self.base_port,
+                               port_stride=self.port_stride, **kwargs)
@@ -0,0 +1,204 @@
+"""
+HTTP transport for the nwaku REST API.
+Each node gets one pooled keep-alive session so repeated calls reuse TCP connections
+instead of opening a new one per request.
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.config import HTTP_POOL_SIZE, HTTP_TIMEOUT, HTTP_RETRIES, HTTP_RETRY_BACKOFF
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    """Timeout and retry policy applied to requests under a path prefix"""
+    timeout: float = HTTP_TIMEOUT
+    retries: int = HTTP_RETRIES
+    backoff: float = HTTP_RETRY_BACKOFF
+    retry_post: bool = False
+
+
+DEFAULT_POLICIES: Dict[str, EndpointPolicy] = {
+    # Health is polled while the node starts, failures there are expected and must stay cheap
+    "/health": EndpointPolicy(timeout=5.0, retries=0),
+    "/debug/v1/info": EndpointPolicy(),
+    "/admin/v1/peers": EndpointPolicy(),
+    "/relay/v1/auto/subscriptions": EndpointPolicy(retry_post=True),
+    "/relay/v1/auto/messages": EndpointPolicy(),
+}
+
+
+def make_response(status_code: int, content: bytes, url: str, content_type: str = "application/json") -> requests.Response:
+    """Build a requests.Response for transports that answer without HTTP"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.url = url
+    response.reason = requests.status_codes._codes.get(status_code, ("",))[0].replace("_", " ").upper()
+    response.headers["Content-Type"] = content_type
+    response.encoding = "utf-8"
+    return response
+
+
+def json_body(kwargs: Dict[str, Any]) -> Any:
+    """JSON document carried by request kwargs, whether passed as json= or pre-serialized as data="""
+    if kwargs.get("json") is not None:
+        return kwargs["json"]
+    data = kwargs.get("data")
+    return json.loads(data) if data else None
+
+
+@dataclass
+class TransportStats:
+    """Request and connection counters for a transport"""
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    connections_opened: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        return max(self.requests - self.connections_opened, 0)
+
+
+class WakuTransport:
+    """Pooled keep-alive HTTP session bound to a single node's REST address"""
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = HTTP_POOL_SIZE,
+        policies: Optional[Dict[str, EndpointPolicy]] = None,
+        default_policy: Optional[EndpointPolicy] = None
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.default_policy = default_policy or EndpointPolicy()
+
+        # Retries are handled here per endpoint, so the adapter itself never retries
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._errors = 0
+
+    def policy_for(self, path: str) -> EndpointPolicy:
+        """Return the policy of the longest matching path prefix"""
+        best = None
+        for prefix in self.policies:
+            if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self.policies[best] if best is not None else self.default_policy
+
+    def request(self, method: str, path: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """Send a request, retrying connection errors and gateway statuses per endpoint policy"""
+        method = method.upper()
+        policy = self.policy_for(path)
+        retries = policy.retries if method != "POST" or policy.retry_post else 0
+        url = f"{self.base_url}{path}"
+
+        attempt = 0
+        while True:
+            self._count("_requests")
+            try:
+                response = self.session.request(
+                    method, url, timeout=timeout if timeout is not None else policy.timeout, **kwargs
+                )
+            except requests.exceptions.ConnectionError:
+                if attempt >= retries:
+                    self._count("_errors")
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                response.close()
+
+            attempt += 1
+            self._count("_retries")
+            logger.debug(f"Retrying {method} {path} (attempt {attempt}/{retries})")
+            time.sleep(policy.backoff * (2 ** (attempt - 1)))
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", path, **kwargs)
+
+    @property
+    def stats(self) -> TransportStats:
+        """Snapshot of the counters, with connection counts read from the urllib3 pools"""
+        pools = self._adapter.poolmanager.pools
+        opened = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+        with self._lock:
+            return TransportStats(
+                requests=self._requests,
+                retries=self._retries,
+                errors=self._errors,
+                connections_opened=opened
+            )
+
+    def close(self):
+        self.session.close()
+
+    def _count(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+
+_transports: Dict[str, WakuTransport] = {}
+_transports_lock = threading.Lock()
+_transport_factory: Callable[[str], WakuTransport] = WakuTransport
+
+
+def set_transport_factory(factory: Optional[Callable[[str], WakuTransport]] = None):
+    """
+    Build shared transports with factory(base_url) from now on, e.g. to record or replay
+    traffic; None restores plain WakuTransport. Existing shared transports are closed.
+    """
+    global _transport_factory
+    close_transports()
+    with _transports_lock:
+        _transport_factory = factory or WakuTransport
+
+
+def get_transport(base_url: str) -> WakuTransport:
+    """Return the shared transport for a node, creating it on first use"""
+    base_url = base_url.rstrip('/')
+    with _transports_lock:
+        transport = _transports.get(base_url)
+        if transport is None:
+            transport = _transport_factory(base_url)
+            _transports[base_url] = transport
+        return transport
+
+
+def close_transports():
+    """Close and forget every shared transport"""
+    with _transports_lock:
+        for transport in _transports.values():
+            transport.close()
+        _transports.clear()
@@ -1,8 +1,11 @@
 # utils/test_helpers.py
-from pydantic import ValidationError
-import base64
+from pydantic import TypeAdapter, ValidationError
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 from utils.models import WakuMessage
 
+_message_list_adapter = TypeAdapter(List[WakuMessage])
+
 def validate_waku_message(message_data, expected_payload=None, expected_topic=None, expected_content=None):
     """
     Validate a Waku message using Pydantic schema and optional content checks.
@@ -36,8 +39,85 @@ def validate_waku_message(message_data, expected_payload=None, expected_topic=No
             f"Content topic mismatch. Expected: {expected_topic}, Got: {waku_message.contentTopic}"
     
     if expected_content is not None:
-        decoded_message = base64.b64decode(waku_message.payload).decode('utf-8')
+        decoded_message = waku_message.content
         assert decoded_message == expected_content, \
             f"Message content mismatch. Expected: '{expected_content}', Got: '{decoded_message}'"
     
-    return waku_message
\ No newline at end of file
+    return waku_message
+
+
+@dataclass
+class BatchValidationResult:
+    """Outcome of validating a list of messages; failures hold (index, reason) pairs"""
+    messages: List[Optional[WakuMessage]] = field(default_factory=list)
+    failures: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    @property
+    def valid_messages(self) -> List[WakuMessage]:
+        return [m for m in self.messages if m is not None]
+
+    def raise_for_failures(self):
+        if self.failures:
+            details = "\n".join(f"  [{index}] {reason}" for index, reason in self.failures)
+            raise AssertionError(f"{len(self.failures)} of {len(self.messages)} message(s) failed validation:\n{details}")
+
+
+def validate_waku_messages(messages_data, expected_topic=None, expected_payloads=None, expected_contents=None):
+    """
+    Validate many Waku messages in one pass and collect every failure.
+    
+    Args:
+        messages_data: List of raw message dicts
+        expected_topic: Expected content topic for every message (optional)
+        expected_payloads: Expected base64 payloads, aligned with messages_data (optional)
+        expected_contents: Expected decoded contents, aligned with messages_data (optional).
+            Payloads are only decoded when this is given.
+    
+    Returns:
+        BatchValidationResult: Validated models (None where schema validation failed) and failures
+    """
+    messages_data = list(messages_data)
+    result = BatchValidationResult(messages=[None] * len(messages_data))
+    
+    # Schema validation for the whole list at once; on errors, revalidate only the clean subset
+    try:
+        result.messages = _message_list_adapter.validate_python(messages_data)
+    except ValidationError as e:
+        errors: Dict[int, List[str]] = {}
+        for error in e.errors():
+            index = error["loc"][0]
+            location = ".".join(str(part) for part in error["loc"][1:])
+            errors.setdefault(index, []).append(f"{location}: {error['msg']}")
+        for index in sorted(errors):
+            result.failures.append((index, "Schema validation failed: " + "; ".join(errors[index])))
+        
+        clean = [i for i in range(len(messages_data)) if i not in errors]
+        for index, message in zip(clean, _message_list_adapter.validate_python([messages_data[i] for i in clean])):
+            result.messages[index] = message
+    
+    for name, expected in (("payloads", expected_payloads), ("contents", expected_contents)):
+        if expected is not None and len(expected) != len(messages_data):
+            result.failures.append((-1, f"Expected {len(expected)} {name}, got {len(messages_data)} message(s)"))
+    
+    for index, waku_message in enumerate(result.messages):
+        if waku_message is None:
+            continue
+        if expected_topic is not None and waku_message.contentTopic != expected_topic:
+            result.failures.append((index, f"Content topic mismatch. Expected: {expected_topic}, Got: {waku_message.contentTopic}"))
+        if expected_payloads is not None and index < len(expected_payloads) and waku_message.payload != expected_payloads[index]:
+            result.failures.append((index, f"Payload mismatch. Expected: {expected_payloads[index]}, Got: {waku_message.payload}"))
+        if expected_contents is not None and index < len(expected_contents):
+            try:
+                content = waku_message.content
+            except (ValueError, UnicodeDecodeError) as e:
+                result.failures.append((index, f"Payload could not be decoded: {e}"))
+                continue
+            if content != expected_contents[index]:
+                result.failures.append((index, f"Message content mismatch. Expected: '{expected_contents[index]}', Got: '{content}'"))
+    
+    result.failures.sort(key=lambda failure: failure[0])
+    return result
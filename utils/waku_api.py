@@ -1,41 +1,151 @@
 import requests
 import base64
+import json
 import time
 import logging
-from typing import Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Union
 from urllib.parse import quote
 
-from utils.config import BASE_URL
+from utils.config import BASE_URL, MESSAGE_TIMEOUT, PEER_TABLE_TTL, STORE_PAGE_SIZE
+from utils.inbox import MessageInbox
+from utils.log_collector import collect_logs
+from utils.log_follower import LogFollower
+from utils.metrics import LatencySummary
 from utils.models import NodeInfo
-from utils.test_helpers import extract_peer_id, wait_for
+from utils.peers import PeerTable
+from utils.store import StoreQuery
+from utils.test_helpers import extract_peer_id, wait_for, wait_for_messages, wait_for_specific_message
+from utils.transport import WakuTransport, get_transport
 
 logger = logging.getLogger(__name__)
 
 
+# Text is sent as its UTF-8 bytes; bytes-like payloads (contiguous memoryviews included) as they are
+Payload = Union[str, bytes, bytearray, memoryview]
+
+_PUBLISH_BODY_PREFIX = b'{"payload":"'
+
+
+def _payload_bytes(message: Payload):
+    return message.encode('utf-8') if isinstance(message, str) else message
+
+
+def encode_payload(message: Payload) -> str:
+    return base64.b64encode(_payload_bytes(message)).decode('ascii')
+
+
+@lru_cache(maxsize=256)
+def _publish_body_suffix(content_topic: str) -> bytes:
+    return b'","contentTopic":' + json.dumps(content_topic).encode('utf-8') + b'}'
+
+
+def build_publish_body(content_topic: str, payload_b64: Union[str, bytes]) -> bytes:
+    """
+    Serialized relay publish request. Base64 never needs JSON escaping, so the encoded payload
+    is joined between a constant prefix and a cached per-topic suffix instead of going through
+    json.dumps; the result is one copy of the payload.
+    """
+    if isinstance(payload_b64, str):
+        payload_b64 = payload_b64.encode('ascii')
+    return b"".join((_PUBLISH_BODY_PREFIX, payload_b64, _publish_body_suffix(content_topic)))
+
+
+@dataclass
+class PublishResult:
+    index: int
+    payload: str
+    ok: bool
+    status_code: Optional[int]
+    latency: float
+    error: Optional[str] = None
+
+
+@dataclass
+class PublishReport:
+    results: List[PublishResult] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def sent(self) -> int:
+        return len(self.results)
+
+    @property
+    def failed(self) -> List[PublishResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def msgs_per_sec(self) -> float:
+        delivered = self.sent - len(self.failed)
+        return delivered / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def latency(self) -> LatencySummary:
+        return LatencySummary.from_values(r.latency for r in self.results if r.ok)
+
+
 class WakuNodeManager:
     
-    def __init__(self, port: int):
+    def __init__(self, port: int, transport: Optional[WakuTransport] = None):
         self.port = port
         self.base_url = f"http://{BASE_URL}:{port}".rstrip('/')
+        self.transport = transport or get_transport(self.base_url)
+        self._inboxes: Dict[str, MessageInbox] = {}
+        self.peer_table_ttl = PEER_TABLE_TTL
+        self._peer_table: Optional[PeerTable] = None
+        self._node_info: Optional[NodeInfo] = None
+        self._cache_key = None
+        self.log_follower: Optional[LogFollower] = None
+        self._log_events_seen: Dict[str, int] = {}
     
-    def wait_for_ready(self, timeout: int = 30) -> bool:
+    def wait_for_ready(self, timeout: int = 30, poll_interval: float = 2.0) -> bool:
         logger.info(f"Waiting for node on port {self.port} to become ready...")
         start_time = time.time()
         while time.time() - start_time < timeout:
             if self.check_health():
                 logger.info(f"Node on port {self.port} is ready")
                 return True
-            time.sleep(2)
+            self._wait_for_log_event("ready", poll_interval)
         
         logger.error(f"Node on port {self.port} failed to become ready within {timeout}s")
         raise TimeoutError(f"Node failed to become ready within {timeout}s")
     
-    def get_node_info(self) -> NodeInfo:
-        response = requests.get(f"{self.base_url}/debug/v1/info", timeout=10)
+    def _node_identity(self):
+        """Changes whenever the node behind this address is replaced; cached state is dropped then"""
+        return None
+    
+    def _check_cache(self):
+        identity = self._node_identity()
+        if identity != self._cache_key:
+            self.invalidate_cache()
+            self._cache_key = identity
+    
+    def invalidate_cache(self):
+        self._node_info = None
+        self._peer_table = None
+    
+    def _wait_for_log_event(self, event: str, timeout: float):
+        """Sleep until the next poll, waking early if the log follower sees the event"""
+        follower = self.log_follower
+        if follower is None or not follower.active:
+            time.sleep(timeout)
+            return
+        follower.wait_for(event, timeout, after=self._log_events_seen.get(event, 0))
+        self._log_events_seen[event] = follower.count(event)
+    
+    def get_node_info(self, refresh: bool = False) -> NodeInfo:
+        self._check_cache()
+        if self._node_info is not None and not refresh:
+            return self._node_info
+        
+        response = self.transport.get("/debug/v1/info")
         response.raise_for_status()
         
         node_info_data = response.json()
         node_info = NodeInfo(**node_info_data)
+        self._node_info = node_info
         return node_info
     
     def get_enr_uri(self) -> str:
@@ -44,7 +154,7 @@ class WakuNodeManager:
     
     def check_health(self) -> bool:
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = self.transport.get("/health")
             return response.status_code == 200
         except requests.exceptions.RequestException:
             return False
@@ -53,99 +163,198 @@ class WakuNodeManager:
         headers = {"accept": "text/plain", "content-type": "application/json"}
         payload = [content_topic]
         
-        response = requests.post(
-            f"{self.base_url}/relay/v1/auto/subscriptions",
+        response = self.transport.post(
+            "/relay/v1/auto/subscriptions",
             headers=headers,
-            json=payload,
-            timeout=10
+            json=payload
+        )
+        response.raise_for_status()
+        return response
+    
+    def unsubscribe_from_topics(self, content_topics: List[str]):
+        response = self.transport.delete(
+            "/relay/v1/auto/subscriptions",
+            headers={"accept": "text/plain", "content-type": "application/json"},
+            json=content_topics
         )
         response.raise_for_status()
         return response
     
-    def publish_message(self, content_topic: str, message_text: str):
+    def reset_state(self, content_topics: List[str]):
+        """Drain cached messages and drop subscriptions so a reused node starts clean"""
+        for content_topic in content_topics:
+            try:
+                self.get_messages(content_topic)
+            except requests.exceptions.HTTPError:
+                # Not subscribed, nothing cached
+                pass
+        self.unsubscribe_from_topics(content_topics)
+        self._inboxes.clear()
+        self.invalidate_cache()
+    
+    def publish_message(self, content_topic: str, message: Payload):
+        return self.publish_encoded(content_topic, base64.b64encode(_payload_bytes(message)))
+    
+    def publish_bytes(self, content_topic: str, payload: Union[bytes, bytearray, memoryview]):
+        """Publish raw bytes; they are base64-encoded once and never decoded to str"""
+        return self.publish_encoded(content_topic, base64.b64encode(payload))
+    
+    def publish_encoded(self, content_topic: str, payload_b64: Union[str, bytes]):
         headers = {"content-type": "application/json"}
-        payload_b64 = base64.b64encode(message_text.encode('utf-8')).decode('utf-8')
-        
-        payload = {
-            "payload": payload_b64,
-            "contentTopic": content_topic
-        }
         
-        response = requests.post(
-            f"{self.base_url}/relay/v1/auto/messages",
+        response = self.transport.post(
+            "/relay/v1/auto/messages",
             headers=headers,
-            json=payload,
-            timeout=10
+            data=build_publish_body(content_topic, payload_b64)
         )
         response.raise_for_status()
         return response
     
+    def publish_many(self, content_topic: str, payloads: Iterable[Payload], concurrency: int = 8,
+                     encoded: bool = False) -> PublishReport:
+        """
+        Publish every payload over a bounded worker pool and report throughput.
+        
+        Payloads are pulled lazily, so generators of any length are fine; at most
+        2 * concurrency messages are encoded and in flight at once. Set encoded=True
+        when the payloads are already base64.
+        """
+        def _send(index: int, payload_b64: str) -> PublishResult:
+            start = time.perf_counter()
+            try:
+                response = self.publish_encoded(content_topic, payload_b64)
+                return PublishResult(index, payload_b64, True, response.status_code, time.perf_counter() - start)
+            except requests.exceptions.HTTPError as e:
+                return PublishResult(index, payload_b64, False, e.response.status_code, time.perf_counter() - start,
+                                     e.response.text)
+            except requests.exceptions.RequestException as e:
+                return PublishResult(index, payload_b64, False, None, time.perf_counter() - start, str(e))
+        
+        report = PublishReport()
+        max_in_flight = max(concurrency, 1) * 2
+        start_time = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="waku-publish") as pool:
+            in_flight = set()
+            for index, payload in enumerate(payloads):
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    report.results.extend(f.result() for f in done)
+                payload_b64 = payload if encoded else encode_payload(payload)
+                in_flight.add(pool.submit(_send, index, payload_b64))
+            
+            done, _ = wait(in_flight)
+            report.results.extend(f.result() for f in done)
+        
+        report.duration = time.perf_counter() - start_time
+        report.results.sort(key=lambda r: r.index)
+        logger.info(f"Published {report.sent} message(s) on port {self.port} at "
+                    f"{report.msgs_per_sec:.1f} msg/s ({report.latency})")
+        return report
+    
+    def get_multiaddr(self) -> str:
+        """TCP multiaddr (with peer ID) that other nodes can dial"""
+        for address in self.get_node_info().listenAddresses:
+            if "/tcp/" in address and "/ws" not in address and "/p2p/" in address:
+                return address
+        raise ValueError(f"Node on port {self.port} has no dialable TCP listen address")
+    
+    def connect_peers(self, multiaddrs: List[str]):
+        response = self.transport.post(
+            "/admin/v1/peers",
+            headers={"content-type": "application/json"},
+            json=multiaddrs
+        )
+        response.raise_for_status()
+        self._peer_table = None
+        return response
+    
     def get_messages(self, content_topic: str) -> List[Dict]:
         encoded_content_topic = quote(content_topic, safe='')
         
-        response = requests.get(
-            f"{self.base_url}/relay/v1/auto/messages/{encoded_content_topic}",
-            headers={"accept": "application/json"},
-            timeout=10
+        response = self.transport.get(
+            f"/relay/v1/auto/messages/{encoded_content_topic}",
+            headers={"accept": "application/json"}
         )
         response.raise_for_status()
         return response.json()
     
+    def message_source(self, content_topic: str) -> Hashable:
+        """Poll scheduler key for this node's inbox of a topic; waits on the same key share polls"""
+        return self.get_inbox(content_topic).source_key
+    
+    def wait_for_messages(self, content_topic: str, expected_count: int = 1,
+                          timeout: float = MESSAGE_TIMEOUT) -> List[Dict]:
+        """Wait until the topic's inbox holds expected_count messages, counting earlier polls too"""
+        inbox = self.get_inbox(content_topic)
+        return wait_for_messages(inbox.refresh, expected_count, timeout, source_key=inbox.source_key)
+    
+    def wait_for_message(self, content_topic: str, message_filter: Callable[[Dict], bool],
+                         timeout: float = MESSAGE_TIMEOUT) -> Dict:
+        inbox = self.get_inbox(content_topic)
+        return wait_for_specific_message(inbox.refresh, message_filter, timeout, source_key=inbox.source_key)
+    
+    def query_store(self, content_topics: Union[str, List[str]], start_time: Optional[int] = None,
+                    end_time: Optional[int] = None, pubsub_topic: Optional[str] = None,
+                    page_size: int = STORE_PAGE_SIZE, ascending: bool = True, prefetch: bool = True) -> StoreQuery:
+        """
+        Message history from the node's store, unlike get_messages which only sees the relay
+        cache. Pages are fetched lazily while iterating; times are Unix nanoseconds.
+        """
+        return StoreQuery(self.transport, content_topics, pubsub_topic, start_time, end_time,
+                          page_size, ascending, prefetch)
+    
     def get_peers(self) -> List[Dict]:
-        response = requests.get(
-            f"{self.base_url}/admin/v1/peers",
-            headers={"accept": "application/json"},
-            timeout=10
+        response = self.transport.get(
+            "/admin/v1/peers",
+            headers={"accept": "application/json"}
         )
         response.raise_for_status()
-        return response.json()
+        peers = response.json()
+        self._check_cache()
+        self._peer_table = PeerTable(peers)
+        return peers
+    
+    def peer_table(self, max_age: Optional[float] = None) -> PeerTable:
+        max_age = self.peer_table_ttl if max_age is None else max_age
+        self._check_cache()
+        if self._peer_table is None or not self._peer_table.is_fresh(max_age):
+            self.get_peers()
+        return self._peer_table
     
     def get_peer_ids(self) -> List[str]:
-        peer_ids: List[str] = []
-        for peer in self.get_peers():
-            peer_id = extract_peer_id(peer.get("multiaddr", ""))
-            if peer_id:
-                peer_ids.append(peer_id)
-        return peer_ids
+        return self.peer_table().peer_ids()
     
     def has_peer(self, identifier: str) -> bool:
-        peers = self.get_peers()
-        for peer in peers:
-            multiaddr = peer.get("multiaddr", "")
-            if identifier in multiaddr:
-                return True
-            peer_id = extract_peer_id(multiaddr)
-            if peer_id and peer_id == identifier:
-                return True
-        return False
+        return self.peer_table().has(identifier)
+    
+    def get_inbox(self, content_topic: str) -> MessageInbox:
+        inbox = self._inboxes.get(content_topic)
+        if inbox is None:
+            inbox = self._inboxes.setdefault(
+                content_topic, MessageInbox(lambda: self.get_messages(content_topic))
+            )
+        return inbox
     
     def verify_message_received(self, content_topic: str, expected_payload: str) -> bool:
-        messages = self.get_messages(content_topic)
+        inbox = self.get_inbox(content_topic)
+        if inbox.find(expected_payload) is not None:
+            return True
         
-        if not messages:
-            return False
-        
-        for message in messages:
-            if message.get("payload") == expected_payload:
-                return True
-        
-        return False
+        inbox.poll()
+        return inbox.find(expected_payload) is not None
     
     def verify_peer_connection(self, expected_peer_ip: str, timeout: float = 100.0, poll_interval: float = 5.0) -> bool:
         logger.info(f"Verifying peer connection for {expected_peer_ip} on port {self.port}")
         
         def check_peer_connection():
             try:
-                peers = self.get_peers()
-                logger.debug(f"Found {len(peers)} peers")
+                table = self.peer_table(max_age=0)
+                logger.debug(f"Found {len(table)} peers")
                 
-                for peer in peers:
-                    if expected_peer_ip in peer.get("multiaddr", ""):
-                        for protocol in peer.get("protocols", []):
-                            if (protocol.get("protocol") == "/vac/waku/relay/2.0.0" and 
-                                protocol.get("connected") == True):
-                                logger.info(f"Peer connection established for {expected_peer_ip} on port {self.port}")
-                                return True
+                if table.is_connected(expected_peer_ip):
+                    logger.info(f"Peer connection established for {expected_peer_ip} on port {self.port}")
+                    return True
                 
                 logger.debug(f"Peer {expected_peer_ip} not found, retrying...")
                 return False
@@ -159,7 +368,8 @@ class WakuNodeManager:
                 check_peer_connection,
                 timeout=timeout,
                 poll_interval=poll_interval,
-                error_message=f"Failed to establish peer connection for {expected_peer_ip} on port {self.port} within {timeout}s"
+                error_message=f"Failed to establish peer connection for {expected_peer_ip} on port {self.port} within {timeout}s",
+                wait_func=lambda interval: self._wait_for_log_event("peer_connected", interval)
             )
         except TimeoutError as e:
             logger.error(str(e))
@@ -168,11 +378,11 @@ class WakuNodeManager:
 
 class Node(WakuNodeManager):
     
-    def __init__(self, container, docker_manager=None):
+    def __init__(self, container, docker_manager=None, transport: Optional[WakuTransport] = None):
         self.container = container
         self.docker_manager = docker_manager
         
-        super().__init__(container.port)
+        super().__init__(container.port, transport)
         
         self.port = container.port
         self.network_ip = container.network_ip
@@ -180,8 +390,20 @@ class Node(WakuNodeManager):
         
         self._node_id: Optional[str] = None
     
+    def _node_identity(self):
+        return getattr(self.container, "container_id", None)
+    
+    def invalidate_cache(self):
+        super().invalidate_cache()
+        self._node_id = None
+    
     @property
     def node_id(self) -> Optional[str]:
+        # Containers launched with a pre-generated key know their peer ID without a REST call
+        peer_id = getattr(self.container, "peer_id", None)
+        if peer_id:
+            return peer_id
+        self._check_cache()
         if self._node_id is not None:
             return self._node_id
         try:
@@ -195,5 +417,23 @@ class Node(WakuNodeManager):
             self._node_id = None
         return self._node_id
     
+    def follow_logs(self) -> LogFollower:
+        """Start following the container log so readiness and peer waits wake on log events"""
+        if self.log_follower is None:
+            follower = LogFollower(self.container)
+            self.container.log_collector = collect_logs(follower)
+            self.log_follower = follower.start()
+        return self.log_follower
+    
+    def detach(self):
+        """Stop following logs but leave the container to the manager's bulk teardown"""
+        if self.log_follower is not None:
+            self.log_follower.stop()
+            self.log_follower = None
+        if getattr(self.container, "log_collector", None) is not None:
+            self.container.log_collector.close()
+            self.container.log_collector = None
+    
     def stop(self):
+        self.detach()
         self.container.stop() 
\ No newline at end of file